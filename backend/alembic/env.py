@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from core.config import settings
 from core.database import Base
+from core.idempotency import IdempotencyRecord  # noqa: F401
+from core.outbox import OutboxMessage  # noqa: F401
 
 # Import all models so Alembic detects them
 from features.user.user_model import User  # noqa: F401
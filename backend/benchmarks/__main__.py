@@ -0,0 +1,9 @@
+"""Run every ``*_bench`` module in this package: ``python -m benchmarks``."""
+import importlib
+import pkgutil
+from pathlib import Path
+
+names = sorted(info.name for info in pkgutil.iter_modules([str(Path(__file__).parent)]))
+for name in names:
+    if name.endswith("_bench"):
+        importlib.import_module(f"benchmarks.{name}").main()
@@ -0,0 +1,79 @@
+"""In-process app wired to a throwaway SQLite database, for endpoint benchmarks."""
+import tempfile
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from core.cache import NullCache, get_cache_backend
+from core.database import (
+    Base,
+    get_read_session,
+    get_session,
+    get_session_factory,
+    get_stream_session_factory,
+    make_read_session_factory,
+)
+from main import create_app
+
+
+@dataclass(frozen=True)
+class BenchApp:
+    app: FastAPI
+    client: AsyncClient
+    engine: AsyncEngine
+
+
+def override_databases(app: FastAPI, engine: AsyncEngine, cache: bool = True) -> None:
+    """Point every session dependency of ``app`` at ``engine``.
+
+    With ``cache`` off the user cache stores nothing, so every lookup
+    reaches the database; benchmarks that measure the database path need that.
+    """
+    write_factory = async_sessionmaker(engine, expire_on_commit=False)
+    read_factory = make_read_session_factory(engine)
+    stream_factory = make_read_session_factory(engine, autocommit=False)
+
+    async def override_session() -> AsyncGenerator[AsyncSession, None]:
+        async with write_factory() as session, session.begin():
+            yield session
+
+    async def override_read_session() -> AsyncGenerator[AsyncSession, None]:
+        async with read_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_read_session] = override_read_session
+    app.dependency_overrides[get_session_factory] = lambda: write_factory
+    app.dependency_overrides[get_stream_session_factory] = lambda: stream_factory
+    if not cache:
+        null_cache = NullCache()
+        app.dependency_overrides[get_cache_backend] = lambda: null_cache
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@asynccontextmanager
+async def bench_app(cache: bool = True) -> AsyncIterator[BenchApp]:
+    """Yield a fresh app, an HTTP client for it and the engine behind it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        await create_schema(engine)
+        app = create_app()
+        override_databases(app, engine, cache=cache)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield BenchApp(app, client, engine)
+        await engine.dispose()
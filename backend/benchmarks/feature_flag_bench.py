@@ -0,0 +1,63 @@
+"""Feature flag evaluations per second: interpreting the rule per call vs compiled evaluators.
+
+The interpreted row walks the raw rule dict and hashes with sha256 on every
+call, as a straightforward implementation would; the other rows go through
+``FeatureFlags.is_enabled`` with rules compiled once at load time.
+
+Run: python -m benchmarks.feature_flag_bench
+"""
+import hashlib
+from itertools import cycle
+
+from benchmarks.harness import BenchResult, print_results, run_sync
+from core.auth import CurrentUser
+from core.feature_flags import FeatureFlags
+
+ITERATIONS = 200_000
+
+RULES: dict[str, object] = {
+    "kill_switch": False,
+    "admin_tools": {"roles": ["admin"]},
+    "new_export": {"environments": ["production"], "roles": ["admin"], "percentage": 25},
+}
+
+
+def _interpreted(rule: dict, name: str, environment: str, user: CurrentUser) -> bool:
+    if not rule.get("enabled", True) or environment not in rule.get("environments", [environment]):
+        return False
+    if set(rule.get("roles", [])) & set(user.roles):
+        return True
+    digest = hashlib.sha256(f"{name}:{user.id}".encode()).digest()
+    return int.from_bytes(digest[:4], "big") % 10_000 < rule.get("percentage", 0) * 100
+
+
+def _run() -> list[BenchResult]:
+    flags = FeatureFlags(RULES, environment="production")
+    users = cycle([
+        CurrentUser(id=f"user-{i}", email=f"user{i}@local.dev", roles=["user"])
+        for i in range(1_000)
+    ])
+    rollout = RULES["new_export"]
+
+    def interpreted() -> bool:
+        return _interpreted(rollout, "new_export", "production", next(users))
+
+    return [
+        run_sync("interpreted 25% rollout", interpreted, ITERATIONS),
+        *(
+            run_sync(label, lambda flag=flag: flags.is_enabled(flag, next(users)), ITERATIONS)
+            for label, flag in [
+                ("compiled 25% rollout", "new_export"),
+                ("compiled role rule", "admin_tools"),
+                ("compiled boolean", "kill_switch"),
+                ("unknown flag (default on)", "missing"),
+            ]
+        ),
+    ]
+
+def main() -> None:
+    print_results("feature flag evaluations/sec", _run())
+
+
+if __name__ == "__main__":
+    main()
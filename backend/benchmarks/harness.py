@@ -0,0 +1,46 @@
+"""Minimal timing helpers shared by the micro-benchmarks."""
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    iterations: int
+    seconds: float
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.iterations / self.seconds if self.seconds else float("inf")
+
+
+def run_sync(name: str, fn: Callable[[], object], iterations: int) -> BenchResult:
+    """Time ``iterations`` calls of a synchronous function."""
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return BenchResult(name, iterations, time.perf_counter() - start)
+
+
+async def run_async(
+    name: str,
+    fn: Callable[[], Awaitable[object]],
+    iterations: int,
+) -> BenchResult:
+    """Time ``iterations`` sequential awaits of a coroutine function."""
+    await fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return BenchResult(name, iterations, time.perf_counter() - start)
+
+
+def print_results(title: str, results: list[BenchResult]) -> None:
+    """Print results as a table, with speedup relative to the first row."""
+    print(f"\n{title}")
+    baseline = results[0].ops_per_sec
+    for result in results:
+        speedup = result.ops_per_sec / baseline
+        print(f"  {result.name:<32} {result.ops_per_sec:>12,.0f} ops/s  {speedup:>6.1f}x")
@@ -0,0 +1,472 @@
+"""Load test: latency percentiles and throughput of the API under concurrency.
+
+Drives ``main.create_app`` in-process through ASGITransport, and over a real
+socket against a single uvicorn worker in a subprocess, with a throwaway
+SQLite database behind both. Each scenario is run by ``--concurrency``
+closed-loop clients until ``--requests`` requests have completed. Bearer
+tokens are minted locally with RS256 and the app verifies them against the
+matching public key instead of fetching JWKS.
+
+Run: python -m benchmarks.load [--mode inprocess|socket|all] [--concurrency 32]
+     python -m benchmarks.load --save-baseline   # record this machine's baseline
+     python -m benchmarks.load --check           # exit 1 on regression against it
+
+Each mode runs the suite ``--repeat`` times and reports, per scenario, the
+median of every metric across those runs. The gate compares p50 and
+throughput against ``--tolerance``; p95/p99 swing far more between runs, so
+they get the separate, wider ``--tail-tolerance``.
+
+Baselines are JSON files under ``benchmarks/baselines/``, one per mode and
+concurrency. They are only comparable on the machine that recorded them.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+import jwt
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.app_harness import bench_app, create_schema, override_databases
+from core.auth import CurrentUser, get_current_user, token_cache
+from core.config import settings
+from main import create_app
+from server import event_loop, http_protocol
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+MODES = ("inprocess", "socket")
+# No shipped route requires a token yet, so the auth scenarios hit this probe.
+AUTH_PROBE_PATH = "/bench/whoami"
+SERVER_START_TIMEOUT = 30.0
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: str
+    expected_status: int
+    headers: dict[str, str] | None = None
+    # Request body for the n-th request, for scenarios that must not repeat one.
+    body: Callable[[int], Any] | None = None
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def build_scenarios(user_id: int, valid_token: str, forged_token: str) -> list[Scenario]:
+    run = uuid.uuid4().hex[:8]
+    return [
+        Scenario("health", "GET", "/api/health", 200),
+        Scenario(
+            "user_create",
+            "POST",
+            "/api/users",
+            201,
+            body=lambda n: {"email": f"load-{run}-{n}@bench.dev", "name": f"Load {n}"},
+        ),
+        Scenario("user_get", "GET", f"/api/users/{user_id}", 200),
+        Scenario("user_get_404", "GET", "/api/users/2147483647", 404),
+        Scenario(
+            "auth_valid",
+            "GET",
+            AUTH_PROBE_PATH,
+            200,
+            headers={"Authorization": f"Bearer {valid_token}"},
+        ),
+        Scenario(
+            "auth_rejected",
+            "GET",
+            AUTH_PROBE_PATH,
+            401,
+            headers={"Authorization": f"Bearer {forged_token}"},
+        ),
+    ]
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+) -> ScenarioResult:
+    """Keep ``concurrency`` requests in flight until ``requests`` have completed.
+
+    A response with another status than expected, or a transport error,
+    counts as an error; its latency is still recorded.
+    """
+    sequence = itertools.count()
+
+    async def send() -> tuple[float, bool]:
+        body = scenario.body(next(sequence)) if scenario.body else None
+        start = time.perf_counter()
+        try:
+            response = await client.request(
+                scenario.method, scenario.path, json=body, headers=scenario.headers
+            )
+            ok = response.status_code == scenario.expected_status
+        except httpx.HTTPError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    for _ in range(warmup):
+        await send()
+
+    remaining = requests
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            elapsed, ok = await send()
+            latencies.append(elapsed)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=errors,
+        seconds=round(seconds, 4),
+        rps=round(len(latencies) / seconds, 1),
+        p50_ms=round(percentile(latencies, 50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 95) * 1000, 3),
+        p99_ms=round(percentile(latencies, 99) * 1000, 3),
+    )
+
+
+@dataclass(frozen=True)
+class BenchKeys:
+    public_key: RSAPublicKey
+    private_pem: bytes
+    valid_token: str
+    forged_token: str
+
+
+def mint_keys() -> BenchKeys:
+    """A signing key, a token it signed, and a token signed by a key the app does not trust."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    forger = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return BenchKeys(
+        public_key=private_key.public_key(),
+        private_pem=private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ),
+        valid_token=_mint_token(private_key),
+        forged_token=_mint_token(forger),
+    )
+
+
+def _mint_token(private_key: RSAPrivateKey) -> str:
+    return jwt.encode(
+        {
+            "sub": "bench-user",
+            "email": "bench@local.dev",
+            "realm_access": {"roles": ["user"]},
+            "iss": settings.keycloak_issuer,
+            "aud": settings.keycloak_audience,
+            "exp": 9999999999,
+        },
+        private_key,
+        algorithm="RS256",
+    )
+
+
+def add_auth_probe(app: FastAPI) -> None:
+    async def whoami(user: CurrentUser = Depends(get_current_user)) -> dict[str, str]:
+        return {"id": user.id}
+
+    app.add_api_route(AUTH_PROBE_PATH, whoami, methods=["GET"], include_in_schema=False)
+
+
+async def run_suite(
+    client: httpx.AsyncClient,
+    keys: BenchKeys,
+    args: argparse.Namespace,
+) -> dict[str, ScenarioResult]:
+    seed = await client.post(
+        "/api/users", json={"email": f"seed-{uuid.uuid4().hex[:8]}@bench.dev", "name": "Seed"}
+    )
+    seed.raise_for_status()
+    scenarios = build_scenarios(seed.json()["id"], keys.valid_token, keys.forged_token)
+    if args.scenario:
+        scenarios = [s for s in scenarios if s.name in args.scenario]
+    return {
+        scenario.name: await run_scenario(
+            client, scenario, args.concurrency, args.requests, args.warmup
+        )
+        for scenario in scenarios
+    }
+
+
+async def run_inprocess(keys: BenchKeys, args: argparse.Namespace) -> dict[str, ScenarioResult]:
+    token_cache.clear()
+    async with bench_app() as bench:
+        add_auth_probe(bench.app)
+        with patch("core.auth._get_signing_key", return_value=keys.public_key):
+            return await run_suite(bench.client, keys, args)
+
+
+async def run_socket(keys: BenchKeys, args: argparse.Namespace) -> dict[str, ScenarioResult]:
+    with tempfile.TemporaryDirectory() as tmp:
+        key_file = Path(tmp) / "signing-key.pem"
+        key_file.write_bytes(keys.private_pem)
+        port = _free_port()
+        command = [
+            sys.executable, "-m", "benchmarks.load", "--serve",
+            "--port", str(port), "--db", str(Path(tmp) / "bench.db"), "--key-file", str(key_file),
+        ]
+        server = subprocess.Popen(command, cwd=BACKEND_DIR)
+        limits = httpx.Limits(
+            max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+        )
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits
+            ) as client:
+                await _wait_until_up(client, server)
+                return await run_suite(client, keys, args)
+        finally:
+            server.terminate()
+            server.wait(timeout=15)
+
+
+def serve(port: int, db: Path, key_file: Path) -> None:
+    """Entry point of the socket-mode server subprocess."""
+    url = f"sqlite+aiosqlite:///{db}"
+    asyncio.run(_create_database(url))
+    private_key = serialization.load_pem_private_key(key_file.read_bytes(), password=None)
+    app = create_app()
+    override_databases(app, create_async_engine(url))
+    add_auth_probe(app)
+    # The lifespan would warm, poll and dispose the configured database instead.
+    config = uvicorn.Config(
+        app,
+        host="127.0.0.1",
+        port=port,
+        loop=event_loop(),
+        http=http_protocol(),
+        lifespan="off",
+        access_log=False,
+        log_level="warning",
+    )
+    with patch("core.auth._get_signing_key", return_value=private_key.public_key()):
+        uvicorn.Server(config).run()
+
+
+async def _create_database(url: str) -> None:
+    engine = create_async_engine(url)
+    await create_schema(engine)
+    await engine.dispose()
+
+
+async def _wait_until_up(client: httpx.AsyncClient, server: subprocess.Popen) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"bench server exited with status {server.returncode}")
+        try:
+            await client.get("/api/health")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"bench server did not start within {SERVER_START_TIMEOUT:.0f}s")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def median_results(runs: list[dict[str, ScenarioResult]]) -> dict[str, ScenarioResult]:
+    """Per scenario, the median of each metric across runs; errors are summed."""
+    merged = {}
+    for name in runs[0]:
+        results = [run[name] for run in runs]
+        merged[name] = ScenarioResult(
+            requests=sum(r.requests for r in results),
+            errors=sum(r.errors for r in results),
+            seconds=statistics.median(r.seconds for r in results),
+            rps=statistics.median(r.rps for r in results),
+            p50_ms=statistics.median(r.p50_ms for r in results),
+            p95_ms=statistics.median(r.p95_ms for r in results),
+            p99_ms=statistics.median(r.p99_ms for r in results),
+        )
+    return merged
+
+
+def report(mode: str, results: dict[str, ScenarioResult], args: argparse.Namespace) -> dict:
+    return {
+        "mode": mode,
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scenarios": {name: asdict(result) for name, result in results.items()},
+    }
+
+
+def regressions(
+    current: dict, baseline: dict, tolerance: float, tail_tolerance: float,
+) -> list[str]:
+    """Failed requests, and latency or throughput worse than ``baseline``.
+
+    p50 and req/s may be ``tolerance`` worse, p95/p99 ``tail_tolerance`` worse.
+    """
+    problems = []
+    for name, result in current["scenarios"].items():
+        if result["errors"]:
+            problems.append(f"{name}: {result['errors']} unexpected responses")
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        for metric, allowed in (
+            ("p50_ms", tolerance), ("p95_ms", tail_tolerance), ("p99_ms", tail_tolerance),
+        ):
+            limit = base[metric] * (1 + allowed)
+            if result[metric] > limit:
+                problems.append(
+                    f"{name}: {metric} {result[metric]:.2f} > {limit:.2f} "
+                    f"(baseline {base[metric]:.2f})"
+                )
+        floor = base["rps"] * (1 - tolerance)
+        if result["rps"] < floor:
+            problems.append(
+                f"{name}: {result['rps']:.0f} req/s < {floor:.0f} (baseline {base['rps']:.0f})"
+            )
+    return problems
+
+
+def print_report(data: dict) -> None:
+    print(
+        f"\n{data['mode']}: concurrency {data['concurrency']}, "
+        f"{data['requests_per_scenario']} requests per scenario, "
+        f"median of {data['repeat']} runs"
+    )
+    columns = ("p50 ms", "p95 ms", "p99 ms")
+    print(f"  {'scenario':<16}", *(f"{c:>9}" for c in columns), f"{'req/s':>10} {'errors':>7}")
+    for name, r in data["scenarios"].items():
+        print(
+            f"  {name:<16} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['rps']:>10,.0f} {r['errors']:>7}"
+        )
+
+
+def baseline_path(directory: Path, mode: str, concurrency: int) -> Path:
+    return directory / f"{mode}-c{concurrency}.json"
+
+
+def parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--mode", choices=(*MODES, "all"), default="all")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests first")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="runs per mode; metrics are their median"
+    )
+    parser.add_argument("--scenario", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--output", type=Path, help="also write all results to this JSON file")
+    parser.add_argument("--baseline-dir", type=Path, default=BASELINE_DIR)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 on regression")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.3,
+        help="allowed p50 and req/s slowdown, 0.3 = 30%%",
+    )
+    parser.add_argument(
+        "--tail-tolerance", type=float, default=1.0,
+        help="allowed p95/p99 slowdown, 1.0 = twice the baseline",
+    )
+    # Internal: run the socket-mode server.
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--key-file", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.serve:
+        serve(args.port, args.db, args.key_file)
+        return
+
+    keys = mint_keys()
+    runners = {"inprocess": run_inprocess, "socket": run_socket}
+    reports = []
+    failures = []
+    for mode in MODES if args.mode == "all" else (args.mode,):
+        runs = [asyncio.run(runners[mode](keys, args)) for _ in range(args.repeat)]
+        data = report(mode, median_results(runs), args)
+        reports.append(data)
+        print_report(data)
+        path = baseline_path(args.baseline_dir, mode, args.concurrency)
+        if args.save_baseline:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data, indent=2) + "\n")
+            print(f"  baseline written to {path}")
+        elif args.check:
+            if not path.exists():
+                failures.append(f"{mode}: no baseline at {path}; record one with --save-baseline")
+                continue
+            baseline = json.loads(path.read_text())
+            problems = regressions(data, baseline, args.tolerance, args.tail_tolerance)
+            failures += [f"{mode} {problem}" for problem in problems]
+
+    if args.output:
+        args.output.write_text(json.dumps(reports, indent=2) + "\n")
+    if failures:
+        print("\nRegressions:", *failures, sep="\n  ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Requests/sec through the middleware stack: BaseHTTPMiddleware vs pure ASGI request IDs,
+and the cost of adding ServerTimingMiddleware.
+
+Drives the ASGI app directly, without an HTTP client, so the numbers
+reflect middleware overhead rather than transport cost.
+
+Run: python -m benchmarks.middleware_bench
+"""
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message
+
+from benchmarks.harness import print_results, run_async
+from core.middleware import RequestIDMiddleware
+from core.timing import ServerTimingMiddleware
+
+REQUESTS = 20_000
+
+
+def _app(pure_asgi: bool, timing: bool = False) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:4200"])
+    if timing:
+        app.add_middleware(ServerTimingMiddleware)
+    if pure_asgi:
+        app.add_middleware(RequestIDMiddleware)
+    else:
+        @app.middleware("http")
+        async def request_id_middleware(request: Request, call_next: Callable) -> Response:
+            request_id = str(uuid.uuid4())
+            request.state.request_id = request_id
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            return response
+
+    @app.get("/ping")
+    async def ping() -> dict[str, bool]:
+        return {"ok": True}
+
+    return app
+
+
+def _requester(app: ASGIApp) -> Callable[[], Awaitable[None]]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    async def request() -> None:
+        await app(dict(scope), receive, send)
+
+    return request
+
+
+async def _run() -> None:
+    print_results("Middleware stack requests/sec", [
+        await run_async("BaseHTTPMiddleware + uuid4", _requester(_app(False)), REQUESTS),
+        await run_async("RequestIDMiddleware (ASGI)", _requester(_app(True)), REQUESTS),
+        await run_async("+ ServerTimingMiddleware", _requester(_app(True, timing=True)), REQUESTS),
+    ])
+
+
+def main() -> None:
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
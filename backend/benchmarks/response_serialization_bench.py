@@ -0,0 +1,43 @@
+"""Serialized UserResponse bodies per second: FastAPI's response_model pass vs ModelJSONResponse.
+
+The response_model path mirrors what FastAPI does for an endpoint that
+returns a model: validate it against the response field again, dump it to
+JSON-compatible Python, then encode that with json.dumps in JSONResponse.
+
+Run: python -m benchmarks.response_serialization_bench
+"""
+from datetime import UTC, datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks.harness import print_results, run_sync
+from core.responses import ModelJSONResponse
+from features.user.user_model import User
+from features.user.user_schema import UserResponse
+
+ITERATIONS = 50_000
+
+
+def main() -> None:
+    now = datetime.now(UTC)
+    user = User(id=42, email="bench@example.com", name="Bench User", created_at=now, updated_at=now)
+    adapter = TypeAdapter(UserResponse)
+
+    def response_model_pass() -> bytes:
+        model = UserResponse.model_validate(user)
+        validated = adapter.validate_python(model, from_attributes=True)
+        return JSONResponse(jsonable_encoder(adapter.dump_python(validated, mode="json"))).body
+
+    def model_json_response() -> bytes:
+        return ModelJSONResponse(UserResponse.model_validate(user)).body
+
+    print_results("UserResponse bodies/sec", [
+        run_sync("response_model + JSONResponse", response_model_pass, ITERATIONS),
+        run_sync("ModelJSONResponse", model_json_response, ITERATIONS),
+    ])
+
+
+if __name__ == "__main__":
+    main()
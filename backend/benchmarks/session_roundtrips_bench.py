@@ -0,0 +1,79 @@
+"""Database round-trips per GET /api/users/{id}: transactional vs lazy autocommit session.
+
+Counts statements plus the BEGIN/COMMIT a transactional driver such as
+asyncpg sends, so the numbers reflect what PostgreSQL would see. The user
+cache is off, since a cache hit would skip the database altogether.
+
+Run: python -m benchmarks.session_roundtrips_bench
+"""
+import asyncio
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from benchmarks.app_harness import bench_app
+from benchmarks.harness import print_results, run_async
+from core.database import get_read_session
+
+REQUESTS = 500
+
+
+@dataclass
+class RoundTrips:
+    statements: int = 0
+    transaction_control: int = 0
+
+    def total(self) -> int:
+        return self.statements + self.transaction_control
+
+
+def _count(trips: RoundTrips, conn: Connection, *args: object) -> None:
+    if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+        trips.transaction_control += 1
+
+
+async def _run() -> None:
+    async with bench_app(cache=False) as bench:
+        client, engine, overrides = bench.client, bench.engine, bench.app.dependency_overrides
+        created = await client.post("/api/users", json={"email": "b@x.dev", "name": "Bench"})
+        url = f"/api/users/{created.json()['id']}"
+        eager_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def eager_session() -> AsyncGenerator[AsyncSession, None]:
+            async with eager_factory() as session, session.begin():
+                yield session
+
+        trips = RoundTrips()
+
+        def on_statement(*args: object) -> None:
+            trips.statements += 1
+
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", on_statement)
+        event.listen(sync_engine, "begin", lambda conn: _count(trips, conn))
+        event.listen(sync_engine, "commit", lambda conn: _count(trips, conn))
+
+        async def get_user() -> None:
+            await client.get(url)
+
+        rows = []
+        for label, override in (("transactional session", eager_session),
+                                ("lazy autocommit session", overrides[get_read_session])):
+            overrides[get_read_session] = override
+            trips.statements = trips.transaction_control = 0
+            rows.append((label, await run_async(label, get_user, REQUESTS), trips.total()))
+
+    print_results("GET /api/users/{id} requests/sec", [result for _, result, _ in rows])
+    for label, result, total in rows:
+        print(f"  {label:<32} {total / (result.iterations + 1):>6.2f} round-trips/request")
+
+
+def main() -> None:
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Bearer-token verifications per second with and without the verified-token cache.
+
+Run: python -m benchmarks.token_cache_bench
+"""
+import asyncio
+from unittest.mock import patch
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+
+from benchmarks.harness import BenchResult, print_results, run_async
+from core.auth import get_current_user, token_cache
+from core.config import settings
+
+ITERATIONS = 2_000
+
+
+def _mint_token() -> tuple[str, RSAPublicKey]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    token = jwt.encode(
+        {
+            "sub": "bench-user",
+            "email": "bench@local.dev",
+            "realm_access": {"roles": ["user"]},
+            "iss": settings.keycloak_issuer,
+            "aud": settings.keycloak_audience,
+            "exp": 9999999999,
+        },
+        private_key,
+        algorithm="RS256",
+    )
+    return token, private_key.public_key()
+
+
+async def _run() -> list[BenchResult]:
+    token, public_key = _mint_token()
+    header = f"Bearer {token}"
+
+    async def verify_uncached() -> None:
+        token_cache.clear()
+        await get_current_user(authorization=header)
+
+    async def verify_cached() -> None:
+        await get_current_user(authorization=header)
+
+    with patch("core.auth._get_signing_key", return_value=public_key):
+        results = [
+            await run_async("full RS256 verification", verify_uncached, ITERATIONS),
+            await run_async("verified-token cache hit", verify_cached, ITERATIONS),
+        ]
+    token_cache.clear()
+    return results
+
+
+def main() -> None:
+    print_results("get_current_user verifications/sec", asyncio.run(_run()))
+
+
+if __name__ == "__main__":
+    main()
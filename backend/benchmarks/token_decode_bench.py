@@ -0,0 +1,53 @@
+"""RS256 decodes per second with a PEM key versus a pre-parsed RSAPublicKey.
+
+Run: python -m benchmarks.token_decode_bench
+"""
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from benchmarks.harness import print_results, run_sync
+from core.auth import token_decoder
+from core.config import settings
+
+ITERATIONS = 2_000
+
+
+def main() -> None:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = private_key.public_key()
+    pem = public_key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    token = jwt.encode(
+        {
+            "sub": "bench-user",
+            "iss": settings.keycloak_issuer,
+            "aud": settings.keycloak_audience,
+            "exp": 9999999999,
+        },
+        private_key,
+        algorithm="RS256",
+    )
+
+    def decode_pem() -> None:
+        jwt.decode(
+            token,
+            pem,
+            algorithms=["RS256"],
+            audience=settings.keycloak_audience,
+            issuer=settings.keycloak_issuer,
+        )
+
+    def decode_parsed() -> None:
+        token_decoder.decode(token, public_key)
+
+    print_results("RS256 decodes/sec", [
+        run_sync("PEM key, per-call options", decode_pem, ITERATIONS),
+        run_sync("parsed key, TokenDecoder", decode_parsed, ITERATIONS),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Resolving 100 user ids: 100 GET /api/users/{id} calls versus one POST /api/users:batchGet.
+
+The user cache is off, so repeated point lookups cost a query each, as they
+would for ids not seen recently.
+
+Run: python -m benchmarks.user_batch_get_bench
+"""
+import asyncio
+import json
+
+from benchmarks.app_harness import bench_app
+from benchmarks.harness import print_results, run_async
+
+IDS_PER_PAGE = 100
+PAGES = 50
+
+
+async def _run() -> None:
+    async with bench_app(cache=False) as bench:
+        client = bench.client
+        response = await client.post(
+            "/api/users:import",
+            content="".join(
+                f'{{"email": "batch{i}@bench.dev", "name": "User {i}"}}\n'
+                for i in range(IDS_PER_PAGE)
+            ),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        ids = [json.loads(line)["id"] for line in response.text.splitlines()]
+
+        async def point_lookups() -> None:
+            for user_id in ids:
+                await client.get(f"/api/users/{user_id}")
+
+        async def batch_get() -> None:
+            await client.post("/api/users:batchGet", json={"ids": ids})
+
+        results = [
+            await run_async("100 x GET /api/users/{id}", point_lookups, PAGES),
+            await run_async("1 x POST /api/users:batchGet", batch_get, PAGES),
+        ]
+    print_results(f"Pages of {IDS_PER_PAGE} users resolved/sec", results)
+
+
+def main() -> None:
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Rows/sec for POST /api/users:import versus one POST /api/users per row.
+
+Run: python -m benchmarks.user_import_bench
+"""
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+from benchmarks.app_harness import bench_app
+from benchmarks.harness import BenchResult, print_results
+
+IMPORT_ROWS = 20_000
+SINGLE_ROWS = 1_000
+CHUNK_ROWS = 200
+
+
+async def _ndjson_body(prefix: str, rows: int) -> AsyncIterator[bytes]:
+    for start in range(0, rows, CHUNK_ROWS):
+        yield "".join(
+            f'{{"email": "{prefix}{i}@bench.dev", "name": "User {i}"}}\n'
+            for i in range(start, min(start + CHUNK_ROWS, rows))
+        ).encode()
+
+
+async def _run() -> list[BenchResult]:
+    async with bench_app() as bench:
+        client = bench.client
+        start = time.perf_counter()
+        for i in range(SINGLE_ROWS):
+            await client.post("/api/users", json={"email": f"single{i}@bench.dev", "name": "U"})
+        single = BenchResult("POST /api/users per row", SINGLE_ROWS, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/users:import",
+            content=_ndjson_body("bulk", IMPORT_ROWS),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        created = response.text.count('"created"')
+        bulk = BenchResult("POST /api/users:import", created, time.perf_counter() - start)
+    return [single, bulk]
+
+
+def main() -> None:
+    print_results("User rows inserted/sec", asyncio.run(_run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,18 @@
 import os
+from collections.abc import AsyncIterator
 
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from core.database import Base, get_session
+from core.cache import cache_backend
+from core.database import (
+    Base,
+    get_read_session,
+    get_session,
+    get_session_factory,
+    get_stream_session_factory,
+)
 from main import app
 
 # Use PostgreSQL in CI, SQLite locally
@@ -23,6 +31,7 @@ async def setup_db():
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    await cache_backend.clear()
 
 
 @pytest.fixture
@@ -32,7 +41,14 @@ async def client():
             async with session.begin():
                 yield session
 
+    async def override_read_session() -> AsyncIterator[AsyncSession]:
+        async with TestSession() as session:
+            yield session
+
     app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_read_session] = override_read_session
+    app.dependency_overrides[get_session_factory] = lambda: TestSession
+    app.dependency_overrides[get_stream_session_factory] = lambda: TestSession
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
@@ -1,13 +1,23 @@
 from dataclasses import dataclass
-from typing import Annotated
+from typing import Annotated, Any
 
-import httpx
 import jwt
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 from fastapi import Header, HTTPException
 
-from core.config import settings
+from core.config import Settings, settings
+from core.http_client import shared_http_client
+from core.jwks import JWKSFetchError, JWKSKeyStore
+from core.timing import Span
+from core.token_cache import VerifiedTokenCache
 
-_jwks_cache: bytes | None = None
+jwks_store = JWKSKeyStore(
+    settings.keycloak_certs_url,
+    ttl=settings.jwks_cache_ttl_seconds,
+    min_refresh_interval=settings.jwks_min_refresh_interval_seconds,
+    timeout=settings.jwks_fetch_timeout_seconds,
+    get_client=shared_http_client.get,
+)
 
 
 @dataclass(frozen=True)
@@ -19,57 +29,86 @@ class CurrentUser:
     roles: list[str]
 
 
-async def _get_signing_key() -> bytes:
-    """Fetch and cache the Keycloak realm's public key (JWKS)."""
-    global _jwks_cache
-    if _jwks_cache is not None:
-        return _jwks_cache
+token_cache: VerifiedTokenCache[CurrentUser] = VerifiedTokenCache(
+    settings.token_cache_max_entries,
+)
+
+
+class TokenDecoder:
+    """Reusable RS256 decoder with algorithms, audience and issuer fixed at startup."""
+
+    def __init__(self, config: Settings) -> None:
+        self._jwt = jwt.PyJWT()
+        self._algorithms = ["RS256"]
+        self._audience = config.keycloak_audience
+        self._issuer = config.keycloak_issuer
+
+    def decode(self, token: str, key: RSAPublicKey) -> dict[str, Any]:
+        return self._jwt.decode(
+            token,
+            key,
+            algorithms=self._algorithms,
+            audience=self._audience,
+            issuer=self._issuer,
+        )
+
+
+token_decoder = TokenDecoder(settings)
 
-    certs_url = (
-        f"{settings.keycloak_url}/realms/{settings.keycloak_realm}"
-        "/protocol/openid-connect/certs"
-    )
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(certs_url)
-        resp.raise_for_status()
-
-    jwks = resp.json()
-    key_data = jwks["keys"][0]
-    public_key = jwt.algorithms.RSAAlgorithm.from_jwk(key_data)
-    from cryptography.hazmat.primitives import serialization
-
-    _jwks_cache = public_key.public_bytes(
-        serialization.Encoding.PEM,
-        serialization.PublicFormat.SubjectPublicKeyInfo,
-    )
-    return _jwks_cache
+
+async def _get_signing_key(kid: str | None) -> RSAPublicKey:
+    """Return the Keycloak realm's public key (JWKS) for the token's ``kid``."""
+    return await jwks_store.get_key(kid)
 
 
 async def get_current_user(
     authorization: Annotated[str | None, Header()] = None,
 ) -> CurrentUser:
     """Validate JWT from Authorization header and return the current user."""
+    with Span("auth"):
+        return await _authenticate(authorization)
+
+
+async def get_optional_user(
+    authorization: Annotated[str | None, Header()] = None,
+) -> CurrentUser | None:
+    """The authenticated user, or None when the request has no usable token.
+
+    Never raises, for endpoints and flags that treat anonymous callers differently.
+    """
+    if not authorization:
+        return None
+    try:
+        return await get_current_user(authorization)
+    except HTTPException:
+        return None
+
+
+async def _authenticate(authorization: str | None) -> CurrentUser:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid token")
 
     token = authorization.removeprefix("Bearer ")
+    cached = token_cache.get(token, jwks_store.generation)
+    if cached is not None:
+        return cached
 
     try:
-        signing_key = await _get_signing_key()
-        payload = jwt.decode(
-            token,
-            signing_key,
-            algorithms=["RS256"],
-            audience=settings.keycloak_audience,
-            issuer=f"{settings.keycloak_url}/realms/{settings.keycloak_realm}",
-        )
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await _get_signing_key(kid)
+        payload = token_decoder.decode(token, signing_key)
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    except JWKSFetchError:
+        raise HTTPException(status_code=503, detail="Authentication service unavailable")
 
     roles = payload.get("realm_access", {}).get("roles", [])
 
-    return CurrentUser(
+    user = CurrentUser(
         id=payload["sub"],
         email=payload.get("email", ""),
         roles=roles,
     )
+    if "exp" in payload:
+        token_cache.put(token, user, payload["exp"], jwks_store.generation)
+    return user
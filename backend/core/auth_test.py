@@ -1,19 +1,14 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import jwt
 import pytest
-from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi import HTTPException
 
-from core.auth import CurrentUser, get_current_user
+from core.auth import CurrentUser, get_current_user, token_cache
 
 _private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
 _public_key = _private_key.public_key()
-_public_pem = _public_key.public_bytes(
-    serialization.Encoding.PEM,
-    serialization.PublicFormat.SubjectPublicKeyInfo,
-)
 
 
 def _make_token(
@@ -37,9 +32,11 @@ def _make_token(
 @pytest.fixture()
 def _mock_jwks() -> object:
     """Patch the JWKS fetcher to return our test public key."""
+    token_cache.clear()
     with patch("core.auth._get_signing_key") as mock:
-        mock.return_value = _public_pem
+        mock.return_value = _public_key
         yield mock
+    token_cache.clear()
 
 
 @pytest.mark.usefixtures("_mock_jwks")
@@ -67,3 +64,10 @@ class TestGetCurrentUser:
         with pytest.raises(HTTPException) as exc_info:
             await get_current_user(authorization=f"Bearer {token}")
         assert exc_info.value.status_code == 401
+
+    async def test_repeated_token_skips_verification(self, _mock_jwks: AsyncMock) -> None:
+        token = _make_token(sub="u2")
+        first = await get_current_user(authorization=f"Bearer {token}")
+        second = await get_current_user(authorization=f"Bearer {token}")
+        assert first == second
+        assert _mock_jwks.await_count == 1
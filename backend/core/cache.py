@@ -0,0 +1,156 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from core.config import Settings, settings
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class CacheBackend(Protocol):
+    """Byte-valued key/value cache with per-entry TTL."""
+
+    stats: CacheStats
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryCache:
+    """In-process TTL cache bounded to ``max_entries`` with LRU eviction.
+
+    Each worker process holds its own copy, so keep TTLs short enough that
+    another worker's writes become visible in acceptable time.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RemoteCacheClient(Protocol):
+    """The subset of an out-of-process cache client we rely on.
+
+    ``redis.asyncio.Redis`` satisfies it as is; tests use an in-memory fake.
+    """
+
+    async def get(self, name: str) -> bytes | None: ...
+
+    async def set(self, name: str, value: bytes, px: int | None = None) -> object: ...
+
+    async def delete(self, *names: str) -> object: ...
+
+
+class RemoteCache:
+    """CacheBackend over a shared out-of-process store, namespaced by ``prefix``.
+
+    Evictions happen inside the store, so ``stats.evictions`` stays at zero;
+    read the store's own counters for those.
+    """
+
+    def __init__(self, client: RemoteCacheClient, prefix: str = "cache:") -> None:
+        self.client = client
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.client.get(self.prefix + key)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        await self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self) -> None:
+        """No-op: the store is shared, so entries are left to expire by TTL."""
+        return None
+
+
+class NullCache:
+    """CacheBackend that stores nothing, for turning caching off."""
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> bytes | None:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        return None
+
+    async def delete(self, *keys: str) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+
+def build_cache_backend(config: Settings) -> CacheBackend:
+    """The process-wide backend selected by ``cache_backend``.
+
+    A RemoteCache needs a client, so deployments that use one build it at
+    startup and override ``get_cache_backend``.
+    """
+    if config.cache_backend == "none":
+        return NullCache()
+    return MemoryCache(config.cache_max_entries)
+
+
+cache_backend: CacheBackend = build_cache_backend(settings)
+
+
+def get_cache_backend() -> CacheBackend:
+    """The shared cache backend."""
+    return cache_backend
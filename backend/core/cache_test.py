@@ -0,0 +1,63 @@
+import time
+
+from core.cache import MemoryCache, RemoteCache
+
+
+class FakeRemoteClient:
+    """Dict-backed stand-in for an out-of-process cache such as Redis."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, tuple[bytes, float]] = {}
+
+    async def get(self, name: str) -> bytes | None:
+        entry = self.data.get(name)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    async def set(self, name: str, value: bytes, px: int | None = None) -> bool:
+        expires_at = time.monotonic() + px / 1000 if px else float("inf")
+        self.data[name] = (value, expires_at)
+        return True
+
+    async def delete(self, *names: str) -> int:
+        return sum(self.data.pop(name, None) is not None for name in names)
+
+
+class TestMemoryCache:
+    async def test_counts_hits_and_misses(self) -> None:
+        cache = MemoryCache(max_entries=10)
+        await cache.set("a", b"1", ttl=60)
+        assert await cache.get("a") == b"1"
+        assert await cache.get("b") is None
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    async def test_evicts_least_recently_used(self) -> None:
+        cache = MemoryCache(max_entries=2)
+        await cache.set("a", b"1", ttl=60)
+        await cache.set("b", b"2", ttl=60)
+        await cache.get("a")
+        await cache.set("c", b"3", ttl=60)
+        assert await cache.get("b") is None
+        assert await cache.get("a") == b"1"
+        assert cache.stats.evictions == 1
+
+    async def test_expires_entries(self) -> None:
+        cache = MemoryCache(max_entries=10)
+        await cache.set("a", b"1", ttl=0.001)
+        time.sleep(0.002)
+        assert await cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestRemoteCache:
+    async def test_round_trips_through_client(self) -> None:
+        client = FakeRemoteClient()
+        cache = RemoteCache(client, prefix="test:")
+        await cache.set("a", b"1", ttl=60)
+        assert "test:a" in client.data
+        assert await cache.get("a") == b"1"
+
+        await cache.delete("a")
+        assert await cache.get("a") is None
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
@@ -0,0 +1,222 @@
+import zlib
+from collections.abc import Callable, Iterable
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional; br is not offered without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional; zstd is not offered without it
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/jsonl",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far without ending the stream."""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts.
+
+    Offers zstd and br when their optional packages are installed, and gzip
+    always. Complete bodies under ``minimum_size`` bytes are sent as is.
+    Streamed bodies are compressed as they arrive and flushed once at least
+    ``minimum_size`` bytes went in since the last flush, so runs of tiny
+    chunks (NDJSON lines) share a flush; the rest goes out with the final
+    chunk. Only text-like content types are compressed, and they always get
+    ``Vary: Accept-Encoding``, even when this request is not compressed.
+    Strong ETags are weakened since the bytes differ from the identity body.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders: dict[str, Callable[[], Encoder]] = {}
+        if zstandard is not None:
+            self.encoders["zstd"] = lambda: ZstdEncoder(zstd_level)
+        if brotli is not None:
+            self.encoders["br"] = lambda: BrotliEncoder(brotli_quality)
+        self.encoders["gzip"] = lambda: GzipEncoder(gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encoders)
+        make_encoder = self.encoders[encoding] if encoding is not None else None
+        responder = _CompressingSender(send, encoding, make_encoder, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingSender:
+    def __init__(
+        self,
+        send: Send,
+        encoding: str | None,
+        make_encoder: Callable[[], Encoder] | None,
+        minimum_size: int,
+    ) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.make_encoder = make_encoder
+        self.minimum_size = minimum_size
+        self._start: Message | None = None
+        self._encoder: Encoder | None = None
+        self._passthrough = False
+        self._unflushed = 0
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            headers = Headers(raw=message.setdefault("headers", []))
+            content_type = headers.get("content-type", "")
+            compressible = (
+                "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if compressible:
+                MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            self._passthrough = (
+                not compressible
+                or self.make_encoder is None
+                or message["status"] in (204, 304)
+            )
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._encoder is None:
+            if not more_body and len(body) < self.minimum_size:
+                await self._flush_start()
+                await self._send(message)
+                return
+            self._encoder = self.make_encoder()
+            headers = MutableHeaders(scope=self._start)
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self._encoder.compress(body) + self._encoder.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._flush_start()
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._flush_start()
+
+        self._unflushed += len(body)
+        body = self._encoder.compress(body)
+        if not more_body:
+            body += self._encoder.finish()
+        elif self._unflushed >= self.minimum_size:
+            body += self._encoder.flush()
+            self._unflushed = 0
+        if body or not more_body:
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self._start is not None:
+            start, self._start = self._start, None
+            await self._send(start)
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> str | None:
+    """Pick the client's highest-weighted encoding, preferring ``available`` order on ties."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    best: str | None = None
+    best_q = 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
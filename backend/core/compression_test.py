@@ -0,0 +1,101 @@
+import gzip
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from starlette.types import Message, Receive, Scope, Send
+
+from core.compression import CompressionMiddleware, negotiate
+
+LARGE = "x" * 4096
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=512)
+
+    @app.get("/large")
+    async def large() -> PlainTextResponse:
+        return PlainTextResponse(LARGE, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small() -> PlainTextResponse:
+        return PlainTextResponse("tiny")
+
+    @app.get("/binary")
+    async def binary() -> Response:
+        return Response(b"\0" * 4096, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        return StreamingResponse(iter(["line 1\n", "line 2\n"]), media_type="application/x-ndjson")
+
+    return app
+
+
+async def _get(path: str, accept_encoding: str = "gzip") -> tuple[int, dict[str, str], bytes]:
+    transport = ASGITransport(app=_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as r:
+            return r.status_code, dict(r.headers), b"".join([c async for c in r.aiter_raw()])
+
+
+class TestCompressionMiddleware:
+    async def test_compresses_large_bodies(self) -> None:
+        _, headers, raw = await _get("/large")
+        assert headers["content-encoding"] == "gzip"
+        assert headers["vary"] == "Accept-Encoding"
+        assert headers["etag"] == 'W/"v1"'
+        assert int(headers["content-length"]) == len(raw)
+        assert gzip.decompress(raw).decode() == LARGE
+
+    async def test_skips_small_and_binary_bodies(self) -> None:
+        _, small_headers, small = await _get("/small")
+        assert "content-encoding" not in small_headers
+        assert small == b"tiny"
+        _, binary_headers, _ = await _get("/binary")
+        assert "content-encoding" not in binary_headers
+
+    async def test_compresses_streams_chunk_by_chunk(self) -> None:
+        _, headers, raw = await _get("/stream")
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        assert zlib.decompress(raw, 16 + zlib.MAX_WBITS) == b"line 1\nline 2\n"
+
+    async def test_leaves_identity_requests_alone(self) -> None:
+        _, headers, raw = await _get("/large", accept_encoding="identity")
+        assert "content-encoding" not in headers
+        assert headers["vary"] == "Accept-Encoding"
+        assert raw.decode() == LARGE
+
+    async def test_coalesces_small_stream_chunks(self) -> None:
+        lines = [b'{"n": %d}\n' % n for n in range(200)]
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            headers = [(b"content-type", b"application/x-ndjson")]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            for line in lines:
+                await send({"type": "http.response.body", "body": line, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+
+        sent: list[Message] = []
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+        await CompressionMiddleware(app, minimum_size=512)(scope, None, send)
+
+        bodies = [m["body"] for m in sent if m["type"] == "http.response.body"]
+        assert len(bodies) < len(lines) / 10
+        assert zlib.decompress(b"".join(bodies), 16 + zlib.MAX_WBITS) == b"".join(lines)
+
+
+class TestNegotiate:
+    def test_prefers_highest_weight_then_server_order(self) -> None:
+        assert negotiate("gzip;q=0.5, br", ["zstd", "br", "gzip"]) == "br"
+        assert negotiate("gzip, br", ["zstd", "br", "gzip"]) == "br"
+        assert negotiate("*", ["zstd", "gzip"]) == "zstd"
+        assert negotiate("gzip;q=0, identity", ["gzip"]) is None
+        assert negotiate("", ["gzip"]) is None
@@ -1,25 +1,158 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Any
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
-from core.config import settings
+from core.config import Settings, settings
+from core.db_pool import TimedQueuePool
+from core.replicas import ReplicaSet, RoutingSession
+from core.timing import instrument_engine
 
-engine = create_async_engine(settings.database_url, echo=settings.debug)
+logger = logging.getLogger(__name__)
+
+
+def engine_options(config: Settings, database_url: str | None = None) -> dict[str, Any]:
+    """Keyword arguments for ``create_async_engine`` derived from settings.
+
+    ``database_url`` defaults to the primary. Pool sizing only applies to
+    server databases; SQLite keeps its default pool. Stale connections are
+    retired by ``pool_recycle``; the per-checkout pre-ping round trip is
+    opt-in for networks that drop idle connections sooner than that.
+    """
+    options: dict[str, Any] = {
+        "echo": config.db_echo,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+    url = make_url(database_url or config.database_url)
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout_seconds,
+        pool_recycle=config.db_pool_recycle_seconds,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": config.db_statement_cache_size,
+            "prepared_statement_cache_size": config.db_statement_cache_size,
+        }
+    return options
+
+
+engine = create_async_engine(settings.database_url, **engine_options(settings))
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
+replica_set = ReplicaSet(
+    [
+        create_async_engine(url, **engine_options(settings, url))
+        for url in settings.database_replica_urls
+    ],
+    strategy=settings.db_replica_strategy,
+    cooldown=settings.db_replica_cooldown_seconds,
+) if settings.database_replica_urls else None
+
+for _engine in [engine, *(replica_set.engines if replica_set else [])]:
+    instrument_engine(_engine.sync_engine)
+
+
+def make_read_session_factory(
+    primary: AsyncEngine,
+    replicas: ReplicaSet | None = None,
+    autocommit: bool = True,
+) -> async_sessionmaker[AsyncSession]:
+    """Session factory for read endpoints: replica-aware, autocommit by default."""
+    return async_sessionmaker(
+        primary.execution_options(isolation_level="AUTOCOMMIT") if autocommit else primary,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        replicas=replicas,
+        autocommit=autocommit,
+    )
+
+
+read_session_factory = make_read_session_factory(engine, replica_set)
+# Server-side cursors need a transaction, so streamed reads do not autocommit.
+stream_session_factory = make_read_session_factory(engine, replica_set, autocommit=False)
+
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
     pass
 
 
+_COMMIT_CALLBACKS = "on_commit_callbacks"
+_commit_tasks: set[asyncio.Task[None]] = set()
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Run ``callback`` once the session's current transaction has committed.
+
+    Nothing runs if it rolls back. SQLAlchemy commits synchronously inside
+    its greenlet, so the callback is started as a task on the running loop
+    right after the commit rather than awaited by it.
+    """
+    sync_session = session.sync_session
+    if not event.contains(sync_session, "after_commit", _run_commit_callbacks):
+        event.listen(sync_session, "after_commit", _run_commit_callbacks)
+        event.listen(sync_session, "after_rollback", _drop_commit_callbacks)
+    sync_session.info.setdefault(_COMMIT_CALLBACKS, []).append(callback)
+
+
+def _run_commit_callbacks(session: Session) -> None:
+    loop = asyncio.get_running_loop()
+    for callback in session.info.pop(_COMMIT_CALLBACKS, ()):
+        task = loop.create_task(_run_commit_callback(callback))
+        _commit_tasks.add(task)
+        task.add_done_callback(_commit_tasks.discard)
+
+
+def _drop_commit_callbacks(session: Session) -> None:
+    session.info.pop(_COMMIT_CALLBACKS, None)
+
+
+async def _run_commit_callback(callback: Callable[[], Awaitable[None]]) -> None:
+    try:
+        await callback()
+    except Exception:
+        logger.exception("After-commit callback failed")
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Yield an async database session."""
     async with async_session_factory() as session:
         async with session.begin():
             yield session
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Session factory for work that outlives a request-scoped session, e.g. streaming."""
+    return async_session_factory
+
+
+def get_stream_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Replica-aware, transactional session factory for streamed reads."""
+    return stream_session_factory
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield a non-transactional session for read-only endpoints.
+
+    A connection is checked out only when the first statement runs, and
+    statements execute in autocommit mode, so reads cost no BEGIN/COMMIT
+    round-trips. Read-only statements go to a replica when configured.
+    """
+    async with read_session_factory() as session:
+        yield session
@@ -0,0 +1,64 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+
+type BatchLoadFn[K, V] = Callable[[list[K]], Awaitable[dict[K, V]]]
+
+
+class DataLoader[K: Hashable, V]:
+    """Coalesces ``load`` calls made in the same event-loop tick into one batch.
+
+    Keys requested before the loop gets a chance to run the scheduled
+    dispatch are handed to ``batch_load`` together; keys missing from its
+    result resolve to None. Results are memoized for the loader's lifetime,
+    so create one per request rather than sharing it across requests.
+    """
+
+    def __init__(self, batch_load: BatchLoadFn[K, V], max_batch_size: int = 500) -> None:
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._futures: dict[K, asyncio.Future[V | None]] = {}
+        self._queue: list[K] = []
+        # The loop only keeps weak references to tasks; hold running batches.
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def load(self, key: K) -> V | None:
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                asyncio.get_running_loop().call_soon(self._dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self) -> None:
+        """Forget memoized results, e.g. after the request wrote to the data."""
+        self._futures = {key: f for key, f in self._futures.items() if not f.done()}
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        task = asyncio.get_running_loop().create_task(self._run_batches(queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batches(self, queue: list[K]) -> None:
+        # Sequential, since batch_load usually shares one database session.
+        for start in range(0, len(queue), self.max_batch_size):
+            await self._run_batch(queue[start:start + self.max_batch_size])
+
+    async def _run_batch(self, keys: list[K]) -> None:
+        try:
+            values = await self.batch_load(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from core.dataloader import DataLoader
+
+
+class TestDataLoader:
+    async def test_coalesces_concurrent_loads(self) -> None:
+        batches: list[list[int]] = []
+
+        async def batch_load(keys: list[int]) -> dict[int, str]:
+            batches.append(keys)
+            return {key: f"user-{key}" for key in keys if key != 3}
+
+        loader: DataLoader[int, str] = DataLoader(batch_load)
+        results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 1, 3)))
+
+        assert results == ["user-1", "user-2", "user-1", None]
+        assert batches == [[1, 2, 3]]
+
+    async def test_memoizes_and_splits_large_batches(self) -> None:
+        batches: list[list[int]] = []
+
+        async def batch_load(keys: list[int]) -> dict[int, int]:
+            batches.append(keys)
+            return {key: key * 10 for key in keys}
+
+        loader: DataLoader[int, int] = DataLoader(batch_load, max_batch_size=2)
+        assert await loader.load_many([1, 2, 3]) == [10, 20, 30]
+        assert await loader.load(2) == 20
+        assert batches == [[1, 2], [3]]
+
+    async def test_propagates_errors_to_every_waiter(self) -> None:
+        async def batch_load(keys: list[int]) -> dict[int, int]:
+            raise RuntimeError("database down")
+
+        loader: DataLoader[int, int] = DataLoader(batch_load)
+        with pytest.raises(RuntimeError):
+            await loader.load_many([1, 2])
@@ -0,0 +1,101 @@
+import math
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from core.timing import record
+
+# Recent-wait average: each checkout weighs in at 20%, and the average
+# fades with e^(-idle / 5 s) between checkouts.
+RECENT_WAIT_WEIGHT = 0.2
+RECENT_WAIT_DECAY_SECONDS = 5.0
+
+
+@dataclass
+class PoolWaitStats:
+    """Running totals of time spent waiting for a pool checkout.
+
+    ``recent_seconds`` tracks an exponentially decaying average of recent
+    waits, so it falls back towards zero once checkouts stop waiting, or
+    stop happening at all.
+    """
+
+    checkouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    _recent: float = 0.0
+    _recent_at: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        now = time.monotonic()
+        recent = self.recent_seconds(now)
+        self._recent = recent + (seconds - recent) * RECENT_WAIT_WEIGHT
+        self._recent_at = now
+
+    def recent_seconds(self, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        return self._recent * math.exp(-(now - self._recent_at) / RECENT_WAIT_DECAY_SECONDS)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waits.
+
+    The measured time covers queueing for a free connection and, when the pool
+    grows into its overflow, opening the new connection.
+    """
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_stats.record(waited)
+            record("pool", waited)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Point-in-time view of an engine's connection pool."""
+
+    size: int
+    capacity: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    wait_seconds_recent: float
+
+
+def pool_stats(engine: AsyncEngine) -> PoolStats:
+    """Read live counters from ``engine``'s pool.
+
+    Pools without sizing (e.g. SQLite's static pool) report zeros.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return PoolStats(0, 0, 0, 0, 0, 0, 0.0, 0.0, 0.0)
+    wait = pool.wait_stats if isinstance(pool, TimedQueuePool) else PoolWaitStats()
+    return PoolStats(
+        size=pool.size(),
+        capacity=pool.size() + max(pool._max_overflow, 0),
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        checkouts=wait.checkouts,
+        wait_seconds_total=wait.total_seconds,
+        wait_seconds_max=wait.max_seconds,
+        wait_seconds_recent=wait.recent_seconds(),
+    )
@@ -0,0 +1,62 @@
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import Settings
+from core.database import engine_options
+from core.db_pool import PoolWaitStats, TimedQueuePool, pool_stats
+
+
+class TestEngineOptions:
+    def test_postgres_gets_pool_sizing(self) -> None:
+        options = engine_options(Settings(
+            database_url="postgresql+asyncpg://u:p@db/app",
+            db_pool_size=7,
+            db_max_overflow=3,
+            db_statement_cache_size=0,
+        ))
+        assert options["poolclass"] is TimedQueuePool
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["connect_args"]["statement_cache_size"] == 0
+        assert options["echo"] is False
+        assert options["pool_pre_ping"] is False
+
+    def test_sqlite_keeps_default_pool(self) -> None:
+        options = engine_options(Settings(database_url="sqlite+aiosqlite:///:memory:"))
+        assert "pool_size" not in options
+        assert "poolclass" not in options
+
+
+class TestPoolStats:
+    async def test_reports_checked_out_and_overflow(self, tmp_path: Path) -> None:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=TimedQueuePool,
+            pool_size=2,
+            max_overflow=1,
+        )
+        connections = [await engine.connect() for _ in range(3)]
+        await connections[0].execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        assert stats.checked_out == 3
+        assert stats.overflow == 1
+        assert stats.capacity == 3
+        assert stats.checkouts == 3
+
+        for conn in connections:
+            await conn.close()
+        assert pool_stats(engine).checked_out == 0
+        await engine.dispose()
+
+
+class TestPoolWaitStats:
+    def test_recent_wait_decays_without_checkouts(self) -> None:
+        stats = PoolWaitStats()
+        for _ in range(20):
+            stats.record(1.0)
+        now = time.monotonic()
+        assert stats.recent_seconds(now) > 0.9
+        assert stats.recent_seconds(now + 30) < 0.01
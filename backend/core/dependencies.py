@@ -1,14 +1,63 @@
+from functools import partial
+
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from core.database import get_session
-from features.user.user_repository import UserRepository
+from core.cache import CacheBackend, get_cache_backend
+from core.config import settings
+from core.database import (
+    get_read_session,
+    get_session,
+    get_session_factory,
+    get_stream_session_factory,
+)
+from features.user.user_export_service import UserExportService
+from features.user.user_import_service import UserImportService
+from features.user.user_repository import CachedUserRepository
 from features.user.user_service import UserService
 
 
+def _cached_user_repository(session: AsyncSession, cache: CacheBackend) -> CachedUserRepository:
+    return CachedUserRepository(
+        session,
+        cache,
+        ttl=settings.user_cache_ttl_seconds,
+        negative_ttl=settings.user_cache_negative_ttl_seconds,
+    )
+
+
 async def get_user_service(
     session: AsyncSession = Depends(get_session),
+    cache: CacheBackend = Depends(get_cache_backend),
 ) -> UserService:
     """Wire up the UserService with its repository."""
-    repository = UserRepository(session)
+    repository = _cached_user_repository(session, cache)
     return UserService(repository)
+
+
+async def get_read_user_service(
+    session: AsyncSession = Depends(get_read_session),
+    cache: CacheBackend = Depends(get_cache_backend),
+) -> UserService:
+    """Wire up a UserService whose reads may be served by a replica."""
+    repository = _cached_user_repository(session, cache)
+    return UserService(repository)
+
+
+async def get_user_import_service(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    cache: CacheBackend = Depends(get_cache_backend),
+) -> UserImportService:
+    """Wire up the bulk importer, which opens one transaction per batch."""
+    return UserImportService(
+        session_factory,
+        settings.user_import_batch_size,
+        repository_factory=partial(_cached_user_repository, cache=cache),
+    )
+
+
+async def get_user_export_service(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_stream_session_factory),
+) -> UserExportService:
+    """Wire up the streaming exporter, which reads through a server-side cursor."""
+    return UserExportService(session_factory)
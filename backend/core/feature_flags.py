@@ -1,9 +1,139 @@
+import asyncio
 import json
-import os
-from functools import lru_cache
+import logging
+import zlib
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
 
 from fastapi import Depends, HTTPException, status
 
+from core.auth import CurrentUser, get_optional_user
+from core.config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+Evaluator = Callable[[CurrentUser | None], bool]
+# Rollout buckets are basis points, so percentages may have two decimals.
+BUCKETS = 10_000
+
+
+class FlagRuleError(ValueError):
+    """A flag rule document could not be compiled."""
+
+
+@dataclass(frozen=True)
+class FlagRule:
+    """One flag's rule, as written in ``FEATURE_FLAGS`` or the flags file.
+
+    A rule is either a bare boolean or an object::
+
+        {"enabled": true, "environments": ["staging"], "roles": ["admin"], "percentage": 10}
+
+    The flag is off when ``enabled`` is false or the current environment is
+    not listed. Otherwise it is on for users holding any listed role, and for
+    ``percentage`` percent of the remaining users, bucketed by a stable hash
+    of flag name and user id. ``percentage`` defaults to 100 without
+    ``roles`` and to 0 with them. Anonymous requests only see flags at 100%.
+    """
+
+    enabled: bool = True
+    environments: frozenset[str] | None = None
+    roles: frozenset[str] = frozenset()
+    percentage: float | None = None
+
+    @classmethod
+    def parse(cls, raw: object) -> "FlagRule":
+        if isinstance(raw, bool):
+            return cls(enabled=raw)
+        if not isinstance(raw, Mapping):
+            raise FlagRuleError(f"expected a boolean or an object, got {raw!r}")
+        unknown = raw.keys() - {"enabled", "environments", "roles", "percentage"}
+        if unknown:
+            raise FlagRuleError(f"unknown keys {sorted(unknown)}")
+        enabled = raw.get("enabled", True)
+        if not isinstance(enabled, bool):
+            raise FlagRuleError(f"enabled must be a boolean, got {enabled!r}")
+        percentage = raw.get("percentage")
+        if percentage is not None and (
+            isinstance(percentage, bool) or not isinstance(percentage, int | float)
+        ):
+            raise FlagRuleError(f"percentage must be a number, got {percentage!r}")
+        if percentage is not None and not 0 <= percentage <= 100:
+            raise FlagRuleError(f"percentage must be within 0..100, got {percentage}")
+        environments = raw.get("environments")
+        return cls(
+            enabled=enabled,
+            environments=_names(raw, "environments") if environments is not None else None,
+            roles=_names(raw, "roles"),
+            percentage=percentage,
+        )
+
+    def compile(self, name: str, environment: str) -> Evaluator:
+        """Specialize the rule into the cheapest evaluator that decides it.
+
+        Everything known up front (enabled, environment, a 0 or 100 percent
+        rollout) is folded away, so evaluation does only the per-user work
+        the rule actually needs.
+        """
+        if not self.enabled or (
+            self.environments is not None and environment not in self.environments
+        ):
+            return _never
+        percentage = self.percentage if self.percentage is not None else (
+            0 if self.roles else 100
+        )
+        threshold = round(percentage * BUCKETS / 100)
+        if threshold >= BUCKETS:
+            return _always
+        roles = self.roles
+        if threshold <= 0:
+            if not roles:
+                return _never
+
+            def by_role(user: CurrentUser | None) -> bool:
+                return user is not None and not roles.isdisjoint(user.roles)
+
+            return by_role
+
+        salt = zlib.crc32(f"{name}:".encode())
+
+        def by_rollout(user: CurrentUser | None) -> bool:
+            if user is None:
+                return False
+            if roles and not roles.isdisjoint(user.roles):
+                return True
+            return zlib.crc32(user.id.encode(), salt) % BUCKETS < threshold
+
+        return by_rollout
+
+
+def _names(raw: Mapping[str, object], key: str) -> frozenset[str]:
+    # A bare string would otherwise become the set of its characters.
+    names = raw.get(key, [])
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        raise FlagRuleError(f"{key} must be a list of strings, got {names!r}")
+    return frozenset(names)
+
+
+def _always(user: CurrentUser | None) -> bool:
+    return True
+
+
+def _never(user: CurrentUser | None) -> bool:
+    return False
+
+
+def compile_rules(rules: Mapping[str, object], environment: str) -> dict[str, Evaluator]:
+    """Compile a whole rule document; raises FlagRuleError naming the bad flag."""
+    compiled: dict[str, Evaluator] = {}
+    for name, raw in rules.items():
+        try:
+            compiled[name] = FlagRule.parse(raw).compile(name, environment)
+        except (FlagRuleError, TypeError) as exc:
+            raise FlagRuleError(f"flag {name!r}: {exc}") from exc
+    return compiled
+
 
 class FeatureFlags:
     """Runtime feature toggles within the shipped tier.
@@ -11,29 +141,103 @@ class FeatureFlags:
     Build-time exclusion determines what code EXISTS.
     Runtime flags determine what's ACTIVE among what exists.
     Default: all shipped features are active.
+
+    Rules come from the ``FEATURE_FLAGS`` setting, overlaid by the JSON file
+    at ``feature_flags_file`` when set. Rules are compiled into one evaluator
+    per flag; a reload compiles a complete new table and swaps it in with a
+    single assignment, so readers never see a half-applied document, and a
+    document that fails to compile leaves the current table in place.
     """
 
-    def __init__(self) -> None:
-        raw = os.getenv("FEATURE_FLAGS", "{}")
-        self._flags: dict[str, bool] = json.loads(raw)
+    def __init__(
+        self,
+        rules: Mapping[str, object] | None = None,
+        environment: str = "development",
+        path: str | Path | None = None,
+    ) -> None:
+        self.environment = environment
+        self.base_rules = dict(rules or {})
+        self.path = Path(path) if path is not None else None
+        self.generation = 0
+        self._evaluators = compile_rules(self.base_rules, environment)
+        self._file_stamp: tuple[int, int] | None = None
+        if self.path is not None:
+            self.reload_if_changed()
 
-    def is_enabled(self, feature_name: str) -> bool:
-        """Check if a feature is enabled. Default True (all shipped features active)."""
-        return self._flags.get(feature_name, True)
+    def is_enabled(self, feature_name: str, user: CurrentUser | None = None) -> bool:
+        """Check if a feature is enabled for ``user``. Default True (all shipped features active).
+
+        One dict lookup and one precompiled call, with no locking.
+        """
+        evaluator = self._evaluators.get(feature_name)
+        return True if evaluator is None else evaluator(user)
+
+    def load(self, rules: Mapping[str, object]) -> None:
+        """Compile ``rules`` over the base rules and swap them in atomically."""
+        evaluators = compile_rules({**self.base_rules, **rules}, self.environment)
+        self._evaluators = evaluators
+        self.generation += 1
+
+    def reload_if_changed(self) -> bool:
+        """Reload the flags file if its mtime or size changed; True when reloaded."""
+        if self.path is None:
+            return False
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            stamp = None
+        else:
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._file_stamp:
+            return False
+        try:
+            rules = json.loads(self.path.read_text()) if stamp is not None else {}
+            if not isinstance(rules, dict):
+                raise FlagRuleError("the flags file must hold a JSON object")
+            self.load(rules)
+        except (OSError, ValueError) as exc:
+            logger.error("Keeping current feature flags; %s is invalid: %s", self.path, exc)
+            return False
+        finally:
+            self._file_stamp = stamp
+        logger.info("Loaded feature flags from %s (generation %d)", self.path, self.generation)
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Poll the flags file every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reload_if_changed)
+
+
+def build_feature_flags(config: Settings) -> FeatureFlags:
+    return FeatureFlags(
+        config.feature_flags,
+        environment=config.environment,
+        path=config.feature_flags_file,
+    )
+
+
+feature_flags = build_feature_flags(settings)
 
 
-@lru_cache
 def get_feature_flags() -> FeatureFlags:
-    return FeatureFlags()
+    return feature_flags
 
 
 def require_feature(feature_name: str):
     """FastAPI dependency that gates an endpoint behind a feature flag.
 
     Usage: @router.get("/analytics", dependencies=[Depends(require_feature("analytics"))])
+
+    Role and percentage rules are evaluated for the caller when the request
+    carries a valid token, and for an anonymous user otherwise.
     """
-    async def _check(flags: FeatureFlags = Depends(get_feature_flags)) -> None:
-        if not flags.is_enabled(feature_name):
+    async def _check(
+        flags: FeatureFlags = Depends(get_feature_flags),
+        user: CurrentUser | None = Depends(get_optional_user),
+    ) -> None:
+        if not flags.is_enabled(feature_name, user):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Feature '{feature_name}' is not enabled",
@@ -0,0 +1,108 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from core.auth import CurrentUser
+from core.feature_flags import FeatureFlags, FlagRuleError
+
+
+def _user(user_id: str = "u1", roles: list[str] | None = None) -> CurrentUser:
+    return CurrentUser(id=user_id, email=f"{user_id}@test.com", roles=roles or ["user"])
+
+
+class TestFeatureFlags:
+    def test_unknown_flag_defaults_on(self) -> None:
+        assert FeatureFlags().is_enabled("anything")
+
+    def test_boolean_rules(self) -> None:
+        flags = FeatureFlags({"on": True, "off": False})
+        assert flags.is_enabled("on")
+        assert not flags.is_enabled("off", _user())
+
+    def test_environment_rule(self) -> None:
+        rules = {"beta": {"environments": ["staging"]}}
+        assert FeatureFlags(rules, environment="staging").is_enabled("beta")
+        assert not FeatureFlags(rules, environment="production").is_enabled("beta")
+
+    def test_role_rule(self) -> None:
+        flags = FeatureFlags({"admin_tools": {"roles": ["admin"]}})
+        assert flags.is_enabled("admin_tools", _user(roles=["admin"]))
+        assert not flags.is_enabled("admin_tools", _user())
+        assert not flags.is_enabled("admin_tools", None)
+
+    def test_percentage_rollout_is_stable_and_proportional(self) -> None:
+        flags = FeatureFlags({"export": {"percentage": 25}})
+        users = [_user(f"user-{i}") for i in range(4_000)]
+        enabled = [flags.is_enabled("export", u) for u in users]
+        assert 0.22 < sum(enabled) / len(users) < 0.28
+        assert enabled == [flags.is_enabled("export", u) for u in users]
+        assert not flags.is_enabled("export", None)
+
+    def test_rollout_buckets_differ_per_flag(self) -> None:
+        flags = FeatureFlags({"a": {"percentage": 50}, "b": {"percentage": 50}})
+        users = [_user(f"user-{i}") for i in range(200)]
+        assert [flags.is_enabled("a", u) for u in users] != [
+            flags.is_enabled("b", u) for u in users
+        ]
+
+    def test_roles_bypass_rollout(self) -> None:
+        flags = FeatureFlags({"export": {"roles": ["admin"], "percentage": 0.01}})
+        assert all(
+            flags.is_enabled("export", _user(f"admin-{i}", ["admin"])) for i in range(100)
+        )
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            {"percentage": 150},
+            {"roles": ["admin"], "colour": "red"},
+            "yes",
+            {"roles": "admin"},
+            {"roles": ["admin", 1]},
+            {"environments": "staging"},
+            {"enabled": "false"},
+            {"enabled": 0},
+            {"percentage": True},
+            {"percentage": "10"},
+        ],
+    )
+    def test_invalid_rules_raise(self, rule: object) -> None:
+        with pytest.raises(FlagRuleError):
+            FeatureFlags({"bad": rule})
+
+
+class TestFlagsFileReload:
+    def _write(self, path: Path, rules: object, mtime_ns: int) -> None:
+        path.write_text(json.dumps(rules))
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_file_overrides_base_rules_and_reloads(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.json"
+        self._write(path, {"beta": False}, 1_000_000_000)
+        flags = FeatureFlags({"beta": True, "other": False}, path=path)
+        assert not flags.is_enabled("beta")
+        assert not flags.is_enabled("other")
+
+        self._write(path, {"beta": True}, 2_000_000_000)
+        assert flags.reload_if_changed()
+        assert flags.is_enabled("beta")
+        assert not flags.reload_if_changed()
+
+    def test_invalid_file_keeps_current_flags(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.json"
+        self._write(path, {"beta": False}, 1_000_000_000)
+        flags = FeatureFlags(path=path)
+        path.write_text("{not json")
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+        assert not flags.reload_if_changed()
+        assert not flags.is_enabled("beta")
+
+    def test_removed_file_falls_back_to_base_rules(self, tmp_path: Path) -> None:
+        path = tmp_path / "flags.json"
+        self._write(path, {"beta": False}, 1_000_000_000)
+        flags = FeatureFlags({"beta": True}, path=path)
+        path.unlink()
+        assert flags.reload_if_changed()
+        assert flags.is_enabled("beta")
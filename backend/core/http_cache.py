@@ -0,0 +1,75 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from core.config import settings
+
+
+@dataclass(frozen=True)
+class Validators:
+    """ETag and Last-Modified of one version of a resource.
+
+    The ETag is weak: it names a version, not a byte sequence, so it stays
+    the same whether or not the body is compressed, 304s included.
+    """
+
+    etag: str
+    last_modified: datetime
+
+    @classmethod
+    def for_version(cls, *key: object, updated_at: datetime) -> "Validators":
+        """Validators for the resource identified by ``key`` as of ``updated_at``.
+
+        Naive timestamps, as returned for ``TIMESTAMP WITHOUT TIME ZONE``
+        columns, are taken to be UTC.
+        """
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=UTC)
+        updated_at = updated_at.astimezone(UTC)
+        digest = hashlib.blake2b(repr((*key, updated_at.isoformat())).encode(), digest_size=12)
+        return cls(etag=f'W/"{digest.hexdigest()}"', last_modified=updated_at)
+
+    def headers(self, cache_control: str) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": cache_control,
+        }
+
+    def is_fresh(self, request_headers: Headers) -> bool:
+        """Whether the client's conditional headers show it already has this version.
+
+        If-None-Match uses weak comparison, as RFC 9110 prescribes for GET,
+        and takes precedence over If-Modified-Since.
+        """
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return self.last_modified.replace(microsecond=0) <= since
+
+    def not_modified(self, cache_control: str) -> Response:
+        return Response(status_code=304, headers=self.headers(cache_control))
+
+
+def is_conditional(request_headers: Headers) -> bool:
+    """Whether the request carries validators worth a cheap version probe."""
+    return "if-none-match" in request_headers or "if-modified-since" in request_headers
+
+
+def cache_control(route_name: str, default: str) -> str:
+    """Cache-Control for a route, overridable per route name via ``http_cache_control``."""
+    return settings.http_cache_control.get(route_name, default)
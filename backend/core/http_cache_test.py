@@ -0,0 +1,50 @@
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import pytest
+from starlette.datastructures import Headers
+
+from core import http_cache
+from core.http_cache import Validators
+
+UPDATED_AT = datetime(2026, 3, 1, 12, 0, 0, 500_000)
+
+
+class TestValidators:
+    def test_etag_tracks_version(self) -> None:
+        first = Validators.for_version("user", 1, updated_at=UPDATED_AT)
+        assert first == Validators.for_version("user", 1, updated_at=UPDATED_AT)
+        later = Validators.for_version("user", 1, updated_at=UPDATED_AT + timedelta(seconds=1))
+        assert later.etag != first.etag
+
+    def test_etag_is_weak(self) -> None:
+        # Compression weakens strong ETags; a weak one is the same on 200 and 304.
+        validators = Validators.for_version("user", 1, updated_at=UPDATED_AT)
+        assert validators.etag.startswith('W/"')
+
+    def test_if_none_match_uses_weak_comparison(self) -> None:
+        validators = Validators.for_version("user", 1, updated_at=UPDATED_AT)
+        opaque = validators.etag.removeprefix("W/")
+        assert validators.is_fresh(Headers({"if-none-match": f'"x", {validators.etag}'}))
+        assert validators.is_fresh(Headers({"if-none-match": opaque}))
+        assert validators.is_fresh(Headers({"if-none-match": "*"}))
+        assert not validators.is_fresh(Headers({"if-none-match": '"x"'}))
+
+    def test_if_none_match_takes_precedence(self) -> None:
+        validators = Validators.for_version("user", 1, updated_at=UPDATED_AT)
+        since = format_datetime(UPDATED_AT.replace(tzinfo=UTC), usegmt=True)
+        headers = Headers({"if-none-match": '"x"', "if-modified-since": since})
+        assert not validators.is_fresh(headers)
+
+    def test_if_modified_since_ignores_subsecond_precision(self) -> None:
+        validators = Validators.for_version("user", 1, updated_at=UPDATED_AT)
+        since = validators.headers("no-cache")["Last-Modified"]
+        assert validators.is_fresh(Headers({"if-modified-since": since}))
+        assert not validators.is_fresh(Headers({"if-modified-since": "garbage"}))
+
+
+class TestCacheControl:
+    def test_route_override_wins(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setitem(http_cache.settings.http_cache_control, "get_user", "max-age=60")
+        assert http_cache.cache_control("get_user", "no-cache") == "max-age=60"
+        assert http_cache.cache_control("other", "no-cache") == "no-cache"
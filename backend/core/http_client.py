@@ -0,0 +1,39 @@
+import httpx
+
+from core.config import Settings, settings
+
+
+class SharedHTTPClient:
+    """One pooled, keep-alive ``httpx.AsyncClient`` for the process's outbound calls.
+
+    The client is created on first use and closed by the application
+    lifespan; a later ``get`` opens a fresh one, so a closed client is never
+    handed out across reloads or test apps.
+    """
+
+    def __init__(self, config: Settings) -> None:
+        self.limits = httpx.Limits(
+            max_connections=config.http_client_max_connections,
+            max_keepalive_connections=config.http_client_max_keepalive_connections,
+            keepalive_expiry=config.http_client_keepalive_expiry_seconds,
+        )
+        self.timeout = httpx.Timeout(config.http_client_timeout_seconds)
+        self._client: httpx.AsyncClient | None = None
+
+    def get(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+
+shared_http_client = SharedHTTPClient(settings)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared outbound HTTP client."""
+    return shared_http_client.get()
@@ -0,0 +1,18 @@
+from core.config import Settings
+from core.http_client import SharedHTTPClient
+
+
+class TestSharedHTTPClient:
+    async def test_reuses_one_client(self) -> None:
+        shared = SharedHTTPClient(Settings())
+        assert shared.get() is shared.get()
+        await shared.aclose()
+
+    async def test_reopens_after_close(self) -> None:
+        shared = SharedHTTPClient(Settings())
+        first = shared.get()
+        await shared.aclose()
+        assert first.is_closed
+        second = shared.get()
+        assert second is not first and not second.is_closed
+        await shared.aclose()
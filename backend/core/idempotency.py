@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from typing import Annotated, Protocol
+
+from fastapi import Depends, Header, HTTPException, Request
+from sqlalchemy import JSON, LargeBinary, String, delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Mapped, mapped_column
+from starlette.responses import Response
+
+from core.config import Settings, settings
+from core.database import Base, async_session_factory
+
+# Response headers replayed with a stored response; per-request ones are not.
+REPLAYED_HEADERS = frozenset({"content-type", "location", "etag", "last-modified", "cache-control"})
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A completed response, kept for replay to retries of the same request."""
+
+    fingerprint: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+    def to_response(self) -> Response:
+        headers = {**self.headers, "Idempotent-Replayed": "true"}
+        return Response(self.body, status_code=self.status_code, headers=headers)
+
+
+class Claim(Enum):
+    ACQUIRED = "acquired"
+    IN_PROGRESS = "in_progress"
+
+
+class IdempotencyStore(Protocol):
+    async def begin(self, key: str, fingerprint: str) -> StoredResponse | Claim:
+        """Claim ``key`` for a new execution, or report its stored response or IN_PROGRESS."""
+        ...
+
+    async def complete(self, key: str, response: StoredResponse) -> None: ...
+
+    async def release(self, key: str) -> None:
+        """Drop an unfinished claim so a retry executes the request again."""
+        ...
+
+
+class MemoryIdempotencyStore:
+    """Per-process store bounded to ``max_entries``, least recently used first out.
+
+    Completed responses are kept for ``ttl`` seconds; a claim whose request
+    never finished expires after ``lock_ttl`` seconds.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, lock_ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._entries: OrderedDict[str, tuple[float, StoredResponse | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def begin(self, key: str, fingerprint: str) -> StoredResponse | Claim:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            return Claim.IN_PROGRESS if entry[1] is None else entry[1]
+        self._put(key, now + self.lock_ttl, None)
+        return Claim.ACQUIRED
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        self._put(key, time.monotonic() + self.ttl, response)
+
+    async def release(self, key: str) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is None:
+            del self._entries[key]
+
+    def _put(self, key: str, expires_at: float, value: StoredResponse | None) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class IdempotencyRecord(Base):
+    """A claimed Idempotency-Key; the response columns are NULL until it completes."""
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(MAX_KEY_LENGTH + 64), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[int | None]
+    headers: Mapped[dict[str, str] | None] = mapped_column(JSON)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary)
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+
+
+class DatabaseIdempotencyStore:
+    """Store in the ``idempotency_keys`` table, shared by every worker.
+
+    A claim is an INSERT ... ON CONFLICT DO NOTHING, so exactly one worker
+    wins a key; the others see it in progress until it completes. Expired
+    rows are replaced when their key is reused and removed by
+    ``purge_expired``. Timestamps are naive UTC, like the other tables.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        ttl: float,
+        lock_ttl: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl)
+        self.lock_ttl = timedelta(seconds=lock_ttl)
+
+    async def begin(self, key: str, fingerprint: str) -> StoredResponse | Claim:
+        now = _utcnow()
+        async with self.session_factory() as session, session.begin():
+            await session.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key, IdempotencyRecord.expires_at <= now
+                )
+            )
+            dialect = session.get_bind().dialect.name
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            claimed = await session.execute(
+                insert(IdempotencyRecord)
+                .values(key=key, fingerprint=fingerprint, expires_at=now + self.lock_ttl)
+                .on_conflict_do_nothing(index_elements=["key"])
+                .returning(IdempotencyRecord.key)
+            )
+            if claimed.scalar_one_or_none() is not None:
+                return Claim.ACQUIRED
+            row = await session.get(IdempotencyRecord, key)
+            if row is None or row.status_code is None:
+                return Claim.IN_PROGRESS
+            return StoredResponse(
+                row.fingerprint, row.status_code, row.headers or {}, row.body or b""
+            )
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        async with self.session_factory() as session, session.begin():
+            await session.execute(
+                update(IdempotencyRecord)
+                .where(IdempotencyRecord.key == key)
+                .values(
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    body=response.body,
+                    expires_at=_utcnow() + self.ttl,
+                )
+            )
+
+    async def release(self, key: str) -> None:
+        async with self.session_factory() as session, session.begin():
+            await session.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key, IdempotencyRecord.status_code.is_(None)
+                )
+            )
+
+    async def purge_expired(self) -> int:
+        """Delete every expired row; returns how many were removed."""
+        async with self.session_factory() as session, session.begin():
+            result = await session.execute(
+                delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= _utcnow())
+            )
+        return result.rowcount
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class IdempotentReplayError(Exception):
+    """Raised by the dependency to answer with a stored response instead of the endpoint."""
+
+    def __init__(self, response: Response) -> None:
+        self.response = response
+
+
+class IdempotentCall:
+    """Handle for a request that holds its Idempotency-Key claim."""
+
+    def __init__(self, manager: "Idempotency", key: str, fingerprint: str) -> None:
+        self.manager = manager
+        self.key = key
+        self.fingerprint = fingerprint
+        self.response: StoredResponse | None = None
+        self.finished = False
+
+    def save(self, response: Response) -> Response:
+        """Keep ``response`` for replay once the request commits; returns it unchanged."""
+        headers = {k: v for k, v in response.headers.items() if k in REPLAYED_HEADERS}
+        self.response = StoredResponse(
+            self.fingerprint, response.status_code, headers, response.body
+        )
+        return response
+
+    async def finish(self) -> None:
+        """Store the saved response, or release the claim if none was saved."""
+        if self.response is None:
+            await self.abandon()
+        elif not self.finished:
+            self.finished = True
+            await self.manager.complete(self.key, self.response)
+
+    async def abandon(self) -> None:
+        if not self.finished:
+            self.finished = True
+            await self.manager.release(self.key)
+
+
+class Idempotency:
+    """Coordinates Idempotency-Key claims in front of a store.
+
+    Duplicates arriving at this worker while the first request runs wait
+    for it and replay its response, so they cost one execution in total.
+    Duplicates held by another worker get 409 until the first completes.
+    A replayed key must come with the same request: another method, path
+    or body gets 422.
+    """
+
+    def __init__(self, store: IdempotencyStore) -> None:
+        self.store = store
+        self.coalesced = 0
+        self.replayed = 0
+        self._inflight: dict[str, asyncio.Future[StoredResponse | None]] = {}
+
+    async def begin(self, key: str, fingerprint: str) -> IdempotentCall:
+        """Claim ``key``; raises IdempotentReplayError or HTTPException when not to execute."""
+        while (pending := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            stored = await asyncio.shield(pending)
+            if stored is not None:
+                raise self._replay(stored, fingerprint)
+            # The first request failed and released the key; claim it ourselves.
+
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            outcome = await self.store.begin(key, fingerprint)
+        except BaseException:
+            self._resolve(key, None)
+            raise
+        if outcome is Claim.ACQUIRED:
+            return IdempotentCall(self, key, fingerprint)
+        self._resolve(key, None)
+        if outcome is Claim.IN_PROGRESS:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": "1"},
+            )
+        raise self._replay(outcome, fingerprint)
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        try:
+            await self.store.complete(key, response)
+        finally:
+            self._resolve(key, response)
+
+    async def release(self, key: str) -> None:
+        try:
+            await self.store.release(key)
+        finally:
+            self._resolve(key, None)
+
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> Exception:
+        if stored.fingerprint != fingerprint:
+            return HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        self.replayed += 1
+        return IdempotentReplayError(stored.to_response())
+
+    def _resolve(self, key: str, stored: StoredResponse | None) -> None:
+        future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(stored)
+
+
+def build_idempotency(config: Settings) -> Idempotency:
+    """The process-wide coordinator over the store selected by ``idempotency_backend``."""
+    if config.idempotency_backend == "database":
+        store: IdempotencyStore = DatabaseIdempotencyStore(
+            async_session_factory,
+            ttl=config.idempotency_ttl_seconds,
+            lock_ttl=config.idempotency_lock_seconds,
+        )
+    else:
+        store = MemoryIdempotencyStore(
+            config.idempotency_max_entries,
+            ttl=config.idempotency_ttl_seconds,
+            lock_ttl=config.idempotency_lock_seconds,
+        )
+    return Idempotency(store)
+
+
+idempotency = build_idempotency(settings)
+
+
+def get_idempotency() -> Idempotency:
+    return idempotency
+
+
+async def idempotent_request(
+    request: Request,
+    idempotency_key: Annotated[str | None, Header(max_length=MAX_KEY_LENGTH)] = None,
+    manager: Idempotency = Depends(get_idempotency),
+) -> AsyncIterator[IdempotentCall | None]:
+    """Honor an ``Idempotency-Key`` header on an unsafe endpoint.
+
+    Declare it before the endpoint's service dependency: a retry of a
+    completed request is answered from the store before any session is
+    opened or the service is built, and this dependency is torn down after
+    the session's. Without the header this yields None. Otherwise the
+    endpoint finishes with ``return call.save(response)``, and the response
+    is stored only once the request's transaction has committed. If the
+    endpoint or the commit raises instead, the claim is released and a
+    retry runs again.
+    """
+    if idempotency_key is None:
+        yield None
+        return
+    route = request.scope.get("route")
+    template = getattr(route, "path_format", request.url.path)
+    key = f"{request.method} {template}|{idempotency_key}"
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    call = await manager.begin(key, digest.hexdigest())
+    try:
+        yield call
+    except BaseException:
+        await call.abandon()
+        raise
+    await call.finish()
+
+
+async def replay_handler(request: Request, exc: IdempotentReplayError) -> Response:
+    return exc.response
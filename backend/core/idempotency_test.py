@@ -0,0 +1,114 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.idempotency import (
+    Claim,
+    DatabaseIdempotencyStore,
+    Idempotency,
+    IdempotencyRecord,
+    IdempotentReplayError,
+    MemoryIdempotencyStore,
+    StoredResponse,
+)
+
+STORED = StoredResponse("fp", 201, {"content-type": "application/json"}, b'{"id":1}')
+
+
+class TestMemoryIdempotencyStore:
+    async def test_claim_then_replay(self) -> None:
+        store = MemoryIdempotencyStore(max_entries=10, ttl=60, lock_ttl=10)
+        assert await store.begin("k", "fp") is Claim.ACQUIRED
+        assert await store.begin("k", "fp") is Claim.IN_PROGRESS
+        await store.complete("k", STORED)
+        assert await store.begin("k", "fp") == STORED
+
+    async def test_release_frees_the_key(self) -> None:
+        store = MemoryIdempotencyStore(max_entries=10, ttl=60, lock_ttl=10)
+        await store.begin("k", "fp")
+        await store.release("k")
+        assert await store.begin("k", "fp") is Claim.ACQUIRED
+
+    async def test_expired_entries_are_reclaimed(self) -> None:
+        store = MemoryIdempotencyStore(max_entries=10, ttl=0, lock_ttl=10)
+        await store.begin("k", "fp")
+        await store.complete("k", STORED)
+        assert await store.begin("k", "fp") is Claim.ACQUIRED
+
+    async def test_bounded_to_max_entries(self) -> None:
+        store = MemoryIdempotencyStore(max_entries=2, ttl=60, lock_ttl=10)
+        for key in ("a", "b", "c"):
+            await store.begin(key, "fp")
+        assert len(store) == 2
+
+
+@pytest.fixture
+async def db_store(tmp_path: Path) -> AsyncIterator[DatabaseIdempotencyStore]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(IdempotencyRecord.__table__.create)
+    yield DatabaseIdempotencyStore(
+        async_sessionmaker(engine, expire_on_commit=False), ttl=60, lock_ttl=10
+    )
+    await engine.dispose()
+
+
+class TestDatabaseIdempotencyStore:
+    async def test_claim_then_replay(self, db_store: DatabaseIdempotencyStore) -> None:
+        assert await db_store.begin("k", "fp") is Claim.ACQUIRED
+        assert await db_store.begin("k", "fp") is Claim.IN_PROGRESS
+        await db_store.complete("k", STORED)
+        assert await db_store.begin("k", "fp") == STORED
+
+    async def test_release_frees_the_key(self, db_store: DatabaseIdempotencyStore) -> None:
+        await db_store.begin("k", "fp")
+        await db_store.release("k")
+        assert await db_store.begin("k", "fp") is Claim.ACQUIRED
+
+    async def test_purges_expired_rows(self, db_store: DatabaseIdempotencyStore) -> None:
+        db_store.lock_ttl = timedelta(0)
+        await db_store.begin("a", "fp")
+        await db_store.begin("b", "fp")
+        assert await db_store.purge_expired() == 2
+        assert await db_store.begin("a", "fp") is Claim.ACQUIRED
+
+
+class TestIdempotency:
+    async def test_coalesces_in_flight_duplicates(self) -> None:
+        manager = Idempotency(MemoryIdempotencyStore(max_entries=10, ttl=60, lock_ttl=10))
+        executions = 0
+
+        async def request() -> str:
+            nonlocal executions
+            try:
+                call = await manager.begin("k", "fp")
+            except IdempotentReplayError as replay:
+                return replay.response.body.decode()
+            executions += 1
+            await asyncio.sleep(0.01)
+            await manager.complete(call.key, STORED)
+            return STORED.body.decode()
+
+        bodies = await asyncio.gather(*(request() for _ in range(5)))
+        assert executions == 1
+        assert set(bodies) == {'{"id":1}'}
+        assert manager.coalesced == 4
+
+    async def test_released_key_runs_again(self) -> None:
+        manager = Idempotency(MemoryIdempotencyStore(max_entries=10, ttl=60, lock_ttl=10))
+        call = await manager.begin("k", "fp")
+        await call.abandon()
+        assert (await manager.begin("k", "fp")).key == "k"
+
+    async def test_fingerprint_mismatch_is_rejected(self) -> None:
+        manager = Idempotency(MemoryIdempotencyStore(max_entries=10, ttl=60, lock_ttl=10))
+        call = await manager.begin("k", "fp")
+        await manager.complete(call.key, STORED)
+        with pytest.raises(HTTPException) as exc_info:
+            await manager.begin("k", "other")
+        assert exc_info.value.status_code == 422
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSFetchError(Exception):
+    """The JWKS endpoint could not be reached or returned an unusable document."""
+
+
+class UnknownKeyError(jwt.PyJWTError):
+    """No signing key matches the token's ``kid``, even after a refresh."""
+
+
+@dataclass
+class JWKSStats:
+    """Counters describing key store activity."""
+
+    fetches: int = 0
+    fetch_errors: int = 0
+    forced_refreshes: int = 0
+    unknown_kid_rejections: int = 0
+
+
+def _parse_jwks(jwks: dict[str, Any]) -> dict[str, RSAPublicKey]:
+    """Map ``kid`` to a parsed public key for every RSA signing key in a JWKS document.
+
+    Parsing once here lets PyJWT use the key object as-is on every decode.
+    """
+    keys: dict[str, RSAPublicKey] = {}
+    for key_data in jwks["keys"]:
+        if key_data.get("kty") != "RSA" or key_data.get("use", "sig") != "sig":
+            continue
+        public_key = jwt.algorithms.RSAAlgorithm.from_jwk(key_data)
+        if isinstance(public_key, RSAPublicKey):
+            keys[key_data.get("kid", "")] = public_key
+    return keys
+
+
+class JWKSKeyStore:
+    """Signing keys fetched from a JWKS endpoint, indexed by ``kid``.
+
+    Once the key set is older than ``ttl`` it is refreshed in the background
+    while callers keep using the current keys. An unknown ``kid`` forces a
+    refresh, at most once per ``min_refresh_interval``; the same interval
+    spaces out retries while no key set could be fetched yet. Concurrent
+    fetches are coalesced, so a cold cache costs a single request to the
+    certs endpoint.
+    Fetches go through the client returned by ``get_client``, typically the
+    process's shared one; without it the store owns a private client.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        ttl: float,
+        min_refresh_interval: float,
+        timeout: float,
+        get_client: Callable[[], httpx.AsyncClient] | None = None,
+    ) -> None:
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self.stats = JWKSStats()
+        self.generation = 0
+        self._get_client = get_client
+        self._client: httpx.AsyncClient | None = None
+        self._keys: dict[str, RSAPublicKey] = {}
+        self._fetched_at: float | None = None
+        self._last_attempt = -math.inf
+        self._inflight: asyncio.Task[None] | None = None
+
+    async def get_key(self, kid: str | None) -> RSAPublicKey:
+        """Return the public key for ``kid``.
+
+        A token without a ``kid`` is accepted only while the set holds exactly one key.
+        """
+        await self._ensure_fresh()
+
+        key = self._lookup(kid)
+        if key is None and time.monotonic() - self._last_attempt >= self.min_refresh_interval:
+            self.stats.forced_refreshes += 1
+            await self.refresh()
+            key = self._lookup(kid)
+        if key is None:
+            self.stats.unknown_kid_rejections += 1
+            raise UnknownKeyError(f"No signing key found for kid {kid!r}")
+        return key
+
+    async def ensure_loaded(self) -> int:
+        """Fetch the key set if none is held yet; return how many keys are held.
+
+        A stale set is refreshed in the background, as in ``get_key``; keys
+        already held keep tokens verifiable while the endpoint is down.
+        """
+        await self._ensure_fresh()
+        if not self._keys:
+            raise JWKSFetchError(f"No usable signing keys at {self.url}")
+        return len(self._keys)
+
+    async def refresh(self) -> None:
+        """Fetch the key set, joining a fetch that is already in flight."""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(self._inflight)
+
+    async def aclose(self) -> None:
+        """Close the HTTP client owned by the store; a shared client is left open."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._get_client is not None:
+            return self._get_client()
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+        return self._client
+
+    def _lookup(self, kid: str | None) -> RSAPublicKey | None:
+        if kid is None:
+            return next(iter(self._keys.values())) if len(self._keys) == 1 else None
+        return self._keys.get(kid)
+
+    async def _ensure_fresh(self) -> None:
+        if self._fetched_at is not None:
+            if time.monotonic() - self._fetched_at >= self.ttl:
+                self._refresh_in_background()
+            return
+        # Cold and the last fetch failed: fail fast rather than hit the endpoint per request.
+        if (
+            self._inflight is None
+            and time.monotonic() - self._last_attempt < self.min_refresh_interval
+        ):
+            raise JWKSFetchError(f"JWKS fetch from {self.url} failed recently; retrying later")
+        await self.refresh()
+
+    def _refresh_in_background(self) -> None:
+        if self._inflight is not None:
+            return
+        if time.monotonic() - self._last_attempt < self.min_refresh_interval:
+            return
+        self._inflight = asyncio.ensure_future(self._fetch())
+        self._inflight.add_done_callback(self._log_background_failure)
+
+    def _log_background_failure(self, task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background JWKS refresh failed; keeping current keys")
+
+    async def _fetch(self) -> None:
+        self._last_attempt = time.monotonic()
+        self.stats.fetches += 1
+        try:
+            resp = await self._http().get(self.url, timeout=self.timeout)
+            resp.raise_for_status()
+            keys = _parse_jwks(resp.json())
+        except (httpx.HTTPError, jwt.PyJWTError, ValueError, KeyError) as exc:
+            self.stats.fetch_errors += 1
+            raise JWKSFetchError(f"Failed to fetch JWKS from {self.url}") from exc
+        finally:
+            self._inflight = None
+
+        if _fingerprint(keys) != _fingerprint(self._keys):
+            self.generation += 1
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+
+def _fingerprint(keys: dict[str, RSAPublicKey]) -> dict[str, tuple[int, int]]:
+    return {
+        kid: (key.public_numbers().n, key.public_numbers().e) for kid, key in keys.items()
+    }
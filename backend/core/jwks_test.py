@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPublicNumbers
+
+from core.jwks import JWKSFetchError, JWKSKeyStore, UnknownKeyError
+
+
+def _make_jwk(kid: str, use: str = "sig") -> tuple[dict[str, str], RSAPublicNumbers]:
+    public_key = rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key()
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(public_key))
+    jwk.update({"kid": kid, "use": use})
+    return jwk, public_key.public_numbers()
+
+
+def _numbers(key: RSAPublicKey) -> RSAPublicNumbers:
+    return key.public_numbers()
+
+
+class StubJWKSServer:
+    """Local certs endpoint serving a mutable key set and counting requests."""
+
+    def __init__(self) -> None:
+        self.keys: list[dict[str, str]] = []
+        self.hits = 0
+        self.status = 200
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                stub.hits += 1
+                body = json.dumps({"keys": stub.keys}).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/certs"
+
+    def __enter__(self) -> "StubJWKSServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubJWKSServer]:
+    with StubJWKSServer() as server:
+        yield server
+
+
+def _store(url: str, ttl: float = 300.0, min_refresh_interval: float = 0.0) -> JWKSKeyStore:
+    return JWKSKeyStore(url, ttl=ttl, min_refresh_interval=min_refresh_interval, timeout=5.0)
+
+
+class TestJWKSKeyStore:
+    async def test_looks_up_key_by_kid(self, stub_server: StubJWKSServer) -> None:
+        jwk_a, numbers_a = _make_jwk("a")
+        jwk_b, numbers_b = _make_jwk("b")
+        stub_server.keys = [jwk_a, jwk_b]
+        store = _store(stub_server.url)
+        assert _numbers(await store.get_key("a")) == numbers_a
+        assert _numbers(await store.get_key("b")) == numbers_b
+        assert stub_server.hits == 1
+        await store.aclose()
+
+    async def test_concurrent_cold_requests_fetch_once(self, stub_server: StubJWKSServer) -> None:
+        jwk, numbers = _make_jwk("a")
+        stub_server.keys = [jwk]
+        store = _store(stub_server.url)
+        keys = await asyncio.gather(*(store.get_key("a") for _ in range(50)))
+        assert {_numbers(key) for key in keys} == {numbers}
+        assert stub_server.hits == 1
+        await store.aclose()
+
+    async def test_unknown_kid_forces_refresh(self, stub_server: StubJWKSServer) -> None:
+        jwk_old, _ = _make_jwk("old")
+        jwk_new, numbers_new = _make_jwk("new")
+        stub_server.keys = [jwk_old]
+        store = _store(stub_server.url)
+        await store.get_key("old")
+        stub_server.keys = [jwk_old, jwk_new]
+        assert _numbers(await store.get_key("new")) == numbers_new
+        assert stub_server.hits == 2
+        assert store.stats.forced_refreshes == 1
+        await store.aclose()
+
+    async def test_forced_refresh_is_rate_limited(self, stub_server: StubJWKSServer) -> None:
+        jwk, _ = _make_jwk("a")
+        stub_server.keys = [jwk]
+        store = _store(stub_server.url, min_refresh_interval=60.0)
+        await store.get_key("a")
+        for _ in range(3):
+            with pytest.raises(UnknownKeyError):
+                await store.get_key("forged")
+        assert stub_server.hits == 1
+        await store.aclose()
+
+    async def test_stale_keys_refresh_in_background(self, stub_server: StubJWKSServer) -> None:
+        jwk, numbers = _make_jwk("a")
+        stub_server.keys = [jwk]
+        store = _store(stub_server.url, ttl=0.0)
+        await store.get_key("a")
+        assert _numbers(await store.get_key("a")) == numbers
+        await store.refresh()
+        assert stub_server.hits >= 2
+        await store.aclose()
+
+    async def test_ignores_encryption_keys(self, stub_server: StubJWKSServer) -> None:
+        jwk_sig, numbers_sig = _make_jwk("sig")
+        jwk_enc, _ = _make_jwk("enc", use="enc")
+        stub_server.keys = [jwk_enc, jwk_sig]
+        store = _store(stub_server.url)
+        assert _numbers(await store.get_key(None)) == numbers_sig
+        with pytest.raises(UnknownKeyError):
+            await store.get_key("enc")
+        await store.aclose()
+
+    async def test_cold_fetch_failure_raises(self, stub_server: StubJWKSServer) -> None:
+        stub_server.status = 500
+        store = _store(stub_server.url)
+        with pytest.raises(JWKSFetchError):
+            await store.get_key("a")
+        await store.aclose()
+
+    async def test_cold_fetch_failure_is_rate_limited(self, stub_server: StubJWKSServer) -> None:
+        stub_server.status = 500
+        store = _store(stub_server.url, min_refresh_interval=60.0)
+        for _ in range(3):
+            with pytest.raises(JWKSFetchError):
+                await store.get_key("a")
+            with pytest.raises(JWKSFetchError):
+                await store.ensure_loaded()
+        assert stub_server.hits == 1
+        await store.aclose()
+
+    async def test_ensure_loaded_fetches_once(self, stub_server: StubJWKSServer) -> None:
+        jwk, _ = _make_jwk("a")
+        stub_server.keys = [jwk]
+        store = _store(stub_server.url)
+        assert await store.ensure_loaded() == 1
+        assert await store.ensure_loaded() == 1
+        assert stub_server.hits == 1
+        await store.aclose()
+
+    async def test_ensure_loaded_raises_without_keys(self, stub_server: StubJWKSServer) -> None:
+        stub_server.keys = []
+        store = _store(stub_server.url)
+        with pytest.raises(JWKSFetchError):
+            await store.ensure_loaded()
+        await store.aclose()
+
+    async def test_shared_client_is_left_open(self, stub_server: StubJWKSServer) -> None:
+        jwk, _ = _make_jwk("a")
+        stub_server.keys = [jwk]
+        async with httpx.AsyncClient() as client:
+            store = JWKSKeyStore(
+                stub_server.url,
+                ttl=300.0,
+                min_refresh_interval=0.0,
+                timeout=5.0,
+                get_client=lambda: client,
+            )
+            await store.get_key("a")
+            await store.aclose()
+            assert not client.is_closed
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine
+from contextlib import (
+    AbstractAsyncContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    suppress,
+)
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.auth import jwks_store
+from core.config import settings
+from core.database import engine, replica_set
+from core.feature_flags import feature_flags
+from core.http_client import shared_http_client
+from core.idempotency import DatabaseIdempotencyStore, idempotency
+from core.metrics import metrics_registry
+from core.outbox_dispatcher import outbox_dispatcher
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[FastAPI], AbstractAsyncContextManager[None]]
+
+
+class Lifespan:
+    """Ordered registry of startup and shutdown hooks, used as the app's lifespan.
+
+    Each hook is an async context manager factory taking the app: code
+    before its ``yield`` runs at startup in registration order, code after
+    it at shutdown in reverse order. If a startup step raises, the hooks
+    already entered are shut down before the error propagates. Features
+    register their own resources at import time::
+
+        @lifespan.register
+        @asynccontextmanager
+        async def search_client(app: FastAPI) -> AsyncIterator[None]:
+            ...
+    """
+
+    def __init__(self) -> None:
+        self.hooks: list[Hook] = []
+
+    def register(self, hook: Hook) -> Hook:
+        self.hooks.append(hook)
+        return hook
+
+    def on_startup(
+        self, func: Callable[[FastAPI], Awaitable[None]]
+    ) -> Callable[[FastAPI], Awaitable[None]]:
+        """Register a startup-only step, e.g. a cache warmer."""
+
+        @asynccontextmanager
+        async def hook(app: FastAPI) -> AsyncIterator[None]:
+            await func(app)
+            yield
+
+        self.register(hook)
+        return func
+
+    def on_shutdown(self, func: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+        """Register a shutdown-only step, e.g. closing a client."""
+
+        @asynccontextmanager
+        async def hook(app: FastAPI) -> AsyncIterator[None]:
+            try:
+                yield
+            finally:
+                await func()
+
+        self.register(hook)
+        return func
+
+    @asynccontextmanager
+    async def __call__(self, app: FastAPI) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        async with AsyncExitStack() as stack:
+            for hook in self.hooks:
+                await stack.enter_async_context(hook(app))
+            logger.info("Startup finished in %.0f ms", (time.perf_counter() - start) * 1000)
+            yield
+
+
+lifespan = Lifespan()
+
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = 3600.0
+
+
+@asynccontextmanager
+async def background(coro: Coroutine[Any, Any, None]) -> AsyncIterator[None]:
+    """Run ``coro`` as a task while the block runs; cancel and await it on exit."""
+    task = asyncio.create_task(coro)
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+async def open_connections(target: AsyncEngine, count: int) -> None:
+    """Check out ``count`` connections at once, then return them to the pool idle."""
+    if count <= 0:
+        return
+    connections = [target.connect() for _ in range(count)]
+    try:
+        opened = await asyncio.gather(*(conn.start() for conn in connections))
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in opened))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in connections), return_exceptions=True)
+
+
+@lifespan.register
+@asynccontextmanager
+async def compiled_app(app: FastAPI) -> AsyncIterator[None]:
+    """Build the middleware stack and OpenAPI schema before the first request needs them."""
+    if app.middleware_stack is None:
+        app.middleware_stack = app.build_middleware_stack()
+    app.openapi()
+    yield
+
+
+@lifespan.register
+@asynccontextmanager
+async def databases(app: FastAPI) -> AsyncIterator[None]:
+    """Fill each pool with warm connections; dispose of every pool on shutdown.
+
+    A database that is down only logs a warning: the readiness probe
+    reports it and requests connect on demand.
+    """
+    count = settings.db_warmup_connections
+    if count is None:
+        count = settings.db_pool_size
+    engines = [engine, *(replica_set.engines if replica_set else [])]
+    results = await asyncio.gather(
+        *(open_connections(e, count) for e in engines), return_exceptions=True
+    )
+    for target, result in zip(engines, results, strict=True):
+        if isinstance(result, BaseException):
+            logger.warning("Could not warm %s: %s", target.url.render_as_string(), result)
+    try:
+        yield
+    finally:
+        await asyncio.gather(*(e.dispose() for e in engines))
+
+
+@lifespan.register
+@asynccontextmanager
+async def outbox(app: FastAPI) -> AsyncIterator[None]:
+    """Run the outbox dispatcher in this worker; every worker shares the backlog.
+
+    It is not started until some handler subscribes: events wait in the table.
+    """
+    if not settings.outbox_dispatcher_enabled or not outbox_dispatcher.handlers:
+        yield
+        return
+    async with background(outbox_dispatcher.run()):
+        yield
+
+
+@lifespan.register
+@asynccontextmanager
+async def http_client(app: FastAPI) -> AsyncIterator[None]:
+    """Close the shared outbound HTTP client and its keep-alive connections."""
+    try:
+        yield
+    finally:
+        await shared_http_client.aclose()
+
+
+@lifespan.register
+@asynccontextmanager
+async def jwks(app: FastAPI) -> AsyncIterator[None]:
+    """Prefetch the JWKS key set so the first authenticated request skips the fetch."""
+    try:
+        await jwks_store.ensure_loaded()
+    except Exception as exc:
+        logger.warning("Could not prefetch JWKS: %s", exc)
+    try:
+        yield
+    finally:
+        await jwks_store.aclose()
+
+
+@lifespan.register
+@asynccontextmanager
+async def feature_flag_watcher(app: FastAPI) -> AsyncIterator[None]:
+    """Poll the feature flags file, when one is configured, and hot-reload it."""
+    if feature_flags.path is None:
+        yield
+        return
+    async with background(feature_flags.watch(settings.feature_flags_reload_interval_seconds)):
+        yield
+
+
+@lifespan.register
+@asynccontextmanager
+async def idempotency_purger(app: FastAPI) -> AsyncIterator[None]:
+    """Delete expired idempotency keys periodically when they are kept in the database."""
+    store = idempotency.store
+    if not isinstance(store, DatabaseIdempotencyStore):
+        yield
+        return
+
+    async def purge() -> None:
+        while True:
+            try:
+                removed = await store.purge_expired()
+                logger.debug("Purged %d expired idempotency keys", removed)
+            except Exception:
+                logger.exception("Purging expired idempotency keys failed")
+            await asyncio.sleep(IDEMPOTENCY_PURGE_INTERVAL_SECONDS)
+
+    async with background(purge()):
+        yield
+
+
+@lifespan.register
+@asynccontextmanager
+async def metrics(app: FastAPI) -> AsyncIterator[None]:
+    """Write this worker's final metrics snapshot so its last counts are kept."""
+    try:
+        yield
+    finally:
+        await metrics_registry.maybe_flush(force=True)
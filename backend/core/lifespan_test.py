@@ -0,0 +1,76 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.lifespan import Lifespan, open_connections
+
+
+class TestLifespan:
+    async def test_shutdown_runs_in_reverse_order(self) -> None:
+        events: list[str] = []
+        lifespan = Lifespan()
+
+        for name in ("a", "b"):
+
+            @lifespan.register
+            @asynccontextmanager
+            async def hook(app: FastAPI, name: str = name) -> AsyncIterator[None]:
+                events.append(f"start {name}")
+                yield
+                events.append(f"stop {name}")
+
+        async with lifespan(FastAPI()):
+            events.append("serving")
+        assert events == ["start a", "start b", "serving", "stop b", "stop a"]
+
+    async def test_startup_and_shutdown_steps(self) -> None:
+        events: list[str] = []
+        lifespan = Lifespan()
+
+        @lifespan.on_startup
+        async def warm(app: FastAPI) -> None:
+            events.append("warm")
+
+        @lifespan.on_shutdown
+        async def close() -> None:
+            events.append("close")
+
+        async with lifespan(FastAPI()):
+            assert events == ["warm"]
+        assert events == ["warm", "close"]
+
+    async def test_failed_startup_shuts_down_started_hooks(self) -> None:
+        events: list[str] = []
+        lifespan = Lifespan()
+
+        @lifespan.on_shutdown
+        async def close() -> None:
+            events.append("close")
+
+        @lifespan.on_startup
+        async def broken(app: FastAPI) -> None:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            async with lifespan(FastAPI()):
+                pass
+        assert events == ["close"]
+
+
+class TestOpenConnections:
+    async def test_leaves_connections_idle_in_pool(self, tmp_path: Path) -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}")
+        await open_connections(engine, 3)
+        assert engine.sync_engine.pool.checkedin() == 3
+        assert engine.sync_engine.pool.checkedout() == 0
+        await engine.dispose()
+
+    async def test_zero_count_opens_nothing(self, tmp_path: Path) -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}")
+        await open_connections(engine, 0)
+        assert engine.sync_engine.pool.checkedin() == 0
+        await engine.dispose()
@@ -0,0 +1,111 @@
+import json
+import time
+from collections.abc import Callable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.config import settings
+from core.database import engine, replica_set
+from core.db_pool import pool_stats
+
+
+class ConcurrencyLimiter:
+    """Adaptive cap on in-flight requests, driven by connection pool wait time.
+
+    The cap starts at ``max_in_flight``. At most once per ``adjust_interval``
+    it is cut by 10% (not below ``min_in_flight``) while the recent pool wait
+    exceeds ``pool_wait_threshold``, and raised by one towards the maximum
+    otherwise. Requests over the cap are refused rather than queued for a
+    connection they would time out waiting for.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        min_in_flight: int,
+        pool_wait_threshold: float,
+        pool_wait: Callable[[], float],
+        adjust_interval: float = 1.0,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min(min_in_flight, max_in_flight)
+        self.pool_wait_threshold = pool_wait_threshold
+        self.pool_wait = pool_wait
+        self.adjust_interval = adjust_interval
+        self.limit = max_in_flight
+        self.in_flight = 0
+        self.shed = 0
+        self._adjusted_at = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        if now - self._adjusted_at >= self.adjust_interval:
+            self._adjusted_at = now
+            self._adjust()
+        if self.in_flight >= self.limit:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def _adjust(self) -> None:
+        if self.pool_wait() > self.pool_wait_threshold:
+            self.limit = max(self.min_in_flight, int(self.limit * 0.9))
+        elif self.limit < self.max_in_flight:
+            self.limit += 1
+
+
+def recent_pool_wait() -> float:
+    """The worst recent checkout wait across the primary and replica pools."""
+    engines = [engine, *(replica_set.engines if replica_set else [])]
+    return max(pool_stats(e).wait_seconds_recent for e in engines)
+
+
+class LoadShedMiddleware:
+    """Refuse requests over the concurrency cap with 503 and Retry-After.
+
+    Paths under ``exempt_prefixes`` (health probes, metrics) are always
+    served and do not count towards the cap, so an overloaded worker still
+    reports its state.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: ConcurrencyLimiter,
+        retry_after: int = 1,
+        exempt_prefixes: tuple[str, ...] = ("/api/health", "/metrics"),
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.exempt_prefixes = exempt_prefixes
+        self._body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        self._headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.try_acquire():
+            await send({"type": "http.response.start", "status": 503, "headers": self._headers})
+            await send({"type": "http.response.body", "body": self._body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+
+concurrency_limiter = ConcurrencyLimiter(
+    max_in_flight=settings.load_shed_max_in_flight,
+    min_in_flight=settings.load_shed_min_in_flight,
+    pool_wait_threshold=settings.load_shed_pool_wait_seconds,
+    pool_wait=recent_pool_wait,
+)
@@ -0,0 +1,72 @@
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from core.load_shed import ConcurrencyLimiter, LoadShedMiddleware
+
+
+def _limiter(pool_wait: float = 0.0, **kwargs: float) -> ConcurrencyLimiter:
+    options = {"max_in_flight": 10, "min_in_flight": 2, "adjust_interval": 0.0} | kwargs
+    return ConcurrencyLimiter(
+        pool_wait_threshold=0.1, pool_wait=lambda: pool_wait, **options
+    )
+
+
+class TestConcurrencyLimiter:
+    def test_refuses_over_the_limit(self) -> None:
+        limiter = _limiter(max_in_flight=2)
+        assert limiter.try_acquire() and limiter.try_acquire()
+        assert not limiter.try_acquire()
+        limiter.release()
+        assert limiter.try_acquire()
+        assert limiter.shed == 1
+
+    def test_shrinks_while_pool_waits_are_high(self) -> None:
+        limiter = _limiter(pool_wait=0.5)
+        for _ in range(50):
+            limiter.try_acquire()
+            limiter.release()
+        assert limiter.limit == 2
+
+    def test_recovers_when_pool_waits_drop(self) -> None:
+        limiter = _limiter()
+        limiter.limit = 5
+        for _ in range(3):
+            limiter.try_acquire()
+            limiter.release()
+        assert limiter.limit == 8
+
+
+def _app(limiter: ConcurrencyLimiter) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(LoadShedMiddleware, limiter=limiter, retry_after=3)
+
+    @app.get("/work")
+    async def work() -> dict[str, str]:
+        return {"status": "done"}
+
+    @app.get("/api/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return app
+
+
+class TestLoadShedMiddleware:
+    async def test_sheds_with_503_and_retry_after(self) -> None:
+        limiter = _limiter(max_in_flight=1, min_in_flight=1, adjust_interval=60.0)
+        limiter.in_flight = 1  # a request is already being served
+        transport = ASGITransport(app=_app(limiter))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            shed = await client.get("/work")
+            health = await client.get("/api/health")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "3"
+        assert health.status_code == 200
+
+    async def test_serves_and_releases_under_the_limit(self) -> None:
+        limiter = _limiter(max_in_flight=1, min_in_flight=1, adjust_interval=60.0)
+        transport = ASGITransport(app=_app(limiter))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = [(await client.get("/work")).status_code for _ in range(3)]
+        assert statuses == [200, 200, 200]
+        assert limiter.in_flight == 0
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.timing import DEFAULT_BUCKETS, Histogram
+
+Labels = tuple[str, ...]
+# {"counters": {name: {labels_json: value}}, "histograms": {name: {labels_json: {...}}}}
+Snapshot = dict[str, dict[str, dict[str, Any]]]
+
+
+class Counter:
+    """Monotonic counter family keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+
+class HistogramFamily:
+    """Histogram family keyed by label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.values: dict[Labels, Histogram] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        histogram = self.values.get(labels)
+        if histogram is None:
+            histogram = self.values[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+
+class MetricsRegistry:
+    """In-process counters and histograms, rendered in Prometheus text format.
+
+    Updates are plain dict operations with no locking: they run on the event
+    loop thread. With a ``MultiprocessStore`` each worker periodically writes
+    its snapshot to a shared directory and a scrape sums every worker's file,
+    so any worker can answer for the whole server. Snapshots are taken on the
+    loop; the file I/O runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        store: "MultiprocessStore | None" = None,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self.counters: dict[str, Counter] = {}
+        self.histograms: dict[str, HistogramFamily] = {}
+        self.store = store
+        self.flush_interval = flush_interval
+        self.in_progress = 0
+        self._last_flush = 0.0
+
+    def counter(self, name: str, documentation: str, labelnames: Labels = ()) -> Counter:
+        return self.counters.setdefault(name, Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        family = HistogramFamily(name, documentation, labelnames, buckets)
+        return self.histograms.setdefault(name, family)
+
+    def snapshot(self) -> Snapshot:
+        return {
+            "counters": {
+                c.name: {json.dumps(labels): value for labels, value in c.values.items()}
+                for c in self.counters.values()
+            },
+            "histograms": {
+                h.name: {
+                    json.dumps(labels): {
+                        "counts": list(hist.counts),
+                        "sum": hist.total,
+                        "count": hist.count,
+                    }
+                    for labels, hist in h.values.items()
+                }
+                for h in self.histograms.values()
+            },
+        }
+
+    async def maybe_flush(self, force: bool = False) -> None:
+        """Write this worker's snapshot if the flush interval has passed, or if ``force``."""
+        now = time.monotonic()
+        if self.store is None:
+            return
+        if force or now - self._last_flush >= self.flush_interval:
+            self._last_flush = now
+            await asyncio.to_thread(self.store.write, self.snapshot())
+
+    async def collect(self) -> Snapshot:
+        """Snapshot of this worker, or of all workers in multiprocess mode."""
+        if self.store is None:
+            return self.snapshot()
+        self._last_flush = time.monotonic()
+        await asyncio.to_thread(self.store.write, self.snapshot())
+        return merge_snapshots(await asyncio.to_thread(self.store.read_all))
+
+    def render(self, snapshot: Snapshot) -> str:
+        """Prometheus text exposition (format 0.0.4) of ``snapshot``."""
+        lines: list[str] = []
+        for counter in self.counters.values():
+            lines += _header(counter.name, counter.documentation, "counter")
+            for key, value in snapshot["counters"].get(counter.name, {}).items():
+                labels = _labels(counter.labelnames, json.loads(key))
+                lines.append(f"{counter.name}{labels} {_number(value)}")
+        for family in self.histograms.values():
+            lines += _header(family.name, family.documentation, "histogram")
+            for key, data in snapshot["histograms"].get(family.name, {}).items():
+                values = json.loads(key)
+                running = 0
+                for bound, count in zip((*family.buckets, float("inf")), data["counts"]):
+                    running += count
+                    le = _labels((*family.labelnames, "le"), [*values, _number(bound)])
+                    lines.append(f"{family.name}_bucket{le} {running}")
+                labels = _labels(family.labelnames, values)
+                lines.append(f"{family.name}_sum{labels} {_number(data['sum'])}")
+                lines.append(f"{family.name}_count{labels} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class MultiprocessStore:
+    """One JSON snapshot file per worker process in a shared directory.
+
+    Files are replaced atomically, so readers never see a partial write.
+    Files of exited workers are kept: their counts still belong to the
+    totals, exactly like counters of a process that restarted.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, snapshot: Snapshot) -> None:
+        path = self.directory / f"{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, path)
+
+    def read_all(self) -> list[Snapshot]:
+        snapshots = []
+        for path in self.directory.glob("*.json"):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+def merge_snapshots(snapshots: Iterable[Snapshot]) -> Snapshot:
+    """Sum counters and histogram buckets across worker snapshots."""
+    merged: Snapshot = {"counters": {}, "histograms": {}}
+    for snapshot in snapshots:
+        for name, series in snapshot.get("counters", {}).items():
+            target = merged["counters"].setdefault(name, {})
+            for key, value in series.items():
+                target[key] = target.get(key, 0.0) + value
+        for name, series in snapshot.get("histograms", {}).items():
+            target = merged["histograms"].setdefault(name, {})
+            for key, data in series.items():
+                current = target.get(key)
+                if current is None:
+                    target[key] = {**data, "counts": list(data["counts"])}
+                    continue
+                current["counts"] = [a + b for a, b in zip(current["counts"], data["counts"])]
+                current["sum"] += data["sum"]
+                current["count"] += data["count"]
+    return merged
+
+
+def _header(name: str, documentation: str, kind: str) -> list[str]:
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def gauge_lines(name: str, documentation: str, samples: dict[str, float], label: str = "") -> str:
+    """Render a gauge computed at scrape time; ``samples`` maps a label value to its value."""
+    return _sample_lines(name, documentation, "gauge", samples, label)
+
+
+def counter_lines(
+    name: str, documentation: str, samples: dict[str, float], label: str = "",
+) -> str:
+    """Render a process-local counter read at scrape time; ``name`` ends in ``_total``."""
+    return _sample_lines(name, documentation, "counter", samples, label)
+
+
+def _sample_lines(
+    name: str, documentation: str, kind: str, samples: dict[str, float], label: str,
+) -> str:
+    lines = _header(name, documentation, kind)
+    for value, sample in samples.items():
+        lines.append(f"{name}{_labels([label], [value]) if label else ''} {_number(sample)}")
+    return "\n".join(lines) + "\n"
+
+
+def histogram_lines(
+    name: str,
+    documentation: str,
+    histograms: dict[str, Histogram],
+    label: str,
+) -> str:
+    """Render process-local histograms keyed by a single label value."""
+    lines = _header(name, documentation, "histogram")
+    for value, histogram in histograms.items():
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels([label, 'le'], [value, _number(bound)])} {count}")
+        lines.append(f"{name}_sum{_labels([label], [value])} {_number(histogram.total)}")
+        lines.append(f"{name}_count{_labels([label], [value])} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Count requests and time them per route template.
+
+    The label is the matched route's path template (``/api/users/{user_id}``),
+    never the raw path, so label cardinality stays bounded; requests that
+    match no route share the ``unmatched`` label.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+        self.requests = registry.counter(
+            "http_requests_total",
+            "HTTP requests by method, route template and status code.",
+            ("method", "route", "status"),
+        )
+        self.duration = registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by method and route template.",
+            ("method", "route"),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.registry.in_progress += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.registry.in_progress -= 1
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or getattr(route, "path", "unmatched")
+            method = scope["method"]
+            self.requests.inc((method, template, str(status)))
+            self.duration.observe((method, template), time.perf_counter() - start)
+            await self.registry.maybe_flush()
+
+
+metrics_registry = MetricsRegistry(
+    MultiprocessStore(settings.metrics_multiproc_dir) if settings.metrics_multiproc_dir else None,
+    flush_interval=settings.metrics_flush_interval_seconds,
+)
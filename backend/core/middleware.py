@@ -1,13 +1,73 @@
-import uuid
-from collections.abc import Callable
+import os
+import re
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.compression import CompressionMiddleware
+from core.config import settings
+from core.idempotency import IdempotentReplayError, replay_handler
+from core.load_shed import LoadShedMiddleware, concurrency_limiter
+from core.metrics import MetricsMiddleware, metrics_registry
+from core.timing import ServerTimingMiddleware
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Incoming IDs are echoed into logs and headers, so only accept short, safe tokens.
+_VALID_REQUEST_ID = re.compile(rb"[A-Za-z0-9._:-]{1,128}")
+
+
+class RequestIDMiddleware:
+    """Tag every request with an ID and return it in the X-Request-ID header.
+
+    A well-formed incoming X-Request-ID is kept so IDs can be traced across
+    services; otherwise a random 128-bit hex ID is generated. The ID is
+    stored as ``request.state.request_id``. Implemented as plain ASGI, so the
+    response body, streamed or not, passes through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or os.urandom(16).hex().encode()
+        scope.setdefault("state", {})["request_id"] = request_id.decode()
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [(k, v) for k, v in message.get("headers", []) if k != REQUEST_ID_HEADER]
+                headers.append((REQUEST_ID_HEADER, request_id))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
+
+
+def _incoming_request_id(scope: Scope) -> bytes | None:
+    for name, value in scope["headers"]:
+        if name == REQUEST_ID_HEADER:
+            return value if _VALID_REQUEST_ID.fullmatch(value) else None
+    return None
 
 
 def setup_middleware(app: FastAPI) -> None:
-    """Configure all application middleware."""
+    """Configure all application middleware.
+
+    The last middleware added runs first, so RequestIDMiddleware is
+    outermost and load shedding sits just outside the app, inside CORS and
+    metrics, so shed responses still carry CORS headers and are counted.
+    """
+    if settings.load_shed_enabled:
+        app.add_middleware(
+            LoadShedMiddleware,
+            limiter=concurrency_limiter,
+            retry_after=settings.load_shed_retry_after_seconds,
+        )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:4200"],
@@ -15,17 +75,20 @@ def setup_middleware(app: FastAPI) -> None:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-
-    @app.middleware("http")
-    async def request_id_middleware(
-        request: Request,
-        call_next: Callable,
-    ) -> Response:
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+            zstd_level=settings.compression_zstd_level,
+        )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+    if settings.request_timing_enabled:
+        app.add_middleware(ServerTimingMiddleware, emit_header=settings.server_timing_header)
+    app.add_middleware(RequestIDMiddleware)
+    app.add_exception_handler(IdempotentReplayError, replay_handler)
 
     @app.exception_handler(Exception)
     async def global_exception_handler(
@@ -0,0 +1,45 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from core.middleware import RequestIDMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.get("/state")
+    async def state(request: Request) -> dict[str, str]:
+        return {"request_id": request.state.request_id}
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        return StreamingResponse(iter([b"a", b"b"]), media_type="text/plain")
+
+    return app
+
+
+class TestRequestIDMiddleware:
+    async def test_generates_id_and_exposes_it_on_state(self) -> None:
+        transport = ASGITransport(app=_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/state")
+        request_id = response.headers["x-request-id"]
+        assert len(request_id) == 32
+        assert response.json() == {"request_id": request_id}
+
+    async def test_honors_valid_incoming_id(self) -> None:
+        transport = ASGITransport(app=_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            kept = await client.get("/state", headers={"X-Request-ID": "trace-123"})
+            replaced = await client.get("/state", headers={"X-Request-ID": "bad id!"})
+        assert kept.headers["x-request-id"] == "trace-123"
+        assert replaced.headers["x-request-id"] != "bad id!"
+
+    async def test_passes_streaming_bodies_through(self) -> None:
+        transport = ASGITransport(app=_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/stream")
+        assert response.text == "ab"
+        assert "x-request-id" in response.headers
@@ -0,0 +1,65 @@
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import JSON, BigInteger, Index, Integer, String, Text, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database import Base
+
+
+def utcnow() -> datetime:
+    """Naive UTC, matching how the other tables store timestamps."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class OutboxMessage(Base):
+    """An event waiting to be handed to its handlers by the outbox dispatcher.
+
+    Rows are pending until ``processed_at`` is set, or ``failed_at`` once
+    every retry is used up. Events nobody subscribes to stay pending, so a
+    handler deployed later still receives the backlog. ``available_at`` is when the row may next be
+    claimed: a claim pushes it out by the lease, a failure by the backoff.
+    """
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        Index(
+            "ix_outbox_messages_pending",
+            "event_type",
+            "available_at",
+            postgresql_where=text("processed_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    event_type: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    available_at: Mapped[datetime] = mapped_column(default=utcnow)
+    attempts: Mapped[int] = mapped_column(default=0)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    processed_at: Mapped[datetime | None]
+    failed_at: Mapped[datetime | None]
+
+
+async def enqueue(
+    session: AsyncSession,
+    event_type: str,
+    payloads: Iterable[dict[str, Any]],
+) -> None:
+    """Queue one ``event_type`` event per payload in the session's transaction.
+
+    The events commit or roll back together with the writes they describe,
+    so handlers never see an event for a change that did not happen.
+    """
+    now = utcnow()
+    rows = [
+        {"event_type": event_type, "payload": payload, "available_at": now}
+        for payload in payloads
+    ]
+    if rows:
+        await session.execute(insert(OutboxMessage), rows)
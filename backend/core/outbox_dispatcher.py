@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import Settings, settings
+from core.database import async_session_factory
+from core.outbox import OutboxMessage, utcnow
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutboxEvent:
+    id: int
+    event_type: str
+    payload: dict[str, Any]
+    attempts: int
+
+
+Handler = Callable[[OutboxEvent], Awaitable[None]]
+
+
+@dataclass
+class OutboxStats:
+    dispatched: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+class OutboxDispatcher:
+    """Delivers outbox events to their handlers, off the request path.
+
+    Each round claims up to ``batch_size`` due rows of the subscribed event
+    types with ``SELECT ... FOR UPDATE SKIP LOCKED`` and leases them for
+    ``lease_seconds`` in one short transaction, so dispatchers in several
+    worker processes split the backlog without blocking each other or
+    holding a connection while handlers run. Handlers for the batch then run concurrently. A failed
+    event is retried with exponential backoff and jitter, and marked failed
+    after ``max_attempts``. A worker that dies mid-batch leaves its leases
+    to expire, so events are delivered at least once: handlers must be
+    idempotent.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 10,
+        retry_base_seconds: float = 1.0,
+        retry_max_seconds: float = 300.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.handlers: dict[str, list[Handler]] = {}
+        self.stats = OutboxStats()
+
+    def subscribe(self, event_type: str) -> Callable[[Handler], Handler]:
+        """Decorator registering a handler for ``event_type``."""
+
+        def register(handler: Handler) -> Handler:
+            self.handlers.setdefault(event_type, []).append(handler)
+            return handler
+
+        return register
+
+    async def run(self) -> None:
+        """Dispatch until cancelled, polling while there is nothing due."""
+        while True:
+            try:
+                dispatched = await self.run_once()
+            except Exception:
+                logger.exception("Outbox dispatch round failed")
+                dispatched = 0
+            if dispatched < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> int:
+        """Claim and deliver one batch; returns how many events it held."""
+        events = await self._claim()
+        if not events:
+            return 0
+        errors = await asyncio.gather(*(self._deliver(event) for event in events))
+        await self._record(list(zip(events, errors, strict=True)))
+        return len(events)
+
+    async def _claim(self) -> list[OutboxEvent]:
+        if not self.handlers:
+            return []
+        now = utcnow()
+        async with self.session_factory() as session, session.begin():
+            rows = (
+                await session.execute(
+                    select(OutboxMessage)
+                    .where(
+                        OutboxMessage.event_type.in_(list(self.handlers)),
+                        OutboxMessage.processed_at.is_(None),
+                        OutboxMessage.failed_at.is_(None),
+                        OutboxMessage.available_at <= now,
+                    )
+                    .order_by(OutboxMessage.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+            ).scalars().all()
+            if rows:
+                await session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_([row.id for row in rows]))
+                    .values(available_at=now + self.lease)
+                )
+            return [OutboxEvent(row.id, row.event_type, row.payload, row.attempts) for row in rows]
+
+    async def _deliver(self, event: OutboxEvent) -> str | None:
+        """Run every handler for the event; the first error, or None on success."""
+        for handler in self.handlers.get(event.event_type, ()):
+            try:
+                await handler(event)
+            except Exception as exc:
+                logger.warning(
+                    "Outbox handler %s failed for %s #%d",
+                    getattr(handler, "__qualname__", handler),
+                    event.event_type,
+                    event.id,
+                    exc_info=True,
+                )
+                return f"{type(exc).__name__}: {exc}"
+        return None
+
+    async def _record(self, results: list[tuple[OutboxEvent, str | None]]) -> None:
+        now = utcnow()
+        delivered = [event.id for event, error in results if error is None]
+        async with self.session_factory() as session, session.begin():
+            if delivered:
+                await session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_(delivered))
+                    .values(processed_at=now)
+                )
+            for event, error in results:
+                if error is None:
+                    continue
+                attempts = event.attempts + 1
+                values: dict[str, Any] = {"attempts": attempts, "last_error": error[:2000]}
+                if attempts >= self.max_attempts:
+                    values["failed_at"] = now
+                    self.stats.failed += 1
+                else:
+                    values["available_at"] = now + timedelta(seconds=self.backoff(attempts))
+                    self.stats.retried += 1
+                await session.execute(
+                    update(OutboxMessage).where(OutboxMessage.id == event.id).values(**values)
+                )
+        self.stats.dispatched += len(delivered)
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before retry number ``attempts``: doubling, capped, with jitter."""
+        ceiling = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        return ceiling * random.uniform(0.5, 1.0)
+
+
+def build_outbox_dispatcher(config: Settings) -> OutboxDispatcher:
+    return OutboxDispatcher(
+        async_session_factory,
+        batch_size=config.outbox_batch_size,
+        poll_interval=config.outbox_poll_interval_seconds,
+        lease_seconds=config.outbox_lease_seconds,
+        max_attempts=config.outbox_max_attempts,
+        retry_base_seconds=config.outbox_retry_base_seconds,
+        retry_max_seconds=config.outbox_retry_max_seconds,
+    )
+
+
+outbox_dispatcher = build_outbox_dispatcher(settings)
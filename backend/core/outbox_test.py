@@ -0,0 +1,153 @@
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from core.outbox import OutboxMessage, enqueue, utcnow
+from core.outbox_dispatcher import OutboxDispatcher, OutboxEvent
+
+
+@pytest.fixture
+async def session_factory(tmp_path: Path) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(OutboxMessage.__table__.create)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _enqueue(factory: async_sessionmaker[AsyncSession], *payloads: dict) -> None:
+    async with factory() as session, session.begin():
+        await enqueue(session, "Thing", payloads)
+
+
+async def _rows(factory: async_sessionmaker[AsyncSession]) -> list[OutboxMessage]:
+    async with factory() as session:
+        result = await session.execute(select(OutboxMessage).order_by(OutboxMessage.id))
+        return list(result.scalars())
+
+
+async def _make_due(factory: async_sessionmaker[AsyncSession]) -> None:
+    async with factory() as session, session.begin():
+        await session.execute(update(OutboxMessage).values(available_at=utcnow()))
+
+
+async def _ignore(event: OutboxEvent) -> None:
+    pass
+
+
+class TestOutboxDispatcher:
+    async def test_delivers_and_marks_processed(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        dispatcher = OutboxDispatcher(session_factory)
+        seen: list[OutboxEvent] = []
+
+        @dispatcher.subscribe("Thing")
+        async def handle(event: OutboxEvent) -> None:
+            seen.append(event)
+
+        await _enqueue(session_factory, {"n": 1}, {"n": 2})
+        assert await dispatcher.run_once() == 2
+        assert [event.payload for event in seen] == [{"n": 1}, {"n": 2}]
+        assert all(row.processed_at is not None for row in await _rows(session_factory))
+        assert await dispatcher.run_once() == 0
+        assert dispatcher.stats.dispatched == 2
+
+    async def test_rolled_back_events_are_never_sent(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        with pytest.raises(RuntimeError):
+            async with session_factory() as session, session.begin():
+                await enqueue(session, "Thing", [{"n": 1}])
+                raise RuntimeError("insert failed")
+        assert await _rows(session_factory) == []
+
+    async def test_claims_in_batches(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        dispatcher = OutboxDispatcher(session_factory, batch_size=2)
+        dispatcher.subscribe("Thing")(_ignore)
+        await _enqueue(session_factory, *({"n": n} for n in range(3)))
+        assert await dispatcher.run_once() == 2
+        assert await dispatcher.run_once() == 1
+
+    async def test_failure_is_retried_after_backoff(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        dispatcher = OutboxDispatcher(session_factory, retry_base_seconds=30)
+        calls = 0
+
+        @dispatcher.subscribe("Thing")
+        async def flaky(event: OutboxEvent) -> None:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("downstream unavailable")
+
+        await _enqueue(session_factory, {"n": 1})
+        await dispatcher.run_once()
+        [row] = await _rows(session_factory)
+        assert row.attempts == 1
+        assert row.last_error == "RuntimeError: downstream unavailable"
+        assert row.available_at > utcnow() + timedelta(seconds=10)
+        assert await dispatcher.run_once() == 0
+
+        await _make_due(session_factory)
+        assert await dispatcher.run_once() == 1
+        [row] = await _rows(session_factory)
+        assert row.processed_at is not None
+        assert dispatcher.stats.retried == 1
+
+    async def test_gives_up_after_max_attempts(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        dispatcher = OutboxDispatcher(session_factory, max_attempts=2)
+
+        @dispatcher.subscribe("Thing")
+        async def broken(event: OutboxEvent) -> None:
+            raise ValueError("bad payload")
+
+        await _enqueue(session_factory, {"n": 1})
+        await dispatcher.run_once()
+        await _make_due(session_factory)
+        await dispatcher.run_once()
+        [row] = await _rows(session_factory)
+        assert row.attempts == 2
+        assert row.failed_at is not None and row.processed_at is None
+        await _make_due(session_factory)
+        assert await dispatcher.run_once() == 0
+        assert dispatcher.stats.failed == 1
+
+    async def test_claimed_events_are_leased(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        first = OutboxDispatcher(session_factory, lease_seconds=60)
+        second = OutboxDispatcher(session_factory)
+        for dispatcher in (first, second):
+            dispatcher.subscribe("Thing")(_ignore)
+        await _enqueue(session_factory, {"n": 1})
+        assert len(await first._claim()) == 1
+        assert await second._claim() == []
+
+    async def test_events_without_subscribers_stay_pending(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> None:
+        dispatcher = OutboxDispatcher(session_factory)
+        dispatcher.subscribe("Other")(_ignore)
+        await _enqueue(session_factory, {"n": 1})
+        assert await dispatcher.run_once() == 0
+        [row] = await _rows(session_factory)
+        assert row.processed_at is None and row.attempts == 0
+
+        dispatcher.subscribe("Thing")(_ignore)
+        assert await dispatcher.run_once() == 1
+
+    def test_backoff_doubles_up_to_the_cap(self) -> None:
+        dispatcher = OutboxDispatcher(None, retry_base_seconds=1, retry_max_seconds=8)
+        assert 0.5 <= dispatcher.backoff(1) <= 1
+        assert 2 <= dispatcher.backoff(3) <= 4
+        assert 4 <= dispatcher.backoff(10) <= 8
@@ -0,0 +1,192 @@
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Protocol
+
+from fastapi import Depends, HTTPException, Request
+
+from core.auth import get_optional_user
+from core.config import Settings, settings
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket refilling at ``rate`` tokens per second, holding at most ``burst``."""
+
+    rate: float
+    burst: int
+
+    @classmethod
+    def parse(cls, raw: Mapping[str, float]) -> "RateLimit":
+        rate = float(raw["rate"])
+        burst = int(raw.get("burst", max(1, math.ceil(rate))))
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"rate must be > 0 and burst >= 1, got {dict(raw)}")
+        return cls(rate=rate, burst=burst)
+
+
+class RateLimitBackend(Protocol):
+    """Where token buckets live; shared backends enforce one limit across workers."""
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        """Take a token from bucket ``key``; seconds until one is available, 0 if taken."""
+        ...
+
+
+class MemoryRateLimitBackend:
+    """Per-process token buckets, least recently used dropped beyond ``max_keys``.
+
+    A dropped bucket comes back full, which only ever errs towards allowing.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        state = self._buckets.get(key)
+        if state is None:
+            tokens = float(limit.burst)
+        else:
+            tokens = min(limit.burst, state[0] + (now - state[1]) * limit.rate)
+            self._buckets.move_to_end(key)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# Runs atomically in the store, on the store's clock, so every worker
+# shares one bucket. The wait is returned as a string: Lua numbers are
+# truncated to integers in replies.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RemoteRateLimitClient(Protocol):
+    """The subset of a Redis-compatible async client used by RemoteRateLimitBackend."""
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: str) -> object: ...
+
+
+class RemoteRateLimitBackend:
+    """Token buckets in a shared store, updated by one atomic script per request."""
+
+    def __init__(self, client: RemoteRateLimitClient, prefix: str = "ratelimit:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        wait = await self.client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, repr(limit.rate), str(limit.burst)
+        )
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+
+class RateLimiter:
+    """Token-bucket limits per route template, keyed by user id or client IP.
+
+    ``limits`` maps ``"METHOD /path/{template}"`` to a RateLimit; routes
+    without an entry use ``default``, or are not limited when it is None.
+    Callers with a valid token share a bucket per user across IPs; anonymous
+    callers get one per client address. Over the limit, the request is
+    refused with 429 and a Retry-After header. Paths under
+    ``exempt_prefixes`` (health probes, metrics) are never limited: probes
+    and scrapers all come from a few addresses.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        limits: Mapping[str, RateLimit],
+        default: RateLimit | None = None,
+        exempt_prefixes: tuple[str, ...] = ("/api/health", "/metrics"),
+    ) -> None:
+        self.backend = backend
+        self.limits = dict(limits)
+        self.default = default
+        self.exempt_prefixes = exempt_prefixes
+        self.rejections = 0
+
+    def limit_for(self, method: str, template: str) -> RateLimit | None:
+        return self.limits.get(f"{method} {template}", self.default)
+
+    async def check(self, request: Request) -> None:
+        route = request.scope.get("route")
+        template = getattr(route, "path_format", None)
+        if template is None or request.url.path.startswith(self.exempt_prefixes):
+            return
+        limit = self.limit_for(request.method, template)
+        if limit is None:
+            return
+        # The token is verified only for limited routes; a cache hit makes it cheap.
+        user = await get_optional_user(request.headers.get("authorization"))
+        if user is not None:
+            subject = f"user:{user.id}"
+        else:
+            subject = f"ip:{request.client.host if request.client else 'unknown'}"
+        wait = await self.backend.take(f"{request.method} {template}|{subject}", limit)
+        if wait > 0:
+            self.rejections += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+
+def build_rate_limiter(config: Settings) -> RateLimiter:
+    """The process-wide limiter configured by ``rate_limits``.
+
+    It keeps buckets in memory, so each worker enforces the limit on its
+    own; deployments running several workers build a RemoteRateLimitBackend
+    at startup and override ``get_rate_limiter``.
+    """
+    return RateLimiter(
+        MemoryRateLimitBackend(config.rate_limit_max_keys),
+        {route: RateLimit.parse(raw) for route, raw in config.rate_limits.items()},
+        RateLimit.parse(config.rate_limit_default) if config.rate_limit_default else None,
+    )
+
+
+rate_limiter = build_rate_limiter(settings)
+
+
+def get_rate_limiter() -> RateLimiter:
+    return rate_limiter
+
+
+async def enforce_rate_limit(
+    request: Request,
+    limiter: RateLimiter = Depends(get_rate_limiter),
+) -> None:
+    """App-wide dependency applying the rate limiter to the matched route."""
+    await limiter.check(request)
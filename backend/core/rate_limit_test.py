@@ -0,0 +1,166 @@
+import time
+from collections.abc import Callable
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from core.auth import CurrentUser
+from core.rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimit,
+    RateLimitBackend,
+    RateLimiter,
+    RemoteRateLimitBackend,
+)
+
+
+class FakeScriptClient:
+    """Stand-in for a Redis-compatible store, running the token bucket script in Python."""
+
+    def __init__(self) -> None:
+        self.buckets: dict[str, tuple[float, float]] = {}
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: str) -> bytes:
+        key, rate, burst = keys_and_args[0], float(keys_and_args[1]), float(keys_and_args[2])
+        now = time.monotonic()
+        tokens, ts = self.buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self.buckets[key] = (tokens, now)
+        return str(wait).encode()
+
+
+class TestRateLimit:
+    def test_burst_defaults_to_one_second_of_rate(self) -> None:
+        assert RateLimit.parse({"rate": 2.5}) == RateLimit(rate=2.5, burst=3)
+
+    def test_rejects_non_positive_rate(self) -> None:
+        with pytest.raises(ValueError):
+            RateLimit.parse({"rate": 0})
+
+
+BackendFactory = Callable[[], RateLimitBackend]
+
+
+@pytest.mark.parametrize(
+    "make_backend",
+    [
+        lambda: MemoryRateLimitBackend(max_keys=100),
+        lambda: RemoteRateLimitBackend(FakeScriptClient()),
+    ],
+    ids=["memory", "remote"],
+)
+class TestBackends:
+    async def test_allows_burst_then_asks_to_wait(self, make_backend: BackendFactory) -> None:
+        backend = make_backend()
+        limit = RateLimit(rate=1.0, burst=3)
+        assert [await backend.take("k", limit) for _ in range(3)] == [0.0, 0.0, 0.0]
+        wait = await backend.take("k", limit)
+        assert 0.9 < wait <= 1.0
+
+    async def test_buckets_are_independent(self, make_backend: BackendFactory) -> None:
+        backend = make_backend()
+        limit = RateLimit(rate=1.0, burst=1)
+        assert await backend.take("a", limit) == 0.0
+        assert await backend.take("b", limit) == 0.0
+        assert await backend.take("a", limit) > 0
+
+
+class TestMemoryRateLimitBackend:
+    async def test_drops_least_recently_used_buckets(self) -> None:
+        backend = MemoryRateLimitBackend(max_keys=2)
+        limit = RateLimit(rate=1.0, burst=1)
+        for key in ("a", "b", "c"):
+            await backend.take(key, limit)
+        assert len(backend) == 2
+        assert await backend.take("a", limit) == 0.0
+
+
+def _app(limiter: RateLimiter) -> FastAPI:
+    app = FastAPI(dependencies=[Depends(limiter.check)])
+
+    @app.post("/items")
+    async def create_item() -> dict[str, str]:
+        return {"status": "created"}
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int) -> dict[str, int]:
+        return {"id": item_id}
+
+    @app.get("/api/health/ready")
+    async def ready() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/metrics")
+    async def metrics() -> dict[str, str]:
+        return {}
+
+    return app
+
+
+class TestRateLimiter:
+    async def test_limits_by_route_template(self) -> None:
+        limiter = RateLimiter(
+            MemoryRateLimitBackend(max_keys=100), {"POST /items": RateLimit(rate=0.1, burst=2)}
+        )
+        transport = ASGITransport(app=_app(limiter))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = [(await client.post("/items")).status_code for _ in range(3)]
+            rejected = await client.post("/items")
+            reads = [(await client.get(f"/items/{i}")).status_code for i in range(5)]
+        assert statuses == [200, 200, 429]
+        assert int(rejected.headers["retry-after"]) >= 1
+        assert reads == [200] * 5
+        assert limiter.rejections == 2
+
+    async def test_default_limit_shares_bucket_across_path_params(self) -> None:
+        limiter = RateLimiter(MemoryRateLimitBackend(max_keys=100), {}, RateLimit(0.1, 2))
+        transport = ASGITransport(app=_app(limiter))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            statuses = [(await client.get(f"/items/{i}")).status_code for i in range(3)]
+        assert statuses == [200, 200, 429]
+
+    async def test_probes_and_metrics_are_never_limited(self) -> None:
+        limiter = RateLimiter(
+            MemoryRateLimitBackend(max_keys=100),
+            {"GET /metrics": RateLimit(0.1, 1)},
+            RateLimit(0.1, 1),
+        )
+        transport = ASGITransport(app=_app(limiter))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            probes = [(await client.get("/api/health/ready")).status_code for _ in range(5)]
+            scrapes = [(await client.get("/metrics")).status_code for _ in range(5)]
+        assert probes == [200] * 5
+        assert scrapes == [200] * 5
+        assert limiter.rejections == 0
+
+    async def test_keys_authenticated_callers_by_user(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        async def fake_optional_user(authorization: str | None) -> CurrentUser | None:
+            if authorization is None:
+                return None
+            user_id = authorization.removeprefix("Bearer ")
+            return CurrentUser(id=user_id, email=f"{user_id}@test.com", roles=[])
+
+        monkeypatch.setattr("core.rate_limit.get_optional_user", fake_optional_user)
+        limiter = RateLimiter(
+            MemoryRateLimitBackend(max_keys=100), {"POST /items": RateLimit(rate=0.1, burst=1)}
+        )
+        transport = ASGITransport(app=_app(limiter))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            alice = [
+                (await client.post("/items", headers={"Authorization": "Bearer alice"}))
+                .status_code
+                for _ in range(2)
+            ]
+            bob = await client.post("/items", headers={"Authorization": "Bearer bob"})
+            anonymous = await client.post("/items")
+        assert alice == [200, 429]
+        assert bob.status_code == 200
+        assert anonymous.status_code == 200
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+from core.auth import jwks_store
+from core.config import settings
+from core.database import engine
+
+Check = Callable[[], Awaitable[object]]
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    latency_ms: float
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class ReadinessReport:
+    ok: bool
+    checks: dict[str, ProbeResult]
+
+
+class ReadinessChecker:
+    """Runs dependency checks concurrently and caches the outcome.
+
+    Each check gets ``timeout`` seconds; one that raises or times out marks
+    the service not ready. A report is reused for ``ttl`` seconds and
+    concurrent callers share one run, so load balancer probes at any rate
+    cost at most one round of checks per interval.
+    """
+
+    def __init__(self, checks: dict[str, Check], ttl: float, timeout: float) -> None:
+        self.checks = checks
+        self.ttl = ttl
+        self.timeout = timeout
+        self._report: ReadinessReport | None = None
+        self._checked_at = 0.0
+        self._inflight: asyncio.Task[ReadinessReport] | None = None
+
+    async def check(self) -> ReadinessReport:
+        if self._report is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._report
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._run())
+        return await asyncio.shield(self._inflight)
+
+    async def _run(self) -> ReadinessReport:
+        try:
+            names = list(self.checks)
+            results = await asyncio.gather(*(self._probe(self.checks[n]) for n in names))
+            report = ReadinessReport(
+                ok=all(r.ok for r in results),
+                checks=dict(zip(names, results, strict=True)),
+            )
+            self._report, self._checked_at = report, time.monotonic()
+            return report
+        finally:
+            self._inflight = None
+
+    async def _probe(self, check: Check) -> ProbeResult:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+            error = None
+        except TimeoutError:
+            error = f"timed out after {self.timeout:g}s"
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        return ProbeResult(ok=error is None, latency_ms=latency_ms, error=error)
+
+
+async def check_database() -> None:
+    """Check out a pooled connection and run a trivial query."""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+readiness_checker = ReadinessChecker(
+    {"database": check_database, "jwks": jwks_store.ensure_loaded},
+    ttl=settings.readiness_cache_seconds,
+    timeout=settings.readiness_check_timeout_seconds,
+)
+
+
+def get_readiness_checker() -> ReadinessChecker:
+    return readiness_checker
@@ -0,0 +1,55 @@
+import asyncio
+
+from core.readiness import ReadinessChecker
+
+
+class TestReadinessChecker:
+    async def test_checks_run_concurrently(self) -> None:
+        running = 0
+        peak = 0
+
+        async def probe() -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        checker = ReadinessChecker({"a": probe, "b": probe, "c": probe}, ttl=0, timeout=1)
+        report = await checker.check()
+        assert report.ok
+        assert peak == 3
+
+    async def test_slow_check_times_out(self) -> None:
+        async def slow() -> None:
+            await asyncio.sleep(1)
+
+        checker = ReadinessChecker({"slow": slow}, ttl=0, timeout=0.01)
+        report = await checker.check()
+        assert not report.ok
+        assert "timed out" in report.checks["slow"].error
+
+    async def test_report_is_cached_for_ttl(self) -> None:
+        calls = 0
+
+        async def probe() -> None:
+            nonlocal calls
+            calls += 1
+
+        checker = ReadinessChecker({"db": probe}, ttl=60, timeout=1)
+        await checker.check()
+        await checker.check()
+        assert calls == 1
+
+    async def test_concurrent_callers_share_one_run(self) -> None:
+        calls = 0
+
+        async def probe() -> None:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+
+        checker = ReadinessChecker({"db": probe}, ttl=0, timeout=1)
+        reports = await asyncio.gather(*(checker.check() for _ in range(5)))
+        assert calls == 1
+        assert all(r.ok for r in reports)
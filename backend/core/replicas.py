@@ -0,0 +1,124 @@
+import itertools
+import time
+from typing import Literal
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, UOWTransaction
+from sqlalchemy.sql import ClauseElement, Executable
+
+ReplicaStrategy = Literal["round_robin", "least_connections"]
+
+
+class ReplicaSet:
+    """Read replica engines with round-robin or least-connections selection.
+
+    A replica that fails is skipped for ``cooldown`` seconds; when every
+    replica is cooling down, callers fall back to the primary. Replica reads
+    run in autocommit mode since replicas never take writes.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        strategy: ReplicaStrategy = "round_robin",
+        cooldown: float = 30.0,
+    ) -> None:
+        self.engines = engines
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self._down_until: dict[int, float] = {}
+        self._counter = itertools.count()
+        self._read_binds = {
+            id(e): e.sync_engine.execution_options(isolation_level="AUTOCOMMIT")
+            for e in engines
+        }
+
+    def choose(self) -> AsyncEngine | None:
+        """Pick a healthy replica, or None if none is available."""
+        now = time.monotonic()
+        healthy = [e for e in self.engines if self._down_until.get(id(e), 0.0) <= now]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            return min(healthy, key=_checked_out)
+        return healthy[next(self._counter) % len(healthy)]
+
+    def read_bind(self, engine: AsyncEngine) -> Engine:
+        """The autocommit bind used for reads on ``engine``."""
+        return self._read_binds[id(engine)]
+
+    def mark_failed(self, engine: AsyncEngine) -> None:
+        self._down_until[id(engine)] = time.monotonic() + self.cooldown
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+def _checked_out(engine: AsyncEngine) -> int:
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout is not None else 0
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to a replica and everything else to the primary.
+
+    Once the session writes (flush or DML) it sticks to the primary, so a
+    request always reads its own writes. A read that fails on a replica marks
+    the replica down and is retried once on the primary; this covers every
+    statement path (execute, scalar, scalars, get, stream). With ``autocommit``
+    off, replica reads run inside a transaction (needed for server-side cursors).
+    """
+
+    def __init__(
+        self,
+        *args: object,
+        replicas: ReplicaSet | None = None,
+        autocommit: bool = True,
+        **kwargs: object,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.autocommit = autocommit
+        self._use_primary = False
+        self._last_replica: AsyncEngine | None = None
+
+    def get_bind(
+        self,
+        mapper: object = None,
+        clause: ClauseElement | None = None,
+        **kwargs: object,
+    ) -> Engine | Connection:
+        is_read = clause is not None and getattr(clause, "is_select", False)
+        if clause is not None and not is_read:
+            self._use_primary = True
+        if self.replicas is None or self._use_primary or not is_read or kwargs.get("bind"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        replica = self.replicas.choose()
+        if replica is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        self._last_replica = replica
+        return self.replicas.read_bind(replica) if self.autocommit else replica.sync_engine
+
+    def _execute_internal(self, statement: Executable, *args: object, **kwargs: object) -> object:
+        # execute(), scalar() and scalars() all funnel through here.
+        self._last_replica = None
+        try:
+            return super()._execute_internal(statement, *args, **kwargs)
+        except (exc.OperationalError, exc.InterfaceError, OSError):
+            replica, self._last_replica = self._last_replica, None
+            if replica is None or self.replicas is None:
+                raise
+            self.replicas.mark_failed(replica)
+            self._use_primary = True
+            return super()._execute_internal(statement, *args, **kwargs)
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _stick_to_primary(
+    session: RoutingSession, flush_context: UOWTransaction, instances: object,
+) -> None:
+    session._use_primary = True
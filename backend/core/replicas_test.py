@@ -0,0 +1,121 @@
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import registry
+
+from core.replicas import ReplicaSet, RoutingSession
+
+_metadata = MetaData()
+_items = Table(
+    "routing_items",
+    _metadata,
+    Column("id", Integer, primary_key=True),
+    Column("origin", String(20)),
+)
+
+
+
+class _Item:
+    def __init__(self, id: int, origin: str) -> None:
+        self.id = id
+        self.origin = origin
+
+
+registry().map_imperatively(_Item, _items)
+
+
+async def _make_db(path: Path, origin: str) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(_metadata.create_all)
+        await conn.execute(insert(_items).values(id=1, origin=origin))
+    return engine
+
+
+@pytest.fixture
+async def primary(tmp_path: Path) -> AsyncIterator[AsyncEngine]:
+    engine = await _make_db(tmp_path / "primary.db", "primary")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def replica(tmp_path: Path) -> AsyncIterator[AsyncEngine]:
+    engine = await _make_db(tmp_path / "replica.db", "replica")
+    yield engine
+    await engine.dispose()
+
+
+async def _origin(factory: async_sessionmaker) -> list[str]:
+    async with factory() as session, session.begin():
+        result = await session.execute(select(_items.c.origin).order_by(_items.c.id))
+        return list(result.scalars())
+
+
+def _factory(primary: AsyncEngine, replicas: ReplicaSet) -> async_sessionmaker:
+    return async_sessionmaker(primary, sync_session_class=RoutingSession, replicas=replicas)
+
+
+class TestRoutingSession:
+    async def test_reads_go_to_replica(self, primary: AsyncEngine, replica: AsyncEngine) -> None:
+        factory = _factory(primary, ReplicaSet([replica]))
+        assert await _origin(factory) == ["replica"]
+
+    async def test_read_after_write_uses_primary(
+        self, primary: AsyncEngine, replica: AsyncEngine,
+    ) -> None:
+        factory = _factory(primary, ReplicaSet([replica]))
+        async with factory() as session, session.begin():
+            await session.execute(insert(_items).values(id=2, origin="written"))
+            result = await session.execute(select(_items.c.origin).order_by(_items.c.id))
+            assert list(result.scalars()) == ["primary", "written"]
+
+    async def test_read_after_flush_uses_primary(
+        self, primary: AsyncEngine, replica: AsyncEngine,
+    ) -> None:
+        factory = _factory(primary, ReplicaSet([replica]))
+        async with factory() as session, session.begin():
+            session.add(_Item(id=2, origin="flushed"))
+            await session.flush()
+            result = await session.execute(select(_items.c.origin).order_by(_items.c.id))
+            assert list(result.scalars()) == ["primary", "flushed"]
+
+    async def test_failed_replica_falls_back_to_primary(
+        self, primary: AsyncEngine, tmp_path: Path,
+    ) -> None:
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'x.db'}")
+        replicas = ReplicaSet([broken], cooldown=60.0)
+        factory = _factory(primary, replicas)
+        assert await _origin(factory) == ["primary"]
+        assert replicas.choose() is None
+        await broken.dispose()
+
+    async def test_scalar_reads_fall_back_to_primary(
+        self, primary: AsyncEngine, tmp_path: Path,
+    ) -> None:
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'x.db'}")
+        factory = _factory(primary, ReplicaSet([broken], cooldown=0.0))
+        async with factory() as session, session.begin():
+            query = select(_items.c.origin).where(_items.c.id == 1)
+            assert await session.scalar(query) == "primary"
+        async with factory() as session, session.begin():
+            assert list(await session.scalars(query)) == ["primary"]
+        await broken.dispose()
+
+
+class TestReplicaSet:
+    def test_round_robin_alternates(self) -> None:
+        a = create_async_engine("sqlite+aiosqlite:///a.db")
+        b = create_async_engine("sqlite+aiosqlite:///b.db")
+        replicas = ReplicaSet([a, b])
+        assert [replicas.choose() for _ in range(4)] == [a, b, a, b]
+
+    def test_skips_failed_replica(self) -> None:
+        a = create_async_engine("sqlite+aiosqlite:///a.db")
+        b = create_async_engine("sqlite+aiosqlite:///b.db")
+        replicas = ReplicaSet([a, b], strategy="least_connections", cooldown=60.0)
+        replicas.mark_failed(a)
+        assert {replicas.choose() for _ in range(3)} == {b}
@@ -0,0 +1,77 @@
+import functools
+import inspect
+import json
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from core.timing import Span
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is used without it
+    orjson = None
+
+
+class ModelJSONResponse(Response):
+    """JSON response that serializes already-validated Pydantic models once.
+
+    Returning a Response from an endpoint makes FastAPI skip its
+    ``response_model`` pass, which would otherwise validate the model a second
+    time and run it through ``jsonable_encoder`` and ``json.dumps``. Keep
+    ``response_model`` on the route so the OpenAPI schema stays accurate.
+    Models are serialized by pydantic-core's ``model_dump_json``; other
+    content goes through orjson when it is installed.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: object) -> bytes:
+        with Span("serialize"):
+            if isinstance(content, BaseModel):
+                return content.model_dump_json().encode()
+            if orjson is not None:
+                return orjson.dumps(content)
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class ModelResponseRoute(APIRoute):
+    """Route class that sends returned models straight through ModelJSONResponse.
+
+    Opt a router in with ``APIRouter(route_class=ModelResponseRoute)``. An
+    endpoint returning an instance of exactly the route's ``response_model``
+    is wrapped in ModelJSONResponse with the route's ``status_code``. Anything
+    else, including subclasses or other models that ``response_model`` would
+    filter, and sync endpoints, takes the normal FastAPI path. Since FastAPI
+    no longer builds the response, headers set on an injected ``Response``
+    parameter are not applied to wrapped models.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: object) -> None:
+        response_model = kwargs.get("response_model")
+        if (
+            inspect.iscoroutinefunction(endpoint)
+            and isinstance(response_model, type)
+            and issubclass(response_model, BaseModel)
+        ):
+            status_code = kwargs.get("status_code") or 200
+            endpoint = _send_models_directly(endpoint, response_model, status_code)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _send_models_directly(
+    endpoint: Callable[..., Any],
+    response_model: type[BaseModel],
+    status_code: int,
+) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    async def wrapper(*args: object, **kwargs: object) -> object:
+        result = await endpoint(*args, **kwargs)
+        if type(result) is response_model:
+            return ModelJSONResponse(result, status_code=status_code)
+        return result
+
+    return wrapper
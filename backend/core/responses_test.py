@@ -0,0 +1,61 @@
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+
+from core.responses import ModelJSONResponse, ModelResponseRoute
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+class StoredItem(Item):
+    secret: str
+
+
+def _app() -> FastAPI:
+    router = APIRouter(route_class=ModelResponseRoute)
+
+    @router.post("/items", status_code=201, response_model=Item)
+    async def create_item() -> Item:
+        return Item(id=1, name="café")
+
+    @router.get("/items/stored", response_model=Item)
+    async def stored_item() -> StoredItem:
+        return StoredItem(id=2, name="kept", secret="hidden")
+
+    @router.get("/plain")
+    async def plain() -> dict[str, int]:
+        return {"count": 2}
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+class TestModelResponseRoute:
+    async def test_returns_model_json_with_route_status(self) -> None:
+        transport = ASGITransport(app=_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/items")
+        assert response.status_code == 201
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"id": 1, "name": "café"}
+
+    async def test_richer_models_are_filtered_by_response_model(self) -> None:
+        transport = ASGITransport(app=_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/items/stored")
+        assert response.json() == {"id": 2, "name": "kept"}
+
+    async def test_other_return_values_take_default_path(self) -> None:
+        transport = ASGITransport(app=_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/plain")
+        assert response.json() == {"count": 2}
+
+
+class TestModelJSONResponse:
+    def test_renders_plain_content(self) -> None:
+        assert ModelJSONResponse({"a": [1, 2]}).body == b'{"a":[1,2]}'
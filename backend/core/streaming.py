@@ -0,0 +1,21 @@
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """Streaming response that leaves ``receive`` to the endpoint.
+
+    Starlette's StreamingResponse watches ``receive`` for disconnects while it
+    streams, which swallows request body chunks. Use this class when the body
+    iterator is still consuming the request stream, e.g. streaming imports.
+    A failed send still surfaces as ClientDisconnect, as in Starlette.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect() from None
+        if self.background is not None:
+            await self.background()
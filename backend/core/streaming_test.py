@@ -0,0 +1,34 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from starlette.requests import ClientDisconnect
+from starlette.types import Message
+
+from core.streaming import DuplexStreamingResponse
+
+
+async def _chunks() -> AsyncIterator[bytes]:
+    yield b"a"
+    yield b"b"
+
+
+async def _receive() -> Message:
+    raise AssertionError("the response must leave receive to the endpoint")
+
+
+class TestDuplexStreamingResponse:
+    async def test_streams_without_reading_receive(self) -> None:
+        sent: list[Message] = []
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+
+        await DuplexStreamingResponse(_chunks())({"type": "http"}, _receive, send)
+        assert [m.get("body") for m in sent[1:]] == [b"a", b"b", b""]
+
+    async def test_failed_send_is_a_client_disconnect(self) -> None:
+        async def send(message: Message) -> None:
+            raise OSError("connection reset")
+
+        with pytest.raises(ClientDisconnect):
+            await DuplexStreamingResponse(_chunks())({"type": "http"}, _receive, send)
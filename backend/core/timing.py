@@ -0,0 +1,203 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bounds in seconds, roughly log-spaced from 0.5 ms to 10 s.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+@dataclass
+class SpanTotal:
+    seconds: float = 0.0
+    count: int = 0
+
+
+class RequestTimings:
+    """Time spent per span name during one request."""
+
+    __slots__ = ("spans",)
+
+    def __init__(self) -> None:
+        self.spans: dict[str, SpanTotal] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        total = self.spans.get(name)
+        if total is None:
+            total = self.spans[name] = SpanTotal()
+        total.seconds += seconds
+        total.count += 1
+
+    def server_timing(self) -> str:
+        """Render as a Server-Timing header value, durations in milliseconds."""
+        return ", ".join(
+            f"{name};dur={total.seconds * 1000:.2f}"
+            + (f';desc="{total.count}x"' if total.count > 1 else "")
+            for name, total in self.spans.items()
+        )
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add ``seconds`` to span ``name`` of the current request, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+class Span:
+    """Context manager that records its wall time under ``name``.
+
+    ``with Span("auth"): ...`` costs two perf_counter calls and a dict
+    update, and nothing beyond a ContextVar lookup outside a request.
+    """
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        record(self.name, time.perf_counter() - self._start)
+
+
+@dataclass
+class Histogram:
+    """Cumulative-bucket histogram; observations are O(log buckets)."""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """``(upper bound, observations <= bound)`` pairs, ending with +Inf."""
+        running = 0
+        pairs = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts, strict=True):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class SpanHistograms:
+    """Per-span histograms of per-request durations, aggregated in process."""
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, Histogram] = {}
+
+    def observe(self, timings: RequestTimings, total_seconds: float) -> None:
+        for name, total in timings.spans.items():
+            self._histogram(name).observe(total.seconds)
+        self._histogram("total").observe(total_seconds)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "count": histogram.count,
+                "sum_seconds": histogram.total,
+                "buckets": {_bound_label(b): n for b, n in histogram.cumulative()},
+            }
+            for name, histogram in self.histograms.items()
+        }
+
+    def _histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+
+span_histograms = SpanHistograms()
+
+
+def _bound_label(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+class ServerTimingMiddleware:
+    """Collect span timings per request and report them.
+
+    Spans recorded while the request runs are sent in a Server-Timing header
+    (when ``emit_header`` is set) and folded into ``span_histograms`` once the
+    response completes. The header goes out with the response start, so its
+    ``app`` entry excludes a streamed body; the ``total`` histogram includes it.
+    """
+
+    def __init__(self, app: ASGIApp, emit_header: bool = True) -> None:
+        self.app = app
+        self.emit_header = emit_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.emit_header:
+                app_ms = (time.perf_counter() - start) * 1000
+                value = timings.server_timing()
+                value = f"{value}, app;dur={app_ms:.2f}" if value else f"app;dur={app_ms:.2f}"
+                MutableHeaders(scope=message).append("Server-Timing", value)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _current.reset(token)
+            span_histograms.observe(timings, time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record each statement's execution time under the ``db`` span."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn: Connection, *args: object) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, *args: object) -> None:
+    started = conn.info.get("query_started")
+    if started:
+        record("db", time.perf_counter() - started.pop())
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    started = context.connection.info.get("query_started") if context.connection else None
+    if started:
+        record("db", time.perf_counter() - started.pop())
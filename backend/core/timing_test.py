@@ -0,0 +1,46 @@
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.timing import Histogram, ServerTimingMiddleware, Span, instrument_engine, span_histograms
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self) -> None:
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+        assert histogram.count == 4
+
+
+class TestServerTimingMiddleware:
+    async def test_reports_spans_and_queries(self) -> None:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine.sync_engine)
+        app = FastAPI()
+        app.add_middleware(ServerTimingMiddleware)
+
+        @app.get("/work")
+        async def work() -> dict[str, int]:
+            with Span("auth"):
+                pass
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+            return {"ok": 1}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/work")
+        await engine.dispose()
+
+        entries = {e.split(";")[0]: e for e in response.headers["server-timing"].split(", ")}
+        assert {"auth", "db", "app"} <= entries.keys()
+        assert 'desc="2x"' in entries["db"]
+        assert span_histograms.histograms["db"].count >= 1
+
+    def test_span_outside_request_is_a_no_op(self) -> None:
+        with Span("auth"):
+            pass
@@ -0,0 +1,49 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class VerifiedTokenCache[T]:
+    """Bounded LRU of already-verified bearer tokens.
+
+    Entries are keyed by a digest of the raw token so the cache never holds
+    credentials. An entry is dropped once its ``exp`` has passed or when the
+    signing key set changed since it was stored (``generation`` mismatch).
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[T, float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str, generation: int) -> T | None:
+        """Return the cached value for ``token`` if still valid, else None."""
+        digest = _digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        value, expires_at, entry_generation = entry
+        if expires_at <= time.time() or entry_generation != generation:
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return value
+
+    def put(self, token: str, value: T, expires_at: float, generation: int) -> None:
+        """Store a verified token until ``expires_at`` (epoch seconds)."""
+        if self.max_entries <= 0:
+            return
+        digest = _digest(token)
+        self._entries[digest] = (value, expires_at, generation)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=20).digest()
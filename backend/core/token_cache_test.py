@@ -0,0 +1,39 @@
+import time
+
+from core.token_cache import VerifiedTokenCache
+
+
+class TestVerifiedTokenCache:
+    def test_returns_cached_value(self) -> None:
+        cache: VerifiedTokenCache[str] = VerifiedTokenCache(max_entries=10)
+        cache.put("token-a", "user-a", time.time() + 60, generation=1)
+        assert cache.get("token-a", generation=1) == "user-a"
+        assert cache.get("token-b", generation=1) is None
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache: VerifiedTokenCache[str] = VerifiedTokenCache(max_entries=2)
+        expires_at = time.time() + 60
+        cache.put("a", "A", expires_at, generation=1)
+        cache.put("b", "B", expires_at, generation=1)
+        cache.get("a", generation=1)
+        cache.put("c", "C", expires_at, generation=1)
+        assert cache.get("b", generation=1) is None
+        assert cache.get("a", generation=1) == "A"
+        assert len(cache) == 2
+
+    def test_drops_expired_entries(self) -> None:
+        cache: VerifiedTokenCache[str] = VerifiedTokenCache(max_entries=10)
+        cache.put("a", "A", time.time() - 1, generation=1)
+        assert cache.get("a", generation=1) is None
+        assert len(cache) == 0
+
+    def test_drops_entries_after_key_rotation(self) -> None:
+        cache: VerifiedTokenCache[str] = VerifiedTokenCache(max_entries=10)
+        cache.put("a", "A", time.time() + 60, generation=1)
+        assert cache.get("a", generation=2) is None
+        assert cache.get("a", generation=1) is None
+
+    def test_zero_capacity_disables_cache(self) -> None:
+        cache: VerifiedTokenCache[str] = VerifiedTokenCache(max_entries=0)
+        cache.put("a", "A", time.time() + 60, generation=1)
+        assert cache.get("a", generation=1) is None
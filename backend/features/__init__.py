@@ -0,0 +1,14 @@
+"""Auto-generated feature registration. DO NOT EDIT manually.
+Generated by filter-features.py for the current build tier."""
+from fastapi import FastAPI
+
+from features.health.health_router import router as health_router
+from features.metrics.metrics_router import router as metrics_router
+from features.user.user_router import router as user_router
+
+
+def register_features(app: FastAPI) -> None:
+    """Register all feature routers for this build tier."""
+    app.include_router(health_router)
+    app.include_router(metrics_router)
+    app.include_router(user_router)
@@ -1,14 +1,57 @@
-from fastapi import APIRouter
+from dataclasses import asdict
+from typing import Any
 
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from core.cache import cache_backend
 from core.config import settings
+from core.database import engine
+from core.db_pool import pool_stats
+from core.readiness import ReadinessChecker, get_readiness_checker
+from core.timing import span_histograms
 
 router = APIRouter(prefix="/api/health", tags=["health"])
 
 
 @router.get("")
 async def health_check() -> dict[str, str]:
-    """Health check endpoint."""
+    """Liveness: answers without touching any dependency."""
     return {
         "status": "ok",
         "version": settings.app_version,
     }
+
+
+@router.get("/ready")
+async def readiness(
+    checker: ReadinessChecker = Depends(get_readiness_checker),
+) -> JSONResponse:
+    """Readiness: 200 when every dependency probe passes, 503 otherwise."""
+    report = await checker.check()
+    return JSONResponse(
+        {
+            "status": "ready" if report.ok else "not_ready",
+            "checks": {name: asdict(result) for name, result in report.checks.items()},
+        },
+        status_code=200 if report.ok else 503,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.get("/pool")
+async def pool_status() -> dict[str, int | float]:
+    """Live connection pool counters for sizing workers against max_connections."""
+    return asdict(pool_stats(engine))
+
+
+@router.get("/cache")
+async def cache_status() -> dict[str, int]:
+    """Hit, miss and eviction counters of this worker's cache backend."""
+    return asdict(cache_backend.stats)
+
+
+@router.get("/timings")
+async def timing_histograms() -> dict[str, dict[str, Any]]:
+    """This worker's per-span request duration histograms (auth, pool, db, serialize, total)."""
+    return span_histograms.snapshot()
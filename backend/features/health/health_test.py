@@ -1,6 +1,8 @@
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from core.rate_limit import MemoryRateLimitBackend, RateLimit, RateLimiter, get_rate_limiter
+from core.readiness import ReadinessChecker, get_readiness_checker
 from main import app
 
 
@@ -18,7 +20,71 @@ class TestHealthCheck:
         data = response.json()
         assert data["status"] == "ok"
 
+    async def test_probes_are_not_rate_limited(self, client: AsyncClient) -> None:
+        strict = RateLimiter(MemoryRateLimitBackend(max_keys=100), {}, RateLimit(1, 2))
+        app.dependency_overrides[get_rate_limiter] = lambda: strict
+        try:
+            statuses = [(await client.get("/api/health")).status_code for _ in range(4)]
+            scrapes = [(await client.get("/metrics")).status_code for _ in range(4)]
+        finally:
+            app.dependency_overrides.pop(get_rate_limiter)
+        assert statuses == [200] * 4
+        assert scrapes == [200] * 4
+
     async def test_health_includes_version(self, client: AsyncClient) -> None:
         response = await client.get("/api/health")
         data = response.json()
         assert "version" in data
+
+    async def test_pool_status_reports_counters(self, client: AsyncClient) -> None:
+        response = await client.get("/api/health/pool")
+        assert response.status_code == 200
+        data = response.json()
+        assert {"checked_out", "overflow", "wait_seconds_max"} <= data.keys()
+
+    async def test_cache_status_reports_counters(self, client: AsyncClient) -> None:
+        response = await client.get("/api/health/cache")
+        assert response.status_code == 200
+        assert response.json().keys() == {"hits", "misses", "evictions"}
+
+    async def test_timings_report_span_histograms(self, client: AsyncClient) -> None:
+        await client.get("/api/health")
+        response = await client.get("/api/health/timings")
+        assert response.status_code == 200
+        total = response.json()["total"]
+        assert total["count"] >= 1
+        assert total["buckets"]["+Inf"] == total["count"]
+
+
+async def _ok() -> None:
+    return None
+
+
+async def _down() -> None:
+    raise ConnectionRefusedError("connection refused")
+
+
+class TestReadiness:
+    async def test_ready_when_all_checks_pass(self, client: AsyncClient) -> None:
+        checker = ReadinessChecker({"database": _ok, "jwks": _ok}, ttl=0, timeout=1)
+        app.dependency_overrides[get_readiness_checker] = lambda: checker
+        try:
+            response = await client.get("/api/health/ready")
+        finally:
+            app.dependency_overrides.pop(get_readiness_checker)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["checks"]["database"]["ok"] is True
+
+    async def test_not_ready_reports_failing_check(self, client: AsyncClient) -> None:
+        checker = ReadinessChecker({"database": _ok, "jwks": _down}, ttl=0, timeout=1)
+        app.dependency_overrides[get_readiness_checker] = lambda: checker
+        try:
+            response = await client.get("/api/health/ready")
+        finally:
+            app.dependency_overrides.pop(get_readiness_checker)
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "not_ready"
+        assert "connection refused" in data["checks"]["jwks"]["error"]
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import metrics_registry
+from features.metrics.metrics_service import MetricsService
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    body = await MetricsService(metrics_registry).render()
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
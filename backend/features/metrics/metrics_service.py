@@ -0,0 +1,108 @@
+from dataclasses import asdict
+
+from core.auth import jwks_store, token_cache
+from core.cache import cache_backend
+from core.database import engine, replica_set
+from core.db_pool import pool_stats
+from core.load_shed import concurrency_limiter
+from core.metrics import MetricsRegistry, counter_lines, gauge_lines, histogram_lines
+from core.outbox_dispatcher import outbox_dispatcher
+from core.rate_limit import rate_limiter
+from core.timing import span_histograms
+
+
+class MetricsService:
+    """Renders the Prometheus exposition for a scrape.
+
+    Request counters and latency histograms come from the registry (summed
+    across workers in multiprocess mode). Pool, cache, JWKS, load shedding,
+    rate limiting, outbox and span figures are read live from the worker that
+    serves the scrape.
+    """
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.registry = registry
+
+    async def render(self) -> str:
+        parts = [
+            self.registry.render(await self.registry.collect()),
+            gauge_lines(
+                "http_requests_in_progress",
+                "Requests currently being served by this worker.",
+                {"": self.registry.in_progress},
+            ),
+            *self._pool_gauges(),
+            counter_lines(
+                "cache_operations_total",
+                "Cache backend lookups by outcome, and evictions.",
+                {k: float(v) for k, v in asdict(cache_backend.stats).items()},
+                label="outcome",
+            ),
+            counter_lines(
+                "jwks_events_total",
+                "JWKS key store fetches, fetch errors, forced refreshes and unknown kids.",
+                {k: float(v) for k, v in asdict(jwks_store.stats).items()},
+                label="event",
+            ),
+            gauge_lines(
+                "load_shed_concurrency",
+                "Adaptive in-flight request cap, current in-flight count and requests shed.",
+                {
+                    "limit": float(concurrency_limiter.limit),
+                    "in_flight": float(concurrency_limiter.in_flight),
+                    "shed": float(concurrency_limiter.shed),
+                },
+                label="value",
+            ),
+            counter_lines(
+                "rate_limit_rejections_total",
+                "Requests refused with 429 by this worker's rate limiter.",
+                {"": float(rate_limiter.rejections)},
+            ),
+            counter_lines(
+                "outbox_events_total",
+                "Outbox events delivered, scheduled for retry and given up on by this worker.",
+                {k: float(v) for k, v in asdict(outbox_dispatcher.stats).items()},
+                label="outcome",
+            ),
+            gauge_lines(
+                "token_cache_entries",
+                "Verified bearer tokens cached by this worker.",
+                {"": float(len(token_cache))},
+            ),
+            histogram_lines(
+                "request_span_duration_seconds",
+                "Per-request time spent in auth, pool checkout, queries and serialization.",
+                span_histograms.histograms,
+                label="span",
+            ),
+        ]
+        return "".join(parts)
+
+    def _pool_gauges(self) -> list[str]:
+        engines = {"primary": engine}
+        if replica_set is not None:
+            engines |= {f"replica{i}": e for i, e in enumerate(replica_set.engines)}
+        stats = {name: pool_stats(e) for name, e in engines.items()}
+        return [
+            gauge_lines(
+                f"db_pool_{field}",
+                f"Connection pool {field.replace('_', ' ')} per engine.",
+                {name: float(getattr(s, field)) for name, s in stats.items()},
+                label="engine",
+            )
+            for field in ("checked_out", "checked_in", "overflow", "capacity")
+        ] + [
+            counter_lines(
+                "db_pool_wait_seconds_total",
+                "Total time spent waiting for a pooled connection per engine.",
+                {name: s.wait_seconds_total for name, s in stats.items()},
+                label="engine",
+            ),
+            gauge_lines(
+                "db_pool_wait_seconds_recent",
+                "Decaying average of recent pool checkout waits per engine.",
+                {name: s.wait_seconds_recent for name, s in stats.items()},
+                label="engine",
+            ),
+        ]
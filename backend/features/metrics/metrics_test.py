@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from core.metrics import MetricsRegistry, MultiprocessStore, merge_snapshots
+from main import app
+
+
+@pytest.fixture
+async def client() -> AsyncClient:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+class TestMetricsEndpoint:
+    async def test_exposes_requests_by_route_template(self, client: AsyncClient) -> None:
+        await client.get("/api/health")
+        await client.get("/no/such/path")
+
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/api/health",status="200"}' in body
+        assert 'route="unmatched",status="404"' in body
+        assert 'duration_seconds_bucket{method="GET",route="/api/health",le="+Inf"}' in body
+        assert 'db_pool_checked_out{engine="primary"}' in body
+        assert "# TYPE cache_operations_total counter" in body
+        assert "rate_limit_rejections_total 0" in body
+
+
+class TestMultiprocessAggregation:
+    async def test_sums_worker_snapshots(self, tmp_path: Path) -> None:
+        registry = MetricsRegistry(MultiprocessStore(tmp_path))
+        counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+        histogram = registry.histogram("job_seconds", "Job time.", buckets=(1.0,))
+        counter.inc(("a",), 2)
+        histogram.observe((), 0.5)
+
+        other_worker = registry.snapshot()
+        (tmp_path / "999999.json").write_text(json.dumps(other_worker))
+
+        merged = await registry.collect()
+        assert merged == merge_snapshots([other_worker, other_worker])
+        rendered = registry.render(merged)
+        assert 'jobs_total{kind="a"} 4' in rendered
+        assert 'job_seconds_bucket{le="1"} 2' in rendered
+        assert "job_seconds_count 2" in rendered
@@ -0,0 +1,27 @@
+from collections.abc import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from features.user.user_repository import UserRepository
+from features.user.user_schema import UserResponse
+
+
+class UserExportService:
+    """Streams every matching user from a server-side cursor in constant memory.
+
+    The export opens its own session because a streamed response body keeps
+    running after the request-scoped session has been closed.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self.session_factory = session_factory
+
+    async def export_users(
+        self,
+        after_id: int | None,
+        email_prefix: str | None,
+    ) -> AsyncIterator[UserResponse]:
+        async with self.session_factory() as session, session.begin():
+            repository = UserRepository(session)
+            async for row in repository.stream_rows(after_id, email_prefix):
+                yield UserResponse.model_validate(row)
@@ -0,0 +1,212 @@
+import csv
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from typing import Literal, Self
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from features.user.user_repository import UserRepository
+from features.user.user_schema import CreateUserRequest, UserImportResult
+
+ImportFormat = Literal["ndjson", "csv"]
+
+MAX_LINE_BYTES = 64 * 1024
+
+# A decoded line, or the error to report for a line that could not be read.
+Line = str | ValueError
+
+
+class UserImportService:
+    """Streams a bulk user import through batched multi-row inserts.
+
+    Rows are parsed line by line as the request body arrives, validated with
+    CreateUserRequest and inserted ``batch_size`` at a time, each batch in its
+    own transaction. A result is yielded for every row, so neither the payload
+    nor the results are ever held in memory.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int,
+        repository_factory: Callable[[AsyncSession], UserRepository] = UserRepository,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.repository_factory = repository_factory
+
+    async def import_rows(
+        self,
+        chunks: AsyncIterator[bytes],
+        fmt: ImportFormat,
+    ) -> AsyncIterator[UserImportResult]:
+        csv_rows = _CsvRows() if fmt == "csv" else None
+        records = _csv_records(_lines(chunks)) if csv_rows else _ndjson_records(_lines(chunks))
+        batch: list[tuple[int, CreateUserRequest]] = []
+        async for line_no, record in records:
+            if csv_rows is not None and csv_rows.header is None and isinstance(record, str):
+                csv_rows.read_header(record)
+                continue
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                parse = csv_rows.parse if csv_rows else _parse_ndjson
+                batch.append((line_no, parse(record)))
+            except (ValidationError, ValueError) as exc:
+                yield UserImportResult(line=line_no, status="invalid", error=_describe(exc))
+                continue
+            if len(batch) >= self.batch_size:
+                for result in await self._insert_batch(batch):
+                    yield result
+                batch = []
+        if batch:
+            for result in await self._insert_batch(batch):
+                yield result
+
+    async def _insert_batch(
+        self,
+        batch: list[tuple[int, CreateUserRequest]],
+    ) -> list[UserImportResult]:
+        rows: dict[str, dict[str, str]] = {}
+        for _, request in batch:
+            rows.setdefault(request.email, {"email": request.email, "name": request.name})
+
+        async with self.session_factory() as session, session.begin():
+            repository = self.repository_factory(session)
+            created = await repository.create_many_unique(list(rows.values()))
+            await repository.add_created_events(created)
+
+        results: list[UserImportResult] = []
+        for line_no, request in batch:
+            user_id = created.pop(request.email, None)
+            status = "created" if user_id is not None else "conflict"
+            results.append(
+                UserImportResult(line=line_no, status=status, id=user_id, email=request.email)
+            )
+        return results
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Line]]:
+    """Split a UTF-8 byte stream into numbered lines, blank ones included.
+
+    Lines are split before decoding, so MAX_LINE_BYTES bounds their encoded
+    size. A longer line is discarded as it arrives; it and a line that is not
+    valid UTF-8 are yielded as the ValueError to report for that line.
+    """
+    buffer = b""
+    oversized = False
+    line_no = 0
+    async for chunk in chunks:
+        *complete, buffer = (buffer + chunk).split(b"\n")
+        for line in complete:
+            line_no += 1
+            if oversized or len(line) > MAX_LINE_BYTES:
+                oversized = False
+                yield line_no, _too_long()
+            else:
+                yield line_no, _decode(line)
+        if len(buffer) > MAX_LINE_BYTES:
+            oversized, buffer = True, b""
+    if oversized or buffer:
+        yield line_no + 1, _too_long() if oversized else _decode(buffer)
+
+
+def _decode(line: bytes) -> Line:
+    try:
+        return line.decode().rstrip("\r")
+    except UnicodeDecodeError as exc:
+        return ValueError(f"Line is not valid UTF-8 (byte {exc.start})")
+
+
+def _too_long() -> ValueError:
+    return ValueError(f"Line exceeds {MAX_LINE_BYTES} bytes")
+
+
+async def _ndjson_records(
+    lines: AsyncIterator[tuple[int, Line]],
+) -> AsyncIterator[tuple[int, Line]]:
+    async for line_no, line in lines:
+        if not isinstance(line, str) or line.strip():
+            yield line_no, line
+
+
+async def _csv_records(
+    lines: AsyncIterator[tuple[int, Line]],
+) -> AsyncIterator[tuple[int, Line]]:
+    """Join lines into CSV records, numbered by their first line.
+
+    A record continues while it has an odd number of quote characters, i.e.
+    a quoted field is still open. Records are bounded by MAX_LINE_BYTES as
+    a whole; one that outgrows it, or that takes in an unusable line, is
+    yielded as the error to report.
+    """
+    record: list[str] = []
+    start = size = quotes = 0
+    async for line_no, line in lines:
+        if not record:
+            if isinstance(line, str) and not line.strip():
+                continue
+            start = line_no
+        if isinstance(line, ValueError):
+            yield start, line
+        else:
+            quotes += line.count('"')
+            if record or quotes % 2:
+                size += len(line.encode()) + 1
+            if size > MAX_LINE_BYTES:
+                yield start, ValueError(f"Record exceeds {MAX_LINE_BYTES} bytes")
+            else:
+                record.append(line)
+                if quotes % 2:
+                    continue
+                yield start, "\n".join(record)
+        record, size, quotes = [], 0, 0
+    if record:
+        yield start, "\n".join(record)
+
+
+class _CsvRows:
+    """Parses CSV records with a single csv.reader.
+
+    The reader pulls from a buffer that each ``parse`` call refills with one
+    complete record, so it never runs dry in the middle of a quoted field.
+    """
+
+    def __init__(self) -> None:
+        self.header: list[str] | None = None
+        self._pending: deque[str] = deque()
+        self._reader = csv.reader(self)
+
+    def __iter__(self) -> Self:
+        return self
+
+    def __next__(self) -> str:
+        if not self._pending:
+            raise StopIteration
+        return self._pending.popleft()
+
+    def read_header(self, record: str) -> None:
+        self.header = [name.strip().lstrip("\ufeff") for name in self._read(record)]
+
+    def parse(self, record: str) -> CreateUserRequest:
+        values = self._read(record)
+        if self.header is None or len(values) != len(self.header):
+            raise ValueError("Column count does not match the header")
+        return CreateUserRequest.model_validate(dict(zip(self.header, values, strict=True)))
+
+    def _read(self, record: str) -> list[str]:
+        self._pending.append(record)
+        return next(self._reader, [])
+
+
+def _parse_ndjson(line: str) -> CreateUserRequest:
+    return CreateUserRequest.model_validate_json(line)
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        error = exc.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        return f"{location}: {error['msg']}" if location else error["msg"]
+    return str(exc)
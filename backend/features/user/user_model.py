@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, func
+from sqlalchemy import Index, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.database import Base
@@ -8,8 +8,16 @@ from core.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Code point ordered email index for prefix ranges; see user_repository._list_query.
+        Index("ix_users_email_c", text('email COLLATE "C"')).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     name: Mapped[str] = mapped_column(String(100))
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -1,23 +1,253 @@
-from sqlalchemy import select
+import functools
+import json
+import sys
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from sqlalchemy import Integer, Row, Select, Table, any_, bindparam, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import CacheBackend
+from core.database import on_commit
+from core.dataloader import DataLoader
+from core.outbox import enqueue
 from features.user.user_model import User
 
+USER_CREATED = "UserCreated"
+
 
 class UserRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        self.loader: DataLoader[int, User] = DataLoader(self.get_many)
 
     async def get_by_id(self, user_id: int) -> User | None:
-        return await self.session.get(User, user_id)
+        """Load one user; concurrent calls in a request share a single query."""
+        return await self.loader.load(user_id)
+
+    async def get_version(self, user_id: int) -> datetime | None:
+        """The user's ``updated_at``, without loading the row; None if absent."""
+        result = await self.session.execute(select(User.updated_at).where(User.id == user_id))
+        return result.scalar_one_or_none()
+
+    async def get_many(self, user_ids: list[int]) -> dict[int, User]:
+        """Fetch users by id with one query; unknown ids are absent from the result."""
+        if not user_ids:
+            return {}
+        if _dialect(self.session) == "postgresql":
+            # One array parameter keeps the statement text, and its prepared plan, stable.
+            ids = bindparam("user_ids", list(user_ids), type_=postgresql.ARRAY(Integer))
+            condition = User.id == any_(ids)
+        else:
+            condition = User.id.in_(user_ids)
+        result = await self.session.execute(select(User).where(condition))
+        return {user.id: user for user in result.scalars()}
 
     async def get_by_email(self, email: str) -> User | None:
         stmt = select(User).where(User.email == email)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def create(self, user: User) -> User:
-        self.session.add(user)
-        await self.session.flush()
-        await self.session.refresh(user)
+    async def list_page(
+        self,
+        after_id: int | None,
+        email_prefix: str | None,
+        limit: int,
+    ) -> list[User]:
+        """Up to ``limit`` users with id greater than ``after_id``, in id order."""
+        stmt = _list_query(after_id, email_prefix, _dialect(self.session)).limit(limit)
+        result = await self.session.execute(stmt)
+        return list(result.scalars())
+
+    async def stream_rows(
+        self,
+        after_id: int | None,
+        email_prefix: str | None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """Yield matching user rows from a server-side cursor, ``batch_size`` at a time."""
+        table = User.__table__
+        stmt = _list_query(after_id, email_prefix, _dialect(self.session))
+        stmt = stmt.with_only_columns(*table.c)
+        result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
+    async def create_unique(self, email: str, name: str) -> User | None:
+        """Insert a user in one statement; return None if the email is already taken.
+
+        Uses INSERT ... ON CONFLICT DO NOTHING RETURNING, so concurrent signups
+        with the same email cannot race past a uniqueness check.
+        """
+        stmt = _insert_ignoring_duplicates(self.session, User, {"email": email, "name": name})
+        result = await self.session.execute(stmt.returning(User))
+        return result.scalar_one_or_none()
+
+    async def create_many_unique(self, rows: list[dict[str, str]]) -> dict[str, int]:
+        """Insert rows with one multi-VALUES statement, skipping taken emails.
+
+        Returns the id of every inserted row keyed by email.
+        """
+        table = User.__table__
+        stmt = _insert_ignoring_duplicates(self.session, table, rows)
+        result = await self.session.execute(stmt.returning(table.c.email, table.c.id))
+        return {email: user_id for email, user_id in result}
+
+    async def add_created_events(self, created: dict[str, int]) -> None:
+        """Queue a UserCreated event per new user, committed with the insert itself."""
+        await enqueue(
+            self.session,
+            USER_CREATED,
+            ({"user_id": user_id, "email": email} for email, user_id in created.items()),
+        )
+
+
+class CachedUserRepository(UserRepository):
+    """UserRepository with read-through caching of single-user lookups.
+
+    Users are cached by id and by email for ``ttl`` seconds; lookups that
+    find nothing are cached for ``negative_ttl`` seconds so repeated 404s
+    skip the database too. Creating users invalidates their keys once the
+    transaction commits. Cache hits return User instances that are not
+    attached to the session.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: CacheBackend,
+        ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        super().__init__(session)
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        key = _id_key(user_id)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return _decode_user(cached)
+        user = await super().get_by_id(user_id)
+        await self._store(key, user)
+        return user
+
+    async def get_version(self, user_id: int) -> datetime | None:
+        cached = await self.cache.get(_id_key(user_id))
+        if cached is None:
+            return await super().get_version(user_id)
+        user = _decode_user(cached)
+        return user.updated_at if user is not None else None
+
+    async def get_by_email(self, email: str) -> User | None:
+        key = _email_key(email)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return _decode_user(cached)
+        user = await super().get_by_email(email)
+        await self._store(key, user)
         return user
+
+    async def create_unique(self, email: str, name: str) -> User | None:
+        user = await super().create_unique(email, name)
+        if user is not None:
+            self._invalidate_on_commit(_id_key(user.id), _email_key(email))
+        return user
+
+    async def create_many_unique(self, rows: list[dict[str, str]]) -> dict[str, int]:
+        created = await super().create_many_unique(rows)
+        self._invalidate_on_commit(*(
+            key for email, user_id in created.items()
+            for key in (_id_key(user_id), _email_key(email))
+        ))
+        return created
+
+    def _invalidate_on_commit(self, *keys: str) -> None:
+        # Deleting before the commit would let a concurrent lookup miss the
+        # uncommitted row and cache it as absent for the negative TTL.
+        if keys:
+            on_commit(self.session, functools.partial(self.cache.delete, *keys))
+
+    async def _store(self, key: str, user: User | None) -> None:
+        if user is None:
+            await self.cache.set(key, _MISSING, self.negative_ttl)
+        else:
+            await self.cache.set(key, _encode_user(user), self.ttl)
+
+
+# Cached in place of a user that does not exist.
+_MISSING = b""
+
+
+def _id_key(user_id: int) -> str:
+    return f"user:id:{user_id}"
+
+
+def _email_key(email: str) -> str:
+    return f"user:email:{email}"
+
+
+def _encode_user(user: User) -> bytes:
+    return json.dumps({
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "created_at": user.created_at.isoformat(),
+        "updated_at": user.updated_at.isoformat(),
+    }).encode()
+
+
+def _decode_user(cached: bytes) -> User | None:
+    if cached == _MISSING:
+        return None
+    data = json.loads(cached)
+    for field in ("created_at", "updated_at"):
+        data[field] = datetime.fromisoformat(data[field])
+    return User(**data)
+
+
+def _list_query(after_id: int | None, email_prefix: str | None, dialect: str) -> Select:
+    """Keyset query on id; the email prefix is also a range so an email index applies.
+
+    The range bounds hold in code point order only, so on PostgreSQL they
+    compare under ``COLLATE "C"`` (served by ``ix_users_email_c``): under a
+    locale collation such as en_US, "john.doe" sorts above "john/".
+    """
+    stmt = select(User).order_by(User.id)
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    if email_prefix:
+        email = User.email.collate("C") if dialect == "postgresql" else User.email
+        stmt = stmt.where(email >= email_prefix)
+        upper = _prefix_upper_bound(email_prefix)
+        if upper is not None:
+            stmt = stmt.where(email < upper)
+        stmt = stmt.where(User.email.startswith(email_prefix, autoescape=True))
+    return stmt
+
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """The least string above every string starting with ``prefix``; None if unbounded."""
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:  # surrogates cannot be encoded
+        following = 0xE000
+    return prefix[:-1] + chr(following)
+
+
+def _dialect(session: AsyncSession) -> str:
+    return session.get_bind().dialect.name
+
+
+def _insert_ignoring_duplicates(
+    session: AsyncSession,
+    target: type[User] | Table,
+    values: dict[str, str] | list[dict[str, str]],
+) -> postgresql.Insert | sqlite.Insert:
+    """INSERT ... ON CONFLICT (email) DO NOTHING in the session's SQL dialect."""
+    insert = sqlite.insert if _dialect(session) == "sqlite" else postgresql.insert
+    return insert(target).values(values).on_conflict_do_nothing(index_elements=["email"])
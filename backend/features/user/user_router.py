@@ -1,23 +1,142 @@
-from fastapi import APIRouter, Depends, status
+from collections.abc import AsyncIterator
+from typing import Annotated, Literal
 
-from core.dependencies import get_user_service
-from features.user.user_schema import CreateUserRequest, UserResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from core.dependencies import (
+    get_read_user_service,
+    get_user_export_service,
+    get_user_import_service,
+    get_user_service,
+)
+from core.http_cache import Validators, cache_control, is_conditional
+from core.idempotency import IdempotentCall, idempotent_request
+from core.responses import ModelJSONResponse, ModelResponseRoute
+from core.streaming import DuplexStreamingResponse
+from features.user.user_export_service import UserExportService
+from features.user.user_import_service import ImportFormat, UserImportService
+from features.user.user_schema import (
+    BatchGetUsersRequest,
+    BatchGetUsersResponse,
+    CreateUserRequest,
+    UserPage,
+    UserResponse,
+)
 from features.user.user_service import UserService
 
-router = APIRouter(prefix="/api/users", tags=["users"])
+router = APIRouter(prefix="/api/users", tags=["users"], route_class=ModelResponseRoute)
+
+IMPORT_FORMATS: dict[str, ImportFormat] = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=UserResponse)
 async def create_user(
     request: CreateUserRequest,
+    idempotent: IdempotentCall | None = Depends(idempotent_request),
     service: UserService = Depends(get_user_service),
-) -> UserResponse:
-    return await service.create_user(request)
+) -> UserResponse | Response:
+    """Create a user.
+
+    A retry carrying the same ``Idempotency-Key`` gets the first response
+    replayed without creating the user again or opening a session.
+    """
+    user = await service.create_user(request)
+    if idempotent is None:
+        return user
+    return idempotent.save(ModelJSONResponse(user, status_code=status.HTTP_201_CREATED))
+
+
+@router.get(
+    "",
+    response_model=UserPage,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def list_users(
+    after: Annotated[int | None, Query(description="Return users with id above this")] = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+    email_prefix: Annotated[str | None, Query(min_length=1, max_length=255)] = None,
+    fmt: Annotated[Literal["json", "ndjson"] | None, Query(alias="format")] = None,
+    accept: Annotated[str, Header()] = "application/json",
+    service: UserService = Depends(get_read_user_service),
+    exporter: UserExportService = Depends(get_user_export_service),
+) -> UserPage | StreamingResponse:
+    """Page through users in id order, or stream every match as NDJSON.
+
+    Pass ``next_cursor`` back as ``after`` to fetch the next page. The NDJSON
+    form (``format=ndjson`` or ``Accept: application/x-ndjson``) ignores
+    ``limit`` and streams all matching users from a server-side cursor.
+    """
+    if fmt is None:
+        fmt = "ndjson" if "application/x-ndjson" in accept else "json"
+    if fmt == "ndjson":
+        users = exporter.export_users(after, email_prefix)
+        return StreamingResponse(_ndjson(users), media_type="application/x-ndjson")
+    return await service.list_users(after, email_prefix, limit)
+
 
+@router.post(":batchGet", response_model=BatchGetUsersResponse)
+async def batch_get_users(
+    request: BatchGetUsersRequest,
+    service: UserService = Depends(get_read_user_service),
+) -> BatchGetUsersResponse:
+    """Fetch up to 500 users by id with a single query."""
+    return await service.get_users(request.ids)
 
-@router.get("/{user_id}", response_model=UserResponse)
+
+@router.post(
+    ":import",
+    response_class=DuplexStreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def import_users(
+    request: Request,
+    content_type: Annotated[str, Header()] = "application/x-ndjson",
+    importer: UserImportService = Depends(get_user_import_service),
+) -> DuplexStreamingResponse:
+    """Bulk-create users from an NDJSON or CSV body, streaming one result line per row."""
+    fmt = IMPORT_FORMATS.get(content_type.split(";")[0].strip().lower())
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of: {', '.join(IMPORT_FORMATS)}",
+        )
+    results = importer.import_rows(request.stream(), fmt)
+    return DuplexStreamingResponse(_ndjson(results), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/{user_id}",
+    response_model=UserResponse,
+    responses={304: {"description": "The client's copy is current"}},
+)
 async def get_user(
     user_id: int,
-    service: UserService = Depends(get_user_service),
-) -> UserResponse:
-    return await service.get_user(user_id)
+    request: Request,
+    service: UserService = Depends(get_read_user_service),
+) -> Response:
+    """Fetch a user, answering If-None-Match/If-Modified-Since with 304 when unchanged.
+
+    Conditional requests are checked against a version probe (or the cache)
+    before the full user is loaded.
+    """
+    policy = cache_control("get_user", "private, no-cache")
+    if is_conditional(request.headers):
+        updated_at = await service.get_user_version(user_id)
+        if updated_at is not None:
+            validators = Validators.for_version("user", user_id, updated_at=updated_at)
+            if validators.is_fresh(request.headers):
+                return validators.not_modified(policy)
+    user = await service.get_user(user_id)
+    validators = Validators.for_version("user", user.id, updated_at=user.updated_at)
+    return ModelJSONResponse(user, headers=validators.headers(policy))
+
+
+async def _ndjson(results: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+    async for result in results:
+        yield result.model_dump_json(exclude_none=True).encode() + b"\n"
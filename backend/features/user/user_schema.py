@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class CreateUserRequest(BaseModel):
@@ -13,5 +14,28 @@ class UserResponse(BaseModel):
     email: str
     name: str
     created_at: datetime
+    updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class UserPage(BaseModel):
+    items: list[UserResponse]
+    next_cursor: int | None = None
+
+
+class BatchGetUsersRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=500)
+
+
+class BatchGetUsersResponse(BaseModel):
+    users: list[UserResponse]
+    missing: list[int]
+
+
+class UserImportResult(BaseModel):
+    line: int
+    status: Literal["created", "conflict", "invalid"]
+    id: int | None = None
+    email: str | None = None
+    error: str | None = None
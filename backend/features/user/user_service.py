@@ -1,8 +1,14 @@
+from datetime import datetime
+
 from fastapi import HTTPException, status
 
-from features.user.user_model import User
 from features.user.user_repository import UserRepository
-from features.user.user_schema import CreateUserRequest, UserResponse
+from features.user.user_schema import (
+    BatchGetUsersResponse,
+    CreateUserRequest,
+    UserPage,
+    UserResponse,
+)
 
 
 class UserService:
@@ -10,14 +16,13 @@ class UserService:
         self.repository = repository
 
     async def create_user(self, request: CreateUserRequest) -> UserResponse:
-        existing = await self.repository.get_by_email(request.email)
-        if existing:
+        created = await self.repository.create_unique(request.email, request.name)
+        if created is None:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Email already exists",
             )
-        user = User(email=request.email, name=request.name)
-        created = await self.repository.create(user)
+        await self.repository.add_created_events({created.email: created.id})
         return UserResponse.model_validate(created)
 
     async def get_user(self, user_id: int) -> UserResponse:
@@ -28,3 +33,29 @@ class UserService:
                 detail="User not found",
             )
         return UserResponse.model_validate(user)
+
+    async def get_user_version(self, user_id: int) -> datetime | None:
+        """Cheap probe for conditional requests: when the user last changed."""
+        return await self.repository.get_version(user_id)
+
+    async def get_users(self, user_ids: list[int]) -> BatchGetUsersResponse:
+        """Users in request order (duplicates collapsed); unknown ids go to ``missing``."""
+        ordered = list(dict.fromkeys(user_ids))
+        found = await self.repository.get_many(ordered)
+        return BatchGetUsersResponse(
+            users=[UserResponse.model_validate(found[i]) for i in ordered if i in found],
+            missing=[i for i in ordered if i not in found],
+        )
+
+    async def list_users(
+        self,
+        after_id: int | None,
+        email_prefix: str | None,
+        limit: int,
+    ) -> UserPage:
+        users = await self.repository.list_page(after_id, email_prefix, limit)
+        next_cursor = users[-1].id if len(users) == limit else None
+        return UserPage(
+            items=[UserResponse.model_validate(user) for user in users],
+            next_cursor=next_cursor,
+        )
@@ -1,11 +1,38 @@
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-from core.database import Base, get_session
+from core import database
+from core.cache import MemoryCache, cache_backend
+from core.database import (
+    Base,
+    get_read_session,
+    get_session,
+    get_session_factory,
+    get_stream_session_factory,
+    make_read_session_factory,
+)
+from core.outbox import OutboxMessage
+from core.replicas import ReplicaSet
+from features.user import user_import_service
+from features.user.user_repository import CachedUserRepository, UserRepository
 from main import app
 
 TEST_DB_URL = "sqlite+aiosqlite:///:memory:"
+# CI points DATABASE_URL at PostgreSQL for tests whose behavior SQLite cannot show.
+POSTGRES_URL = os.getenv("DATABASE_URL", "")
 test_engine = create_async_engine(TEST_DB_URL)
 TestSession = async_sessionmaker(test_engine, expire_on_commit=False)
 
@@ -17,6 +44,7 @@ async def setup_db():
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    await cache_backend.clear()
 
 
 @pytest.fixture
@@ -26,7 +54,14 @@ async def client() -> AsyncClient:
             async with session.begin():
                 yield session
 
+    async def override_read_session() -> AsyncIterator[AsyncSession]:
+        async with TestSession() as session:
+            yield session
+
     app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_read_session] = override_read_session
+    app.dependency_overrides[get_session_factory] = lambda: TestSession
+    app.dependency_overrides[get_stream_session_factory] = lambda: TestSession
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
@@ -57,6 +92,171 @@ class TestCreateUser:
         })
         assert response.status_code == 409
 
+    async def test_queues_user_created_event(self, client: AsyncClient) -> None:
+        response = await client.post("/api/users", json={
+            "email": "event@example.com",
+            "name": "Evented",
+        })
+        await client.post("/api/users", json={"email": "event@example.com", "name": "Again"})
+        async with TestSession() as session:
+            events = (await session.execute(select(OutboxMessage))).scalars().all()
+        assert [(e.event_type, e.payload) for e in events] == [
+            ("UserCreated", {"user_id": response.json()["id"], "email": "event@example.com"}),
+        ]
+
+
+@pytest.mark.skipif(
+    not POSTGRES_URL.startswith("postgresql"), reason="needs DATABASE_URL set to PostgreSQL"
+)
+class TestEmailPrefixOnPostgres:
+    @pytest.fixture
+    async def repository(self) -> AsyncIterator[UserRepository]:
+        engine = create_async_engine(POSTGRES_URL)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with async_sessionmaker(engine)() as session, session.begin():
+                yield UserRepository(session)
+        finally:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+            await engine.dispose()
+
+    async def test_prefix_ending_in_punctuation(self, repository: UserRepository) -> None:
+        emails = ["john.doe@example.com", "john-doe@example.com", "john/@example.com", "johnd@x.io"]
+        await repository.create_many_unique([{"email": e, "name": "John"} for e in emails])
+
+        page = await repository.list_page(None, "john.", 10)
+        assert [user.email for user in page] == ["john.doe@example.com"]
+
+    async def test_streams_the_same_rows(self, repository: UserRepository) -> None:
+        emails = ["john.doe@example.com", "john.roe@example.com", "johnd@x.io"]
+        await repository.create_many_unique([{"email": e, "name": "John"} for e in emails])
+
+        rows = [row.email async for row in repository.stream_rows(None, "john.")]
+        assert rows == ["john.doe@example.com", "john.roe@example.com"]
+
+
+class TestConcurrentCreateUser:
+    async def test_parallel_duplicates_create_one_user(self, tmp_path: Path) -> None:
+        # A file database gives each request its own connection, like Postgres does.
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'race.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def override_session() -> AsyncIterator[AsyncSession]:
+            async with factory() as session:
+                async with session.begin():
+                    yield session
+
+        app.dependency_overrides[get_session] = override_session
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as ac:
+                responses = await asyncio.gather(*(
+                    ac.post("/api/users", json={"email": "race@example.com", "name": "Racer"})
+                    for _ in range(10)
+                ))
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+        statuses = sorted(response.status_code for response in responses)
+        assert statuses == [201] + [409] * 9
+
+
+class TestImportUsers:
+    async def test_imports_ndjson_rows(self, client: AsyncClient) -> None:
+        await client.post("/api/users", json={"email": "taken@example.com", "name": "Taken"})
+        body = "\n".join([
+            '{"email": "a@example.com", "name": "A"}',
+            '{"email": "not-an-email", "name": "Bad"}',
+            '{"email": "taken@example.com", "name": "Again"}',
+            "",
+            '{"email": "b@example.com", "name": "B"}',
+        ])
+        response = await client.post(
+            "/api/users:import",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        results = {r["line"]: r for r in map(json.loads, response.text.splitlines())}
+        assert results[1]["status"] == "created"
+        assert results[2]["status"] == "invalid"
+        assert results[3]["status"] == "conflict"
+        assert results[5]["status"] == "created"
+
+        fetched = await client.get(f"/api/users/{results[5]['id']}")
+        assert fetched.json()["email"] == "b@example.com"
+
+    async def test_imports_csv_rows(self, client: AsyncClient) -> None:
+        body = "email,name\nc@example.com,C\nc@example.com,Duplicate\nd@example.com\n"
+        response = await client.post(
+            "/api/users:import",
+            content=body,
+            headers={"Content-Type": "text/csv"},
+        )
+        statuses = [json.loads(line)["status"] for line in response.text.splitlines()]
+        assert sorted(statuses) == ["conflict", "created", "invalid"]
+
+    async def test_csv_quoted_field_spans_lines(self, client: AsyncClient) -> None:
+        body = 'email,name\ne@example.com,"Multi\n\nLine"\nf@example.com,F\n'
+        response = await client.post(
+            "/api/users:import",
+            content=body,
+            headers={"Content-Type": "text/csv"},
+        )
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert [(r["line"], r["status"]) for r in results] == [(2, "created"), (5, "created")]
+
+        fetched = await client.get(f"/api/users/{results[0]['id']}")
+        assert fetched.json()["name"] == "Multi\n\nLine"
+
+    async def test_line_limit_counts_bytes(
+        self, client: AsyncClient, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(user_import_service, "MAX_LINE_BYTES", 56)
+        body = "\n".join([
+            '{"email": "g@example.com", "name": "ééééééé"}',
+            '{"email": "h@example.com", "name": "ééééééééééééé"}',
+        ])
+        response = await client.post(
+            "/api/users:import",
+            content=body.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        results = {r["line"]: r for r in map(json.loads, response.text.splitlines())}
+        assert results[1]["status"] == "created"
+        assert results[2]["status"] == "invalid"
+
+    async def test_invalid_utf8_line_is_reported_not_fatal(self, client: AsyncClient) -> None:
+        body = b"\n".join([
+            b'{"email": "i@example.com", "name": "I"}',
+            b"\xff\xfe",
+            b'{"email": "j@example.com", "name": "J"}',
+        ])
+        response = await client.post(
+            "/api/users:import",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        results = {r["line"]: r for r in map(json.loads, response.text.splitlines())}
+        assert results[1]["status"] == "created"
+        assert results[2]["status"] == "invalid"
+        assert "UTF-8" in results[2]["error"]
+        assert results[3]["status"] == "created"
+
+    async def test_rejects_unsupported_content_type(self, client: AsyncClient) -> None:
+        response = await client.post(
+            "/api/users:import",
+            content="{}",
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 415
+
 
 class TestGetUser:
     async def test_returns_user_by_id(self, client: AsyncClient) -> None:
@@ -73,3 +273,246 @@ class TestGetUser:
     async def test_returns_404_for_nonexistent(self, client: AsyncClient) -> None:
         response = await client.get("/api/users/99999")
         assert response.status_code == 404
+
+
+async def _user_db(path: Path, name: str) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine)() as session, session.begin():
+        await UserRepository(session).create_unique("copy@example.com", name)
+    return engine
+
+
+class TestGetUserFromReplica:
+    """Reads go through the real get_read_session, with a replica configured."""
+
+    async def _get_name(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, replicas: ReplicaSet,
+    ) -> str:
+        primary = await _user_db(tmp_path / "primary.db", "Primary")
+        monkeypatch.setattr(
+            database, "read_session_factory", make_read_session_factory(primary, replicas),
+        )
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.get("/api/users/1")
+        await primary.dispose()
+        assert response.status_code == 200
+        return response.json()["name"]
+
+    async def test_reads_from_replica(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path,
+    ) -> None:
+        replica = await _user_db(tmp_path / "replica.db", "Replica")
+        assert await self._get_name(monkeypatch, tmp_path, ReplicaSet([replica])) == "Replica"
+        await replica.dispose()
+
+    async def test_falls_back_to_primary(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path,
+    ) -> None:
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'x.db'}")
+        replicas = ReplicaSet([broken], cooldown=60.0)
+        assert await self._get_name(monkeypatch, tmp_path, replicas) == "Primary"
+        assert replicas.choose() is None
+        await broken.dispose()
+
+
+class TestListUsers:
+    async def _create(self, client: AsyncClient, *emails: str) -> None:
+        for email in emails:
+            await client.post("/api/users", json={"email": email, "name": "Listed"})
+
+    async def test_pages_with_cursor(self, client: AsyncClient) -> None:
+        await self._create(client, "a@example.com", "b@example.com", "c@example.com")
+
+        first = (await client.get("/api/users", params={"limit": 2})).json()
+        assert [u["email"] for u in first["items"]] == ["a@example.com", "b@example.com"]
+        assert first["next_cursor"] == first["items"][-1]["id"]
+
+        second = (await client.get("/api/users", params={
+            "limit": 2,
+            "after": first["next_cursor"],
+        })).json()
+        assert [u["email"] for u in second["items"]] == ["c@example.com"]
+        assert second["next_cursor"] is None
+
+    async def test_filters_by_email_prefix(self, client: AsyncClient) -> None:
+        await self._create(client, "ann@example.com", "anna@example.com", "bob@example.com")
+
+        response = await client.get("/api/users", params={"email_prefix": "ann"})
+        emails = [u["email"] for u in response.json()["items"]]
+        assert emails == ["ann@example.com", "anna@example.com"]
+
+    async def test_prefix_ending_in_the_last_code_point(self, client: AsyncClient) -> None:
+        await self._create(client, "ann@example.com")
+
+        response = await client.get("/api/users", params={"email_prefix": "ann\U0010ffff"})
+        assert response.status_code == 200
+        assert response.json()["items"] == []
+
+    async def test_streams_ndjson(self, client: AsyncClient) -> None:
+        await self._create(client, "x@example.com", "y@example.com")
+
+        response = await client.get("/api/users", headers={"Accept": "application/x-ndjson"})
+        assert response.headers["content-type"] == "application/x-ndjson"
+        emails = [json.loads(line)["email"] for line in response.text.splitlines()]
+        assert emails == ["x@example.com", "y@example.com"]
+
+
+class TestBatchGetUsers:
+    async def test_returns_users_in_request_order(self, client: AsyncClient) -> None:
+        ids = []
+        for email in ("p@example.com", "q@example.com"):
+            created = await client.post("/api/users", json={"email": email, "name": "Batch"})
+            ids.append(created.json()["id"])
+
+        response = await client.post("/api/users:batchGet", json={
+            "ids": [ids[1], 99999, ids[0], ids[1]],
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert [u["email"] for u in data["users"]] == ["q@example.com", "p@example.com"]
+        assert data["missing"] == [99999]
+
+    async def test_rejects_empty_id_list(self, client: AsyncClient) -> None:
+        response = await client.post("/api/users:batchGet", json={"ids": []})
+        assert response.status_code == 422
+
+
+class TestUserCache:
+    async def test_create_invalidates_cached_404(self, client: AsyncClient) -> None:
+        missing = await client.get("/api/users/1")
+        assert missing.status_code == 404
+
+        created = await client.post("/api/users", json={
+            "email": "late@example.com",
+            "name": "Late",
+        })
+        assert created.json()["id"] == 1
+
+        response = await client.get("/api/users/1")
+        assert response.status_code == 200
+        assert response.json()["email"] == "late@example.com"
+
+    async def test_create_invalidates_only_after_commit(self) -> None:
+        cache = MemoryCache(100)
+        async with TestSession() as session:
+            async with session.begin():
+                users = CachedUserRepository(session, cache, ttl=60, negative_ttl=60)
+                created = await users.create_unique("racer@example.com", "Racer")
+                assert created is not None
+                # A concurrent lookup that ran before the commit cached a miss.
+                await cache.set(f"user:id:{created.id}", b"", 60)
+            await asyncio.sleep(0)
+
+        async with TestSession() as session:
+            users = CachedUserRepository(session, cache, ttl=60, negative_ttl=60)
+            user = await users.get_by_id(created.id)
+            assert user is not None
+            assert user.email == "racer@example.com"
+
+    async def test_repeat_lookup_is_served_from_cache(self, client: AsyncClient) -> None:
+        created = await client.post("/api/users", json={"email": "hot@example.com", "name": "Hot"})
+        url = f"/api/users/{created.json()['id']}"
+        await client.get(url)
+        hits = cache_backend.stats.hits
+
+        response = await client.get(url)
+        assert response.json()["email"] == "hot@example.com"
+        assert cache_backend.stats.hits == hits + 1
+
+
+class TestConditionalGetUser:
+    async def _create(self, client: AsyncClient) -> str:
+        created = await client.post("/api/users", json={"email": "etag@example.com", "name": "E"})
+        return f"/api/users/{created.json()['id']}"
+
+    async def test_sets_validators(self, client: AsyncClient) -> None:
+        response = await client.get(await self._create(client))
+        assert response.headers["etag"].startswith('W/"')
+        assert "last-modified" in response.headers
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    async def test_returns_304_for_matching_etag(self, client: AsyncClient) -> None:
+        url = await self._create(client)
+        etag = (await client.get(url)).headers["etag"]
+
+        response = await client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+        stale = await client.get(url, headers={"If-None-Match": '"other"'})
+        assert stale.status_code == 200
+
+    async def test_returns_304_when_not_modified_since(self, client: AsyncClient) -> None:
+        url = await self._create(client)
+        last_modified = (await client.get(url)).headers["last-modified"]
+
+        response = await client.get(url, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+    async def test_conditional_request_for_missing_user_is_404(self, client: AsyncClient) -> None:
+        response = await client.get("/api/users/99999", headers={"If-None-Match": "*"})
+        assert response.status_code == 404
+
+
+class TestIdempotentCreateUser:
+    async def test_retry_replays_first_response(self, client: AsyncClient) -> None:
+        headers = {"Idempotency-Key": "create-retry-1"}
+        body = {"email": "retry@example.com", "name": "Retry"}
+        first = await client.post("/api/users", json=body, headers=headers)
+        retry = await client.post("/api/users", json=body, headers=headers)
+        assert first.status_code == retry.status_code == 201
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+
+    async def test_key_reused_with_other_body_is_rejected(self, client: AsyncClient) -> None:
+        headers = {"Idempotency-Key": "create-reuse-1"}
+        await client.post(
+            "/api/users", json={"email": "a@example.com", "name": "A"}, headers=headers
+        )
+        response = await client.post(
+            "/api/users", json={"email": "b@example.com", "name": "B"}, headers=headers
+        )
+        assert response.status_code == 422
+
+    async def test_concurrent_duplicates_run_once(self, client: AsyncClient) -> None:
+        headers = {"Idempotency-Key": "create-concurrent-1"}
+        body = {"email": "concurrent-key@example.com", "name": "Once"}
+        responses = await asyncio.gather(
+            *(client.post("/api/users", json=body, headers=headers) for _ in range(5))
+        )
+        assert {r.status_code for r in responses} == {201}
+        assert len({r.json()["id"] for r in responses}) == 1
+
+    async def test_failed_request_is_not_stored(self, client: AsyncClient) -> None:
+        body = {"email": "taken@example.com", "name": "Taken"}
+        await client.post("/api/users", json=body)
+        headers = {"Idempotency-Key": "create-failed-1"}
+        first = await client.post("/api/users", json=body, headers=headers)
+        retry = await client.post("/api/users", json=body, headers=headers)
+        assert first.status_code == retry.status_code == 409
+        assert "idempotent-replayed" not in retry.headers
+
+    async def test_response_is_stored_only_after_commit(self) -> None:
+        async def failing_commit() -> AsyncIterator[AsyncSession]:
+            async with TestSession() as session:
+                await session.begin()
+                yield session
+                await session.rollback()
+                raise RuntimeError("commit failed")
+
+        headers = {"Idempotency-Key": "create-commit-1"}
+        body = {"email": "rolled-back@example.com", "name": "Rolled Back"}
+        app.dependency_overrides[get_session] = failing_commit
+        try:
+            transport = ASGITransport(app=app, raise_app_exceptions=False)
+            async with AsyncClient(transport=transport, base_url="http://test") as ac:
+                await ac.post("/api/users", json=body, headers=headers)
+                retry = await ac.post("/api/users", json=body, headers=headers)
+        finally:
+            app.dependency_overrides.clear()
+        assert "idempotent-replayed" not in retry.headers
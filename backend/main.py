@@ -1,9 +1,10 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 
 from core.config import settings
+from core.lifespan import lifespan
 from core.middleware import setup_middleware
-from features.health.health_router import router as health_router
-from features.user.user_router import router as user_router
+from core.rate_limit import enforce_rate_limit
+from features import register_features
 
 
 def create_app() -> FastAPI:
@@ -11,10 +12,11 @@ def create_app() -> FastAPI:
     application = FastAPI(
         title=settings.app_name,
         version=settings.app_version,
+        lifespan=lifespan,
+        dependencies=[Depends(enforce_rate_limit)] if settings.rate_limit_enabled else None,
     )
     setup_middleware(application)
-    application.include_router(health_router)
-    application.include_router(user_router)
+    register_features(application)
     return application
 
 
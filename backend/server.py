@@ -0,0 +1,70 @@
+"""Production entry point: ``python server.py``.
+
+Runs ``main:app`` under uvicorn with one worker per available CPU, uvloop
+and httptools when installed, and no reloader. Each worker warms itself up
+and disposes its engine through the application lifespan.
+"""
+import importlib.util
+import logging
+import logging.config
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+from core.config import settings
+
+# Logged through uvicorn's logger, so it shares its handler and format.
+logger = logging.getLogger("uvicorn.error")
+
+
+def worker_count() -> int:
+    """Configured worker count, else the CPUs this process may run on."""
+    if settings.server_workers is not None:
+        return settings.server_workers
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def main() -> None:
+    workers = worker_count()
+    if settings.metrics_multiproc_dir:
+        # Snapshots of a previous run's workers would be summed into this run's totals.
+        for stale in Path(settings.metrics_multiproc_dir).glob("*.json"):
+            stale.unlink(missing_ok=True)
+    elif workers > 1:
+        # Workers inherit the environment, so each one finds the shared directory.
+        os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="metrics-")
+    # uvicorn.run() only configures logging itself once it starts.
+    logging.config.dictConfig(LOGGING_CONFIG)
+    logger.info("Starting %d worker(s) with %s and %s", workers, event_loop(), http_protocol())
+    uvicorn.run(
+        "main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        loop=event_loop(),
+        http=http_protocol(),
+        lifespan="on",
+        proxy_headers=True,
+        forwarded_allow_ips=settings.server_forwarded_allow_ips,
+        timeout_keep_alive=settings.server_keepalive_seconds,
+        timeout_graceful_shutdown=settings.server_graceful_shutdown_seconds,
+        access_log=settings.debug,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -96,6 +96,9 @@ def check_tier_boundaries(filepath: Path) -> list[str]:
         return violations
 
     feature_dir = filepath.parent
+    if feature_dir == FEATURES_DIR:
+        # features/__init__.py is the tier registry generated by filter-features.py
+        return violations
     source_tier = get_feature_tier(feature_dir)
     source_feature = feature_dir.name
 
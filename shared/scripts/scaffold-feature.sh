@@ -246,8 +246,9 @@ echo "  Frontend: $FRONTEND_DIR/ (5 files)"
 echo ""
 echo "Next steps:"
 echo "  1. Fill in the TODO markers with your domain model"
-echo "  2. Create migration: cd backend && alembic revision --autogenerate -m 'add ${SNAKE}'"
-echo "  3. Run: make generate  (extracts OpenAPI spec from routers, regenerates TS client)"
-echo "  4. Run: make validate"
+echo "  2. Register the router in backend/features/__init__.py (keep the generated layout)"
+echo "  3. Create migration: cd backend && alembic revision --autogenerate -m 'add ${SNAKE}'"
+echo "  4. Run: make generate  (extracts OpenAPI spec from routers, regenerates TS client)"
+echo "  5. Run: make validate"
 echo ""
 echo "See: docs/conventions/feature-workflow.md"